@@ -5,9 +5,50 @@ Production-ready AI analysis with error handling
 
 import google.generativeai as genai
 import json
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from config import Config
+from utils.helpers import job_fingerprint, atomic_write_json, file_lock
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.skill_canonicalizer import canonicalize_skills
+from analyzer.pattern_detector import summarize_patterns
+from analyzer.skill_cooccurrence import format_associations
+from analyzer.trend_detector import format_trends
+
+TRIAGE_VERDICTS = ('good fit', 'maybe', 'skip')
+
+def _response_text(response) -> str:
+    """Text of a response, empty when generation stopped before any output"""
+    try:
+        return response.text
+    except ValueError:
+        return ''
+
+def _finish_reason(response) -> str:
+    try:
+        return response.candidates[0].finish_reason.name
+    except (AttributeError, IndexError):
+        return 'unknown'
+
+def _complete_items(text: str) -> List:
+    """Values of a JSON array that was cut off, complete ones only"""
+    decoder = json.JSONDecoder()
+    items = []
+    pos = text.find('[') + 1
+    if not pos:
+        return items
+    while True:
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            return items
+        items.append(item)
 
 class GeminiAnalyzer:
     """Gemini AI job analyzer"""
@@ -15,6 +56,8 @@ class GeminiAnalyzer:
     def __init__(self):
         self.config = Config
         self.model = None
+        self._triage_cache: Optional[Dict[str, Dict]] = None
+        self._triage_lock = threading.Lock()
         self._configure()
     
     def _configure(self):
@@ -30,27 +73,47 @@ class GeminiAnalyzer:
             logger.error(f"Failed to configure Gemini: {e}")
             raise
     
-    def analyze_jobs(self, jobs: List[Dict], historical_data: Optional[Dict] = None) -> str:
+    def _generate(self, prompt: str, kind: str, **kwargs):
+        """One generate_content call, timed and counted (requests, tokens)"""
+        metrics.incr(f"gemini.{kind}.requests")
+        with metrics.span(f"gemini.generate_content.{kind}"):
+            response = self.model.generate_content(prompt, **kwargs)
+        
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is not None:
+            metrics.incr('gemini.prompt_tokens', getattr(usage, 'prompt_token_count', 0) or 0)
+            metrics.incr('gemini.output_tokens', getattr(usage, 'candidates_token_count', 0) or 0)
+        return response
+    
+    def analyze_jobs(self, jobs: List[Dict], historical_data: Optional[Dict] = None,
+                     patterns: Optional[List[Dict]] = None, fallback: bool = True) -> str:
         """
         Analyze jobs with Gemini AI
         
         Args:
             jobs: List of job dictionaries
             historical_data: Previous analysis for comparison
-            
+            patterns: Locally detected project clusters; when given, the
+                prompt carries cluster summaries instead of raw jobs
+            fallback: Return a locally generated analysis when Gemini
+                fails; otherwise the error is raised
+                
         Returns:
             Analysis text
         """
         try:
             # Prepare data
-            jobs_summary = self._prepare_summary(jobs)
+            if patterns:
+                jobs_summary = self._prepare_pattern_summary(jobs, patterns)
+            else:
+                jobs_summary = self._prepare_summary(jobs)
             
             # Create prompt
-            prompt = self._create_prompt(jobs_summary, len(jobs), historical_data)
+            prompt = self._create_prompt(jobs_summary, len(jobs), historical_data, bool(patterns))
             
             # Generate analysis
             logger.info("🧠 Generating analysis with Gemini 2.5...")
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, 'analysis')
             
             analysis = response.text
             logger.info("✅ Analysis generated successfully")
@@ -59,7 +122,10 @@ class GeminiAnalyzer:
         
         except Exception as e:
             logger.error(f"Analysis error: {e}")
-            return self._generate_fallback_analysis(jobs)
+            if not fallback:
+                raise
+            metrics.incr('gemini.fallbacks')
+            return self._generate_fallback_analysis(jobs, patterns)
     
     def _prepare_summary(self, jobs: List[Dict]) -> str:
         """Prepare concise job summary"""
@@ -70,13 +136,29 @@ class GeminiAnalyzer:
                 "id": i + 1,
                 "title": job.get("title", "")[:100],
                 "description": job.get("description", "")[:300],
-                "skills": job.get("skills", [])[:10],
+                "skills": canonicalize_skills(job.get("skills", []))[:10],
                 "budget": job.get("budget", "Not specified")
             })
         
         return json.dumps(summary_data, indent=2)
     
-    def _create_prompt(self, jobs_summary: str, total_jobs: int, historical_data: Optional[Dict]) -> str:
+    def _prepare_pattern_summary(self, jobs: List[Dict], patterns: List[Dict]) -> str:
+        """Skill counts over every job plus cluster summaries"""
+        skills_count = {}
+        for job in jobs:
+            for skill in canonicalize_skills(job.get('skills', [])):
+                skills_count[skill] = skills_count.get(skill, 0) + 1
+        
+        top_skills = sorted(skills_count.items(), key=lambda x: x[1], reverse=True)[:25]
+        
+        return f"""SKILL COUNTS (all jobs):
+{json.dumps(dict(top_skills), indent=2)}
+
+PROJECT CLUSTERS (detected locally from all jobs):
+{summarize_patterns(patterns)}"""
+    
+    def _create_prompt(self, jobs_summary: str, total_jobs: int, historical_data: Optional[Dict],
+                       clustered: bool = False) -> str:
         """Create detailed analysis prompt"""
         
         historical_context = ""
@@ -85,6 +167,22 @@ class GeminiAnalyzer:
 HISTORICAL CONTEXT:
 Previous analysis showed {historical_data.get('total_jobs', 0)} jobs.
 Compare trends with current data.
+"""
+            associations = format_associations(historical_data.get('skill_associations', []))
+            if associations:
+                historical_context += f"""
+SKILLS REQUESTED TOGETHER (measured over all stored jobs; % = share of jobs with
+the first skill that also ask for the other, lift > 1 = more often than chance):
+{associations}
+Use these measured associations rather than guessing which skills go together.
+"""
+            trends = format_trends(historical_data.get('trends', {}))
+            if trends:
+                historical_context += f"""
+MEASURED TRENDS (daily series; this week's average vs last week's; z = deviation
+of today's value from its running average):
+{trends}
+Base TRENDING TECHNOLOGIES and MARKET COMPARISON on these measured trends.
 """
         
         prompt = f"""
@@ -92,7 +190,7 @@ You are an expert freelance market analyst specializing in AI/ML job trends.
 
 Analyze these {total_jobs} Upwork job postings for AI/ML engineers.
 
-JOBS DATA:
+{"JOBS DATA (aggregated):" if clustered else "JOBS DATA:"}
 {jobs_summary}
 
 {historical_context}
@@ -105,6 +203,7 @@ Format: 1. Skill Name - X mentions
 
 ## COMMON PROJECT PATTERNS
 Identify 5 most common types of projects being requested.
+{"Base these on the largest project clusters and name each one clearly." if clustered else ""}
 For each pattern, explain what clients typically want.
 
 ## TRENDING TECHNOLOGIES
@@ -136,12 +235,174 @@ Keep the analysis professional, data-driven, and actionable.
         
         return prompt
     
-    def _generate_fallback_analysis(self, jobs: List[Dict]) -> str:
+    def _load_triage_cache(self) -> Dict[str, Dict]:
+        """Triage verdicts by job fingerprint"""
+        if not self.config.TRIAGE_CACHE_FILE.exists():
+            return {}
+        try:
+            with open(self.config.TRIAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f).get('verdicts', {})
+        except Exception as e:
+            logger.error(f"Error loading triage cache, starting fresh: {e}")
+            return {}
+    
+    def _save_triage_cache(self):
+        """Persist verdicts, merging what other processes saved meanwhile"""
+        try:
+            with file_lock(self.config.TRIAGE_CACHE_FILE):
+                merged = self._load_triage_cache()
+                merged.update(self._triage_cache)
+                self._triage_cache = merged
+                atomic_write_json(self.config.TRIAGE_CACHE_FILE, {
+                    'count': len(merged),
+                    'verdicts': merged
+                })
+        except Exception as e:
+            logger.error(f"Error saving triage cache: {e}")
+    
+    def cached_verdict(self, job: Dict) -> Optional[Dict]:
+        """Cached triage verdict of a job, if it was triaged before"""
+        with self._triage_lock:
+            if self._triage_cache is None:
+                self._triage_cache = self._load_triage_cache()
+            return self._triage_cache.get(job_fingerprint(job))
+    
+    def triage_jobs(self, jobs: List[Dict], profile=None) -> List[Optional[Dict]]:
+        """
+        One-line fit verdicts for jobs, batched into as few requests as possible
+        
+        Args:
+            jobs: Job dictionaries
+            profile: FreelancerProfile to judge fit against (optional)
+            
+        Returns:
+            One {'verdict', 'reason'} per job in input order, None where the
+            model gave no usable answer. Verdicts are cached by fingerprint,
+            so no job is ever sent twice.
+        """
+        results: List[Optional[Dict]] = [self.cached_verdict(job) for job in jobs]
+        metrics.incr('triage_cache.hits', sum(1 for result in results if result is not None))
+        
+        # Uncached jobs, each fingerprint once
+        todo: Dict[str, List[int]] = {}
+        for i, job in enumerate(jobs):
+            if results[i] is None:
+                todo.setdefault(job_fingerprint(job), []).append(i)
+        if not todo:
+            return results
+        
+        groups = list(todo.values())
+        batch_size = self.config.TRIAGE_BATCH_SIZE
+        for start in range(0, len(groups), batch_size):
+            chunk = groups[start:start + batch_size]
+            verdicts = self._triage_batch([jobs[group[0]] for group in chunk], profile)
+            for group, verdict in zip(chunk, verdicts):
+                for i in group:
+                    results[i] = verdict
+        
+        with self._triage_lock:
+            self._save_triage_cache()
+        return results
+    
+    def _triage_batch(self, jobs: List[Dict], profile=None, retry: bool = True) -> List[Optional[Dict]]:
+        """
+        Triage one batch with a single structured-output request
+        
+        gemini-2.5-flash spends part of max_output_tokens on thinking, so
+        the cap leaves TRIAGE_OUTPUT_TOKENS of headroom. If the JSON is
+        still cut off, the complete verdicts are kept and the jobs that
+        got none are sent once more as a smaller batch.
+        """
+        prompt = self._create_triage_prompt(jobs, profile)
+        
+        try:
+            started = time.perf_counter()
+            response = self._generate(
+                prompt, 'triage',
+                generation_config=genai.GenerationConfig(
+                    response_mime_type='application/json',
+                    temperature=0.2,
+                    max_output_tokens=self.config.TRIAGE_OUTPUT_TOKENS + 64 * len(jobs)
+                )
+            )
+            text = _response_text(response)
+            try:
+                items = json.loads(text)
+                truncated = False
+            except ValueError:
+                items = _complete_items(text)
+                truncated = True
+                metrics.incr('gemini.triage.truncated')
+                logger.warning(f"⚠️  Triage response cut off ({_finish_reason(response)}), "
+                               f"kept {len(items)} complete verdicts")
+            logger.info(f"🩺 Triaged {len(jobs)} jobs in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Triage error: {e}")
+            return [None] * len(jobs)
+        
+        by_id = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                by_id[int(item['id'])] = item
+            except (KeyError, TypeError, ValueError):
+                continue
+        
+        verdicts = []
+        now = datetime.now().isoformat()
+        for n, job in enumerate(jobs, 1):
+            item = by_id.get(n) or {}
+            verdict = str(item.get('verdict', '')).strip().lower()
+            if verdict not in TRIAGE_VERDICTS:
+                verdicts.append(None)
+                continue
+            
+            result = {'verdict': verdict, 'reason': str(item.get('reason', '')).strip()[:200]}
+            with self._triage_lock:
+                self._triage_cache[job_fingerprint(job)] = {**result, 'triaged_at': now}
+            verdicts.append(result)
+        
+        missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if truncated and retry and missing:
+            for i, verdict in zip(missing, self._triage_batch([jobs[i] for i in missing], profile, retry=False)):
+                verdicts[i] = verdict
+        return verdicts
+    
+    def _create_triage_prompt(self, jobs: List[Dict], profile=None) -> str:
+        """Short per-job triage prompt"""
+        if profile is not None:
+            skills = ', '.join(sorted(profile.skills, key=profile.skills.get, reverse=True)[:15])
+            freelancer = f"Skills: {skills}."
+            if profile.min_hourly_rate:
+                freelancer += f" Minimum hourly rate: ${profile.min_hourly_rate:g}."
+            if profile.min_fixed_budget:
+                freelancer += f" Minimum fixed budget: ${profile.min_fixed_budget:g}."
+            if profile.project_types:
+                freelancer += f" Prefers: {', '.join(profile.project_types)}."
+        else:
+            freelancer = "An AI/ML engineer."
+        
+        items = [{
+            'id': n,
+            'title': job.get('title', '')[:100],
+            'skills': canonicalize_skills(job.get('skills', []))[:8],
+            'budget': job.get('budget', 'Not specified'),
+            'description': job.get('description', '')[:300]
+        } for n, job in enumerate(jobs, 1)]
+        
+        return f"""Triage Upwork jobs for this freelancer. {freelancer}
+
+Return a JSON array with one object per job:
+{{"id": <job id>, "verdict": "good fit" | "maybe" | "skip", "reason": "<at most 12 words>"}}
+
+JOBS:
+{json.dumps(items, ensure_ascii=False)}"""
+    
+    def _generate_fallback_analysis(self, jobs: List[Dict], patterns: Optional[List[Dict]] = None) -> str:
         """Generate basic analysis if AI fails"""
         skills_count = {}
         
         for job in jobs:
-            for skill in job.get('skills', []):
+            for skill in canonicalize_skills(job.get('skills', [])):
                 skills_count[skill] = skills_count.get(skill, 0) + 1
         
         top_skills = sorted(skills_count.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -156,13 +417,98 @@ Keep the analysis professional, data-driven, and actionable.
         for i, (skill, count) in enumerate(top_skills, 1):
             analysis += f"{i}. {skill} - {count} mentions\n"
         
+        if patterns:
+            analysis += "\n## Project Patterns:\n"
+            for i, pattern in enumerate(patterns[:5], 1):
+                analysis += f"{i}. {pattern['label']} - {pattern['size']} jobs\n"
+        
         analysis += "\n⚠️ Full AI analysis unavailable. This is a basic summary.\n"
         
         return analysis
 
+class TriageQueue:
+    """
+    Collects jobs for triage and sends them in batches
+    
+    A batch goes out when it reaches TRIAGE_BATCH_SIZE jobs or when its
+    oldest job has waited TRIAGE_MAX_WAIT_SECONDS, whichever comes first.
+    Cached jobs resolve immediately without entering the queue.
+    """
+    
+    def __init__(self, analyzer: GeminiAnalyzer, profile=None,
+                 batch_size: Optional[int] = None, max_wait: Optional[float] = None):
+        self.analyzer = analyzer
+        self.profile = profile
+        self.batch_size = batch_size or Config.TRIAGE_BATCH_SIZE
+        self.max_wait = Config.TRIAGE_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self._pending: List[Tuple[Dict, Future, float]] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+    
+    def submit(self, job: Dict) -> Future:
+        """Queue a job; the future resolves to its verdict (or None)"""
+        future = Future()
+        cached = self.analyzer.cached_verdict(job)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        
+        with self._cond:
+            self._pending.append((job, future, time.monotonic()))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='triage-queue', daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+    
+    def flush(self):
+        """Send everything queued right now, without waiting for the verdicts"""
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if batch:
+            threading.Thread(target=self._send, args=(batch,), name='triage-flush', daemon=True).start()
+    
+    def _run(self):
+        """Worker: wait for a full batch or the deadline, then send"""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending:
+                        # Exit when idle; submit() starts a new worker
+                        self._cond.wait(timeout=30)
+                        if not self._pending:
+                            self._worker = None
+                            return
+                        continue
+                    waited = time.monotonic() - self._pending[0][2]
+                    if len(self._pending) >= self.batch_size or waited >= self.max_wait:
+                        break
+                    self._cond.wait(timeout=self.max_wait - waited)
+                
+                batch = self._pending[:self.batch_size]
+                self._pending = self._pending[self.batch_size:]
+            
+            self._send(batch)
+    
+    def _send(self, batch: List[Tuple[Dict, Future, float]]):
+        """Triage a batch and resolve its futures"""
+        try:
+            verdicts = self.analyzer.triage_jobs([job for job, _, _ in batch], self.profile)
+        except Exception as e:
+            logger.error(f"Triage queue error: {e}")
+            verdicts = [None] * len(batch)
+        
+        for (_, future, _), verdict in zip(batch, verdicts):
+            future.set_result(verdict)
+
 # Global analyzer instance
 analyzer = GeminiAnalyzer()
 
-def analyze_jobs_with_gemini(jobs: List[Dict], historical_data: Optional[Dict] = None) -> str:
+def analyze_jobs_with_gemini(jobs: List[Dict], historical_data: Optional[Dict] = None,
+                             patterns: Optional[List[Dict]] = None, fallback: bool = True) -> str:
     """Main analysis function"""
-    return analyzer.analyze_jobs(jobs, historical_data)
+    return analyzer.analyze_jobs(jobs, historical_data, patterns, fallback)
+
+def triage_jobs(jobs: List[Dict], profile=None) -> List[Optional[Dict]]:
+    """Batched one-line verdicts for a few jobs"""
+    return analyzer.triage_jobs(jobs, profile)
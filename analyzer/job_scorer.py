@@ -0,0 +1,409 @@
+"""
+Job Scorer
+Profile-based job scoring and top-k ranking
+"""
+
+import heapq
+import io
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
+from config import Config
+from utils.helpers import parse_budget, atomic_write_bytes
+from utils.job_record import jobs_to_dicts
+from utils.logger import logger
+from utils.skill_canonicalizer import canonicalize_skill, canonicalize_skills
+
+_WORD_RE = re.compile(r'[a-z0-9+#]+')
+
+# Longest project-type phrase, in words, matched against titles
+MAX_PHRASE_WORDS = 3
+
+# Bump when the feature layout changes so cached features are rebuilt
+FEATURES_VERSION = 2
+
+DEFAULT_WEIGHTS = {'skills': 0.6, 'rate': 0.25, 'project_type': 0.15}
+
+@dataclass
+class FreelancerProfile:
+    """
+    What a freelancer wants to bid on
+    
+    Loaded from a JSON file such as:
+        
+        {
+            "skills": {"Python": 1.0, "LangChain": 0.9, "RAG": 0.8},
+            "min_hourly_rate": 40,
+            "min_fixed_budget": 500,
+            "project_types": ["chatbot", "rag", "data pipeline"],
+            "weights": {"skills": 0.6, "rate": 0.25, "project_type": 0.15}
+        }
+        
+    Project types are phrases of up to MAX_PHRASE_WORDS words that must
+    appear in the title as written: "data pipeline" does not match a
+    title that merely says "data".
+    """
+    
+    skills: Dict[str, float]
+    min_hourly_rate: float = 0.0
+    min_fixed_budget: float = 0.0
+    project_types: List[str] = field(default_factory=list)
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    
+    def __post_init__(self):
+        canonical = {}
+        for skill, weight in self.skills.items():
+            name = canonicalize_skill(skill)
+            if name:
+                canonical[name] = max(float(weight), canonical.get(name, 0.0))
+        self.skills = canonical
+        phrases = []
+        for phrase in self.project_types:
+            words = _WORD_RE.findall(phrase.lower())
+            if len(words) > MAX_PHRASE_WORDS:
+                logger.warning(f"⚠️  Project type '{phrase}' is longer than {MAX_PHRASE_WORDS} words, ignoring it")
+            elif words:
+                phrases.append(' '.join(words))
+        self.project_types = phrases
+        self.weights = {**DEFAULT_WEIGHTS, **self.weights}
+    
+    @classmethod
+    def load(cls, path: Optional[Union[str, Path]] = None) -> Optional['FreelancerProfile']:
+        """Load a profile file, None if there is none"""
+        path = Path(path or Config.PROFILE_FILE)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(
+                skills=data.get('skills', {}),
+                min_hourly_rate=data.get('min_hourly_rate', 0.0),
+                min_fixed_budget=data.get('min_fixed_budget', 0.0),
+                project_types=data.get('project_types', []),
+                weights=data.get('weights', {})
+            )
+        except Exception as e:
+            logger.error(f"Error loading profile {path}: {e}")
+            return None
+
+def _title_phrases(title: str) -> set:
+    """Word n-grams of a title, up to MAX_PHRASE_WORDS words long"""
+    words = _WORD_RE.findall((title or '').lower())
+    return {' '.join(words[i:i + n]) for n in range(1, MAX_PHRASE_WORDS + 1)
+            for i in range(len(words) - n + 1)}
+
+class JobFeatures:
+    """
+    Precomputed per-job features for fast rescoring
+    
+    Skills and title phrases (word n-grams) are stored as sparse 0/1
+    matrices (parallel row and column index arrays over a vocabulary).
+    Scoring a profile is then a gather-and-sum over these arrays with no
+    per-job Python work, so whole archives can be rescored whenever the
+    profile changes.
+    """
+    
+    ARRAYS = ('skill_indices', 'skill_rows', 'skill_counts', 'word_indices', 'word_rows',
+              'budget_min', 'budget_max', 'hourly')
+    
+    def __init__(self, jobs: List[Dict]):
+        self.jobs = jobs
+        self.skill_vocab: Dict[str, int] = {}
+        self.word_vocab: Dict[str, int] = {}
+        
+        skill_ids, skill_lengths = [], []
+        word_ids, word_lengths = [], []
+        budget_min = np.full(len(jobs), np.nan)
+        budget_max = np.full(len(jobs), np.nan)
+        hourly = np.zeros(len(jobs), dtype=bool)
+        
+        for i, job in enumerate(jobs):
+            ids = {self.skill_vocab.setdefault(s, len(self.skill_vocab))
+                   for s in canonicalize_skills(job.get('skills', []))}
+            skill_ids.extend(ids)
+            skill_lengths.append(len(ids))
+            
+            words = {self.word_vocab.setdefault(w, len(self.word_vocab))
+                     for w in _title_phrases(job.get('title', ''))}
+            word_ids.extend(words)
+            word_lengths.append(len(words))
+            
+            budget = job.get('budget', '') or ''
+            low, high = parse_budget(budget)
+            if low is not None:
+                budget_min[i], budget_max[i] = low, high
+                hourly[i] = 'hour' in budget.lower()
+        
+        self.skill_indices = np.array(skill_ids, dtype=np.int32)
+        self.skill_rows = np.repeat(np.arange(len(jobs)), skill_lengths)
+        self.skill_counts = np.array(skill_lengths, dtype=np.float64)
+        self.word_indices = np.array(word_ids, dtype=np.int32)
+        self.word_rows = np.repeat(np.arange(len(jobs)), word_lengths)
+        self.budget_min = budget_min
+        self.budget_max = budget_max
+        self.hourly = hourly
+    
+    def __len__(self) -> int:
+        return len(self.jobs)
+    
+    @classmethod
+    def _from_arrays(cls, jobs: List[Dict], skill_vocab: Dict[str, int],
+                     word_vocab: Dict[str, int], arrays: Dict[str, np.ndarray]) -> 'JobFeatures':
+        features = cls.__new__(cls)
+        features.jobs = jobs
+        features.skill_vocab = skill_vocab
+        features.word_vocab = word_vocab
+        for name in cls.ARRAYS:
+            setattr(features, name, arrays[name])
+        return features
+    
+    def to_bytes(self) -> bytes:
+        """Serialized arrays and vocabularies (the jobs are not included)"""
+        buffer = io.BytesIO()
+        np.savez(buffer, version=np.array(FEATURES_VERSION),
+                 skill_vocab=np.array(list(self.skill_vocab), dtype=str),
+                 word_vocab=np.array(list(self.word_vocab), dtype=str),
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+        return buffer.getvalue()
+    
+    @classmethod
+    def from_bytes(cls, jobs: List[Dict], data: bytes) -> 'JobFeatures':
+        """
+        Features saved with to_bytes, for the same jobs
+        
+        Raises:
+            ValueError: If the data is from another layout or job count
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            if int(npz['version']) != FEATURES_VERSION:
+                raise ValueError("feature layout changed")
+            if len(npz['skill_counts']) != len(jobs):
+                raise ValueError("job count changed")
+            skill_vocab = {name: i for i, name in enumerate(npz['skill_vocab'].tolist())}
+            word_vocab = {name: i for i, name in enumerate(npz['word_vocab'].tolist())}
+            return cls._from_arrays(jobs, skill_vocab, word_vocab, {name: npz[name] for name in cls.ARRAYS})
+    
+    @classmethod
+    def concat(cls, parts: List['JobFeatures']) -> 'JobFeatures':
+        """Features of several job lists as one, with merged vocabularies"""
+        if len(parts) == 1:
+            return parts[0]
+        
+        jobs, skill_vocab, word_vocab = [], {}, {}
+        columns = {name: [] for name in cls.ARRAYS}
+        for part in parts:
+            skill_map = np.array([skill_vocab.setdefault(name, len(skill_vocab)) for name in part.skill_vocab],
+                                 dtype=np.int32)
+            word_map = np.array([word_vocab.setdefault(name, len(word_vocab)) for name in part.word_vocab],
+                                dtype=np.int32)
+            offset = len(jobs)
+            jobs.extend(part.jobs)
+            columns['skill_indices'].append(skill_map[part.skill_indices] if len(skill_map) else part.skill_indices)
+            columns['word_indices'].append(word_map[part.word_indices] if len(word_map) else part.word_indices)
+            columns['skill_rows'].append(part.skill_rows + offset)
+            columns['word_rows'].append(part.word_rows + offset)
+            for name in ('skill_counts', 'budget_min', 'budget_max', 'hourly'):
+                columns[name].append(getattr(part, name))
+        
+        arrays = {name: np.concatenate(values) if values else np.array([]) for name, values in columns.items()}
+        return cls._from_arrays(jobs, skill_vocab, word_vocab, arrays)
+    
+    def _weights(self, vocab: Dict[str, int], values: Dict[str, float]) -> np.ndarray:
+        """Dense weight vector over a vocabulary"""
+        vector = np.zeros(max(len(vocab), 1))
+        for name, value in values.items():
+            index = vocab.get(name)
+            if index is not None:
+                vector[index] = value
+        return vector
+    
+    def score(self, profile: FreelancerProfile) -> Dict[str, np.ndarray]:
+        """
+        Score every job against a profile
+        
+        Returns:
+            Component arrays 'skills', 'rate', 'project_type' and the
+            weighted 'total', all in [0, 1]
+        """
+        n = len(self.jobs)
+        
+        # Cosine between the job's skill set and the profile's weights
+        weights = self._weights(self.skill_vocab, profile.skills)
+        norm = np.sqrt(sum(w * w for w in profile.skills.values())) or 1.0
+        matched = np.bincount(self.skill_rows, weights=weights[self.skill_indices], minlength=n)
+        skills = matched / (norm * np.sqrt(np.maximum(self.skill_counts, 1)))
+        
+        # Budget against the relevant minimum; unknown budgets stay neutral
+        minimum = np.where(self.hourly, profile.min_hourly_rate, profile.min_fixed_budget)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.where(minimum > 0, np.clip(self.budget_max / minimum, 0, 1), 1.0)
+        rate = np.where(np.isnan(self.budget_max), 0.5, rate)
+        
+        if profile.project_types:
+            wanted = self._weights(self.word_vocab, dict.fromkeys(profile.project_types, 1.0))
+            hits = np.bincount(self.word_rows, weights=wanted[self.word_indices], minlength=n)
+            project_type = (hits > 0).astype(np.float64)
+        else:
+            project_type = np.zeros(n)
+        
+        w = profile.weights
+        total = w['skills'] * skills + w['rate'] * rate + w['project_type'] * project_type
+        total /= (w['skills'] + w['rate'] + (w['project_type'] if profile.project_types else 0)) or 1.0
+        
+        return {'skills': skills, 'rate': rate, 'project_type': project_type, 'total': total}
+    
+    def top_k(self, profile: FreelancerProfile, k: int = 10) -> List[Dict]:
+        """
+        Best matching jobs for a profile
+        
+        Returns:
+            Up to k jobs (copies) with 'match_score' and 'match_reasons', best first
+        """
+        scores = self.score(profile)
+        total = scores['total']
+        
+        # Bounded heap: O(n log k) instead of sorting every job
+        best = heapq.nlargest(k, zip(total.tolist(), range(len(total))))
+        
+        results = []
+        for score, i in best:
+            job = dict(self.jobs[i])
+            matched = [s for s in canonicalize_skills(job.get('skills', [])) if s in profile.skills]
+            job['match_score'] = round(score, 3)
+            job['match_reasons'] = {
+                'skills': matched,
+                'skill_score': round(float(scores['skills'][i]), 3),
+                'rate_score': round(float(scores['rate'][i]), 3),
+                'project_type': bool(scores['project_type'][i])
+            }
+            results.append(job)
+        return results
+
+class FeatureCache:
+    """
+    JobFeatures of stored runs, keyed by run
+    
+    A stored run never changes, so its features are built once and kept
+    as an ``.npz`` file; rescoring the archive against a new profile then
+    loads and concatenates them instead of re-parsing every job. Files
+    not used for `RAW_RETENTION_DAYS` are pruned.
+    """
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        self.cache_dir = Path(cache_dir or Config.FEATURES_DIR)
+        self.hits = 0
+        self.misses = 0
+    
+    def features(self, key: str, jobs: List[Dict]) -> JobFeatures:
+        """Features of one run's jobs, built on a cache miss"""
+        path = self.cache_dir / f"features_{key}.npz"
+        if path.exists():
+            try:
+                features = JobFeatures.from_bytes(jobs, path.read_bytes())
+                os.utime(path)
+                self.hits += 1
+                return features
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️  Rebuilding features of {key}: {e}")
+        
+        features = JobFeatures(jobs)
+        self.misses += 1
+        try:
+            atomic_write_bytes(path, features.to_bytes())
+        except OSError as e:
+            logger.warning(f"⚠️  Could not cache features of {key}: {e}")
+        return features
+    
+    def prune(self, days: Optional[int] = None) -> int:
+        """
+        Delete feature files unused for `days`
+        
+        Returns:
+            Number of files removed
+        """
+        days = Config.RAW_RETENTION_DAYS if days is None else days
+        if not self.cache_dir.exists():
+            return 0
+        cutoff = time.time() - days * 86400
+        removed = 0
+        for path in self.cache_dir.glob('features_*.npz'):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+# Global cache instance
+feature_cache = FeatureCache()
+
+def rank_jobs(jobs: List[Dict], k: Optional[int] = None,
+              profile: Optional[FreelancerProfile] = None) -> List[Dict]:
+    """
+    Top-k jobs for the configured freelancer profile
+    
+    The features are built for this call only; use rank_runs for stored
+    runs, whose features are cached.
+    
+    Returns:
+        Ranked jobs, or an empty list when no profile is configured
+    """
+    profile = profile or FreelancerProfile.load()
+    if profile is None or not jobs:
+        return []
+    
+    try:
+        started = time.perf_counter()
+        features = JobFeatures(jobs_to_dicts(jobs))
+        ranked = features.top_k(profile, k or Config.TOP_MATCHES)
+        logger.info(f"🎯 Ranked {len(jobs)} jobs against profile in {time.perf_counter() - started:.2f}s")
+        return ranked
+    except Exception as e:
+        logger.error(f"Job scoring error: {e}")
+        return []
+
+def rank_runs(runs: List[Tuple[str, List[Dict]]], k: Optional[int] = None,
+              profile: Optional[FreelancerProfile] = None) -> List[Dict]:
+    """
+    Top-k jobs over stored runs, reusing each run's cached features
+    
+    Args:
+        runs: (run key, jobs) pairs, e.g. from JobDatabase.load_history_runs
+        k: Number of matches
+        profile: Profile to rank against (defaults to the configured one)
+        
+    Returns:
+        Ranked jobs, or an empty list when no profile is configured
+    """
+    profile = profile or FreelancerProfile.load()
+    if profile is None or not runs:
+        return []
+    
+    try:
+        started = time.perf_counter()
+        hits = feature_cache.hits
+        features = JobFeatures.concat([feature_cache.features(key, jobs_to_dicts(jobs)) for key, jobs in runs])
+        ranked = features.top_k(profile, k or Config.TOP_MATCHES)
+        feature_cache.prune()
+        logger.info(f"🎯 Ranked {len(features)} stored jobs against profile in "
+                    f"{time.perf_counter() - started:.2f}s ({feature_cache.hits - hits}/{len(runs)} runs cached)")
+        return ranked
+    except Exception as e:
+        logger.error(f"Job scoring error: {e}")
+        return []
+
+def format_matches(matches: List[Dict]) -> str:
+    """Ranked matches as plain text"""
+    lines = []
+    for i, job in enumerate(matches, 1):
+        reasons = job.get('match_reasons', {})
+        lines.append(f"{i}. {job.get('title', '')[:90]} (score {job['match_score']:.2f})")
+        lines.append(f"   Budget: {job.get('budget', 'Not specified')}")
+        if reasons.get('skills'):
+            lines.append(f"   Matching skills: {', '.join(reasons['skills'][:6])}")
+    return '\n'.join(lines)
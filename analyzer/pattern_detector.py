@@ -1 +1,356 @@
+"""
+Project Pattern Detector
+Local clustering of job postings into common project types
+"""
 
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from analyzer.trend_detector import budget_type
+from config import Config
+from utils.helpers import parse_budget, job_fingerprint
+from utils.job_record import as_dict
+from utils.logger import logger
+from utils.skill_canonicalizer import canonicalize_skills
+
+_DOC_SEPARATOR = b'\x01'
+_BYTE_TABLE = bytes(b if chr(b).isascii() and (chr(b).islower() or chr(b).isdigit() or chr(b) in '+#\x01')
+                    else 32 for b in range(256))
+
+# Generic words plus job-post boilerplate that says nothing about the project
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+etc few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not now of off on once only or
+other our ours out over own per same she should so some such than that the their
+them then there these they this those through to too under until up very via was we
+were what when where which while who whom why will with would you your yours
+looking need needed needs seeking want wants require required requirements
+experience experienced expert expertise skilled strong proven good great excellent
+project projects job work working help build building create develop developer
+development developing freelancer candidate someone person team company client
+please thanks thank hi hello must able ability ideal ideally new using use based
+like well time hour hours day days week weeks month months year years long term
+start asap quick quickly fast easy simple task tasks details detail include including
+more less know knowledge understanding plus bonus preferred hourly fixed price budget
+""".split())
+
+@dataclass
+class PatternCluster:
+    """Summary of one project pattern"""
+    
+    label: str
+    size: int
+    share: float
+    top_terms: List[str]
+    top_skills: List[Tuple[str, int]]
+    median_hourly_rate: Optional[float]
+    median_fixed_budget: Optional[float]
+    sample_titles: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+def _job_text(job: Dict) -> str:
+    """Text used for clustering; the title counts twice"""
+    title = job.get('title', '') or ''
+    return f"{title} {title} {job.get('description', '') or ''}"
+
+def build_tfidf(texts: List[str], max_features: int = 20000, min_df: int = 2,
+                max_df: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Sparse TF-IDF matrix in CSR form
+    
+    Token ids, document/term pairs and counts are handled as flat NumPy
+    arrays rather than per-document dicts, which keeps 50k documents to
+    about a second. Non-ASCII characters are dropped.
+    
+    Returns:
+        (indptr, indices, data, vocabulary) with L2-normalized rows
+    """
+    n_docs = len(texts)
+    
+    # Tokenize the whole corpus in one pass: translate every byte outside
+    # [a-z0-9+#] to a space and split, with a marker token between documents
+    corpus = ' \x01 '.join(text.replace('\x01', ' ') for text in texts)
+    tokens = corpus.lower().encode('ascii', 'ignore').translate(_BYTE_TABLE).split()
+    
+    words = list(dict.fromkeys(tokens))
+    word_index = {word: i for i, word in enumerate(words)}
+    ids = np.fromiter(map(word_index.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    
+    separator = ids == word_index.get(_DOC_SEPARATOR, -1)
+    doc_ids = np.cumsum(separator)[~separator]
+    flat = ids[~separator]
+    words = [word.decode('ascii') for word in words]
+    n_words = max(len(words), 1)
+    
+    # Unique (doc, word) pairs with their counts, ordered doc-major
+    pairs, counts = np.unique(doc_ids * n_words + flat, return_counts=True)
+    pair_docs = pairs // n_words
+    pair_words = pairs % n_words
+    
+    df = np.bincount(pair_words, minlength=n_words)
+    stop = np.fromiter((w in STOPWORDS or len(w) < 2 or not w[0].isalpha() for w in words),
+                       dtype=bool, count=len(words))
+    # Frequency pruning only makes sense once there is a real corpus
+    max_count = max_df * n_docs if n_docs >= 20 else n_docs
+    keep = (df >= min(min_df, max(n_docs, 1))) & (df <= max(max_count, 1)) & ~stop
+    candidates = np.flatnonzero(keep)
+    if len(candidates) > max_features:
+        candidates = candidates[np.argsort(-df[candidates], kind='stable')[:max_features]]
+    
+    column = np.full(n_words, -1, dtype=np.int64)
+    column[candidates] = np.arange(len(candidates))
+    vocabulary = [words[i] for i in candidates]
+    
+    cols = column[pair_words]
+    selected = cols >= 0
+    pair_docs, cols, counts = pair_docs[selected], cols[selected], counts[selected]
+    
+    idf = np.log((1 + n_docs) / (1 + df[candidates])) + 1
+    data = ((1 + np.log(counts)) * idf[cols]).astype(np.float32)
+    
+    norms = np.sqrt(np.bincount(pair_docs, weights=data.astype(np.float64) ** 2, minlength=n_docs))
+    data /= np.maximum(norms, 1e-12)[pair_docs].astype(np.float32)
+    
+    indptr = np.zeros(n_docs + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pair_docs, minlength=n_docs), out=indptr[1:])
+    
+    return indptr, cols.astype(np.int32), data, vocabulary
+
+def _similarities(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                  centroids: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every CSR row to every centroid, shape (rows, k)"""
+    n_rows = len(indptr) - 1
+    result = np.zeros((n_rows, len(centroids)), dtype=np.float32)
+    if not len(indices):
+        return result
+    
+    row_ids = np.repeat(np.arange(n_rows), np.diff(indptr))
+    products = centroids[:, indices] * data
+    for c in range(len(centroids)):
+        result[:, c] = np.bincount(row_ids, weights=products[c], minlength=n_rows)
+    return result
+
+def _assign_chunk(args) -> Tuple[np.ndarray, np.ndarray]:
+    """Label one chunk of rows (module level so worker processes can run it)"""
+    indptr, indices, data, centroids = args
+    sims = _similarities(indptr, indices, data, centroids)
+    return sims.argmax(axis=1), sims.max(axis=1)
+
+def _row_slice(indptr, indices, data, start, end):
+    """CSR arrays of rows [start, end) with a rebased indptr"""
+    lo, hi = indptr[start], indptr[end]
+    return indptr[start:end + 1] - lo, indices[lo:hi], data[lo:hi]
+
+class PatternDetector:
+    """
+    Spherical mini-batch k-means over TF-IDF vectors of job postings
+    
+    Centroids are updated from small random batches, so the cost of
+    fitting does not grow with the number of jobs; only the final
+    labelling pass touches every row, and it can be split across
+    processes.
+    """
+    
+    def __init__(self, n_clusters: Optional[int] = None, batch_size: int = 1024,
+                 n_iter: int = 60, workers: Optional[int] = None, seed: int = 42):
+        self.n_clusters = n_clusters or Config.PATTERN_CLUSTERS
+        self.batch_size = batch_size
+        self.n_iter = n_iter
+        self.workers = workers or Config.PATTERN_WORKERS
+        self.seed = seed
+    
+    def _init_centroids(self, indptr, indices, data, n_terms, k, rng) -> np.ndarray:
+        """k-means++ seeding on a random sample of rows"""
+        n_rows = len(indptr) - 1
+        sample = rng.choice(n_rows, size=min(n_rows, 20 * k + 200), replace=False)
+        sample.sort()
+        
+        def dense(row):
+            vector = np.zeros(n_terms, dtype=np.float32)
+            lo, hi = indptr[row], indptr[row + 1]
+            vector[indices[lo:hi]] = data[lo:hi]
+            return vector
+        
+        sub = [_row_slice(indptr, indices, data, row, row + 1) for row in sample]
+        sub_indptr = np.concatenate([[0], np.cumsum([len(s[1]) for s in sub])])
+        sub_indices = np.concatenate([s[1] for s in sub]) if sub else indices[:0]
+        sub_data = np.concatenate([s[2] for s in sub]) if sub else data[:0]
+        
+        centroids = [dense(sample[rng.randint(len(sample))])]
+        best = _similarities(sub_indptr, sub_indices, sub_data, np.array(centroids))[:, 0]
+        for _ in range(1, k):
+            distance = np.clip(1 - best, 0, None) ** 2
+            total = distance.sum()
+            pick = rng.choice(len(sample), p=distance / total) if total > 0 else rng.randint(len(sample))
+            centroids.append(dense(sample[pick]))
+            best = np.maximum(best, _similarities(sub_indptr, sub_indices, sub_data,
+                                                  centroids[-1][None, :])[:, 0])
+        return np.array(centroids, dtype=np.float32)
+    
+    def fit_predict(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                    n_terms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Cluster CSR rows
+        
+        Returns:
+            (labels, similarity to the assigned centroid, centroids)
+        """
+        n_rows = len(indptr) - 1
+        k = max(1, min(self.n_clusters, n_rows))
+        rng = np.random.RandomState(self.seed)
+        
+        centroids = self._init_centroids(indptr, indices, data, n_terms, k, rng)
+        counts = np.zeros(k, dtype=np.float64)
+        
+        for _ in range(self.n_iter):
+            batch = np.sort(rng.choice(n_rows, size=min(self.batch_size, n_rows), replace=False))
+            starts, ends = indptr[batch], indptr[batch + 1]
+            lengths = ends - starts
+            b_indptr = np.concatenate([[0], np.cumsum(lengths)])
+            positions = np.repeat(starts - b_indptr[:-1], lengths) + np.arange(b_indptr[-1])
+            b_indices, b_data = indices[positions], data[positions]
+            
+            labels = _similarities(b_indptr, b_indices, b_data, centroids).argmax(axis=1)
+            
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, (np.repeat(labels, lengths), b_indices), b_data)
+            members = np.bincount(labels, minlength=k).astype(np.float64)
+            
+            for c in np.flatnonzero(members):
+                counts[c] += members[c]
+                rate = members[c] / counts[c]
+                centroids[c] = (1 - rate) * centroids[c] + rate * (sums[c] / members[c])
+                centroids[c] /= max(np.linalg.norm(centroids[c]), 1e-12)
+        
+        labels, similarity = self.predict(indptr, indices, data, centroids)
+        return labels, similarity, centroids
+    
+    def predict(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                centroids: np.ndarray, chunk_size: int = 5000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Label every row, optionally across worker processes
+        
+        Returns:
+            (labels, similarity of each row to its centroid)
+        """
+        n_rows = len(indptr) - 1
+        chunks = [(*_row_slice(indptr, indices, data, start, min(start + chunk_size, n_rows)), centroids)
+                  for start in range(0, n_rows, chunk_size)]
+        
+        if self.workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(_assign_chunk, chunks))
+        else:
+            results = [_assign_chunk(chunk) for chunk in chunks]
+        
+        if not results:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        return (np.concatenate([labels for labels, _ in results]),
+                np.concatenate([sims for _, sims in results]))
+    
+    def detect(self, jobs: List[Dict], top_terms: int = 6,
+               counted: Optional[int] = None) -> List[PatternCluster]:
+        """
+        Cluster jobs into project patterns
+        
+        Args:
+            jobs: Job dictionaries
+            top_terms: Number of terms used to describe each cluster
+            counted: Only the first `counted` jobs are counted in sizes,
+                shares, skills, budgets and samples; the rest only shape
+                the clusters (default: all jobs)
+            
+        Returns:
+            Clusters with at least one counted job, largest first
+        """
+        if not jobs:
+            return []
+        
+        started = time.perf_counter()
+        indptr, indices, data, vocabulary = build_tfidf([_job_text(job) for job in jobs])
+        if not vocabulary:
+            return []
+        
+        labels, similarity, centroids = self.fit_predict(indptr, indices, data, len(vocabulary))
+        counted = len(jobs) if counted is None else min(counted, len(jobs))
+        
+        clusters = []
+        for c in range(len(centroids)):
+            members = np.flatnonzero(labels[:counted] == c)
+            if not len(members):
+                continue
+            
+            terms = [vocabulary[i] for i in np.argsort(-centroids[c])[:top_terms] if centroids[c][i] > 0]
+            
+            skills = Counter()
+            hourly, fixed = [], []
+            for i in members:
+                skills.update(canonicalize_skills(jobs[i].get('skills', [])))
+                budget = jobs[i].get('budget', '')
+                kind = budget_type(budget)
+                if kind:
+                    low, high = parse_budget(budget)
+                    (hourly if kind == 'hourly' else fixed).append((low + high) / 2)
+            
+            representative = members[np.argsort(-similarity[members])[:3]]
+            
+            clusters.append(PatternCluster(
+                label=' / '.join(terms[:3]) or 'misc',
+                size=int(len(members)),
+                share=round(len(members) / counted, 3),
+                top_terms=terms,
+                top_skills=skills.most_common(5),
+                median_hourly_rate=float(np.median(hourly)) if hourly else None,
+                median_fixed_budget=float(np.median(fixed)) if fixed else None,
+                sample_titles=[(jobs[i].get('title', '') or '')[:100] for i in representative]
+            ))
+        
+        clusters.sort(key=lambda cluster: cluster.size, reverse=True)
+        logger.info(f"🧩 Clustered {len(jobs)} jobs into {len(clusters)} patterns "
+                    f"covering {counted} jobs in {time.perf_counter() - started:.2f}s")
+        return clusters
+
+def detect_project_patterns(jobs: List[Dict], history: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Project patterns for a run, optionally including historical jobs
+    
+    Historical jobs only help shape the clusters; sizes and shares count
+    the run's own jobs, so they match the job total in the prompt.
+    
+    Returns:
+        Cluster summaries as dictionaries
+    """
+    try:
+        corpus = list(jobs)
+        seen = {job_fingerprint(job) for job in corpus}
+        for job in history or []:
+            job = as_dict(job)
+            fp = job_fingerprint(job)
+            if fp not in seen:
+                seen.add(fp)
+                corpus.append(job)
+        return [cluster.to_dict() for cluster in PatternDetector().detect(corpus, counted=len(jobs))]
+    except Exception as e:
+        logger.error(f"Pattern detection error: {e}")
+        return []
+
+def summarize_patterns(patterns: List[Dict]) -> str:
+    """Compact JSON of cluster summaries for the analysis prompt"""
+    return json.dumps([{
+        'pattern': p['label'],
+        'jobs': p['size'],
+        'share': p['share'],
+        'key_terms': p['top_terms'],
+        'top_skills': [f"{skill} ({count})" for skill, count in p['top_skills']],
+        'median_hourly_rate_usd': p.get('median_hourly_rate'),
+        'median_fixed_budget_usd': p.get('median_fixed_budget'),
+        'example_titles': p['sample_titles']
+    } for p in patterns], indent=2)
@@ -0,0 +1,236 @@
+"""
+Skill Co-occurrence
+Incremental skill pair counts and association rules
+"""
+
+import heapq
+import json
+from datetime import datetime
+from itertools import combinations
+from pathlib import Path
+from typing import List, Dict, Optional, Union
+from config import Config
+from utils.helpers import job_fingerprint, atomic_write_json, file_lock
+from utils.logger import logger
+from utils.skill_canonicalizer import canonicalize_skill, canonicalize_skills
+
+class SkillCooccurrence:
+    """
+    Sparse skill x skill co-occurrence matrix
+    
+    Rows are adjacency dicts (skill id -> {other id: jobs with both}), so
+    the matrix only stores pairs that actually occur and a skill's
+    neighbours are one dict away. Every posting's skill set is kept, so a
+    posting that is seen again, or changes its skills, is counted once.
+    
+    For a rule A -> B over N postings:
+        support    = n(A, B) / N
+        confidence = n(A, B) / n(A)
+        lift       = confidence / (n(B) / N)
+    """
+    
+    def __init__(self, store_file: Optional[Union[str, Path]] = None):
+        self.store_file = Path(store_file or Config.COOCCURRENCE_FILE)
+        self._loaded = False
+        self._reset()
+    
+    def _reset(self):
+        self.skills: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.counts: List[int] = []
+        self.pairs: Dict[int, Dict[int, int]] = {}
+        self.postings: Dict[str, List[int]] = {}
+    
+    def _ensure_loaded(self):
+        """Load the persisted matrix on first use"""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._reset()
+        
+        if not self.store_file.exists():
+            return
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading skill co-occurrence, starting fresh: {e}")
+            return
+        
+        self.skills = data.get('skills', [])
+        self._ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.counts = data.get('counts', [0] * len(self.skills))
+        self.postings = data.get('postings', {})
+        for a, b, count in data.get('pairs', []):
+            self.pairs.setdefault(a, {})[b] = count
+            self.pairs.setdefault(b, {})[a] = count
+    
+    def save(self):
+        """Write the matrix to disk (upper triangle only)"""
+        self._ensure_loaded()
+        atomic_write_json(self.store_file, {
+            'updated': datetime.now().isoformat(),
+            'total_jobs': self.total_jobs,
+            'skills': self.skills,
+            'counts': self.counts,
+            'pairs': [[a, b, count] for a, row in self.pairs.items() for b, count in row.items() if a < b],
+            'postings': self.postings
+        })
+    
+    @property
+    def total_jobs(self) -> int:
+        self._ensure_loaded()
+        return len(self.postings)
+    
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            skill_id = self._ids[skill] = len(self.skills)
+            self.skills.append(skill)
+            self.counts.append(0)
+        return skill_id
+    
+    def _apply(self, ids: List[int], delta: int):
+        """Add (or with delta=-1 remove) one posting's skill set"""
+        for skill_id in ids:
+            self.counts[skill_id] += delta
+        for a, b in combinations(ids, 2):
+            for x, y in ((a, b), (b, a)):
+                row = self.pairs.setdefault(x, {})
+                count = row.get(y, 0) + delta
+                if count > 0:
+                    row[y] = count
+                else:
+                    row.pop(y, None)
+    
+    def observe(self, jobs: List[Dict]) -> int:
+        """
+        Add a batch of jobs to the matrix
+        
+        Reposts marked with ``duplicate_of`` count as the posting they
+        duplicate.
+        
+        Returns:
+            Number of postings whose counts changed
+        """
+        self._ensure_loaded()
+        changed = 0
+        
+        for job in jobs:
+            key = job.get('duplicate_of') or job_fingerprint(job)
+            ids = sorted({self._skill_id(skill) for skill in canonicalize_skills(job.get('skills', []))})
+            previous = self.postings.get(key)
+            if previous == ids:
+                continue
+            if previous is not None:
+                self._apply(previous, -1)
+            self._apply(ids, 1)
+            self.postings[key] = ids
+            changed += 1
+        
+        return changed
+    
+    def update(self, jobs: List[Dict]) -> int:
+        """Observe a batch and persist it while holding the store lock"""
+        with file_lock(self.store_file):
+            self._loaded = False
+            changed = self.observe(jobs)
+            self.save()
+        return changed
+    
+    def clear(self):
+        """Forget every posting"""
+        self._loaded = True
+        self._reset()
+    
+    def count(self, skill: str) -> int:
+        """Number of postings requesting a skill"""
+        self._ensure_loaded()
+        skill_id = self._ids.get(canonicalize_skill(skill))
+        return self.counts[skill_id] if skill_id is not None else 0
+    
+    def _rule(self, a: int, b: int, together: int) -> Dict:
+        total = self.total_jobs
+        confidence = together / self.counts[a]
+        return {
+            'antecedent': self.skills[a],
+            'consequent': self.skills[b],
+            'jobs': together,
+            'support': round(together / total, 4),
+            'confidence': round(confidence, 3),
+            'lift': round(confidence * total / self.counts[b], 2)
+        }
+    
+    def related_skills(self, skill: str, k: int = 5, by: str = 'confidence',
+                       min_jobs: int = 2) -> List[Dict]:
+        """
+        Skills most often requested together with a skill
+        
+        Args:
+            skill: Query skill (any spelling)
+            k: Number of related skills
+            by: 'confidence', 'lift' or 'jobs'
+            min_jobs: Ignore pairs seen in fewer postings
+            
+        Returns:
+            Rules skill -> other, best first
+        """
+        self._ensure_loaded()
+        a = self._ids.get(canonicalize_skill(skill))
+        if a is None or not self.counts[a]:
+            return []
+        
+        rules = (self._rule(a, b, together) for b, together in self.pairs.get(a, {}).items()
+                 if together >= min_jobs)
+        return heapq.nlargest(k, rules, key=lambda rule: (rule[by], rule['jobs']))
+    
+    def rules(self, min_support: float = 0.01, min_confidence: float = 0.3,
+              min_lift: float = 1.0, k: int = 20) -> List[Dict]:
+        """
+        Association rules A -> B over all stored postings
+        
+        Returns:
+            Up to k rules, highest lift first
+        """
+        self._ensure_loaded()
+        total = self.total_jobs
+        if not total:
+            return []
+        
+        min_together = max(1, min_support * total)
+        candidates = []
+        for a, row in self.pairs.items():
+            for b, together in row.items():
+                if together < min_together or together / self.counts[a] < min_confidence:
+                    continue
+                rule = self._rule(a, b, together)
+                if rule['lift'] >= min_lift:
+                    candidates.append(rule)
+        
+        return heapq.nlargest(k, candidates, key=lambda rule: (rule['lift'], rule['jobs']))
+    
+    def summary(self, top: int = 10, k: int = 3) -> List[Dict]:
+        """
+        Related skills of the most requested skills, for prompts and reports
+        
+        Returns:
+            [{'skill', 'jobs', 'related': [rule, ...]}, ...]
+        """
+        self._ensure_loaded()
+        ranked = heapq.nlargest(top, range(len(self.skills)), key=self.counts.__getitem__)
+        return [{
+            'skill': self.skills[a],
+            'jobs': self.counts[a],
+            'related': self.related_skills(self.skills[a], k)
+        } for a in ranked if self.counts[a]]
+
+def format_associations(summary: List[Dict]) -> str:
+    """One line per skill: "RAG (120 jobs) -> LangChain 72%, Pinecone 40%" """
+    lines = []
+    for entry in summary:
+        if not entry['related']:
+            continue
+        related = ', '.join(f"{rule['consequent']} {rule['confidence']:.0%} (lift {rule['lift']})"
+                            for rule in entry['related'])
+        lines.append(f"{entry['skill']} ({entry['jobs']} jobs) -> {related}")
+    return '\n'.join(lines)
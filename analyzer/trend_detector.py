@@ -0,0 +1,234 @@
+"""
+Trend Detector
+Incremental daily time series for skills and budgets
+"""
+
+import json
+import math
+from datetime import date
+from pathlib import Path
+from typing import List, Dict, Optional, Union
+from config import Config
+from utils.helpers import parse_budget, atomic_write_json, file_lock
+from utils.logger import logger
+from utils.skill_canonicalizer import canonicalize_skills
+
+WINDOW_DAYS = 7
+
+def budget_type(budget: str) -> Optional[str]:
+    """'hourly', 'fixed' or None when the card shows no amount"""
+    low, high = parse_budget(budget)
+    if low is None:
+        return None
+    return 'hourly' if 'hour' in (budget or '').lower() else 'fixed'
+
+def _batch_sums(jobs: List[Dict]) -> Dict[str, List[float]]:
+    """Per-series [sum, n] for one batch"""
+    sums: Dict[str, List[float]] = {}
+    total = len(jobs)
+    
+    def add(key, value, n=1):
+        entry = sums.setdefault(key, [0.0, 0])
+        entry[0] += value
+        entry[1] += n
+    
+    for job in jobs:
+        # Skill series are shares: jobs requesting the skill / jobs seen
+        for skill in canonicalize_skills(job.get('skills', [])):
+            add(f"skill:{skill}", 1, 0)
+        
+        kind = budget_type(job.get('budget', ''))
+        if kind:
+            low, high = parse_budget(job['budget'])
+            add(f"budget:{kind}", (low + high) / 2)
+            add(f"category:{kind}", 1, 0)
+    
+    for key, entry in sums.items():
+        if key.startswith(('skill:', 'category:')):
+            entry[1] = total
+    return sums
+
+class TrendDetector:
+    """
+    Per-skill and per-category daily series with running statistics
+    
+    Each series keeps the open day's bucket (sum and n), the last two
+    weeks of closed daily values and an exponentially weighted mean and
+    variance. A run only touches each series once, so updating costs
+    O(series) no matter how much history exists:
+        
+        skill:<name>      share of the day's jobs requesting the skill
+        category:<type>   share of hourly / fixed-price jobs
+        budget:<type>     mean budget midpoint in USD
+    """
+    
+    def __init__(self, store_file: Optional[Union[str, Path]] = None,
+                 alpha: Optional[float] = None, z_threshold: Optional[float] = None):
+        self.store_file = Path(store_file or Config.TRENDS_FILE)
+        self.alpha = Config.TREND_EWMA_ALPHA if alpha is None else alpha
+        self.z_threshold = Config.TREND_Z_THRESHOLD if z_threshold is None else z_threshold
+        self.series: Optional[Dict[str, Dict]] = None
+    
+    def _load(self) -> Dict[str, Dict]:
+        """Load the series file"""
+        if not self.store_file.exists():
+            return {}
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('series', {})
+        except Exception as e:
+            logger.error(f"Error loading trends, starting fresh: {e}")
+            return {}
+    
+    def save(self):
+        """Write the series to disk"""
+        atomic_write_json(self.store_file, {'alpha': self.alpha, 'series': self.series or {}})
+    
+    def _close_day(self, entry: Dict):
+        """Fold the open bucket into history and the running statistics"""
+        if not entry['n']:
+            return
+        value = entry['sum'] / entry['n']
+        
+        history = entry['history']
+        history.append([entry['day'], value])
+        del history[:-2 * WINDOW_DAYS]
+        
+        if entry['ewma'] is None:
+            entry['ewma'] = value
+        else:
+            diff = value - entry['ewma']
+            entry['ewma'] += self.alpha * diff
+            entry['var'] = (1 - self.alpha) * (entry['var'] + self.alpha * diff * diff)
+    
+    def observe(self, jobs: List[Dict], day: Optional[str] = None):
+        """
+        Add one run's jobs to the series
+        
+        Args:
+            jobs: Jobs from one run
+            day: ISO date of the run (defaults to today)
+        """
+        if self.series is None:
+            self.series = self._load()
+        day = day or date.today().isoformat()
+        batch = _batch_sums(jobs)
+        
+        for key in set(self.series) | set(batch):
+            entry = self.series.get(key)
+            if entry is None:
+                entry = self.series[key] = {'day': day, 'sum': 0.0, 'n': 0, 'history': [],
+                                            'ewma': None, 'var': 0.0}
+            elif entry['day'] != day:
+                self._close_day(entry)
+                entry.update(day=day, sum=0.0, n=0)
+            
+            value_sum, n = batch.get(key, (0.0, 0))
+            # Skills absent from the run still saw the run's jobs
+            if key.startswith(('skill:', 'category:')) and not n:
+                n = len(jobs)
+            entry['sum'] += value_sum
+            entry['n'] += n
+    
+    def update(self, jobs: List[Dict], day: Optional[str] = None):
+        """Observe a run and persist it while holding the store lock"""
+        with file_lock(self.store_file):
+            self.series = self._load()
+            self.observe(jobs, day)
+            self.save()
+    
+    def _stats(self, key: str, entry: Dict) -> Optional[Dict]:
+        """Current value, week-over-week change and z-score of one series"""
+        if not entry['n']:
+            return None
+        current = entry['sum'] / entry['n']
+        
+        # This week: the open day plus the last six closed days
+        values = [value for _, value in entry['history']] + [current]
+        this_week = values[-WINDOW_DAYS:]
+        last_week = values[-2 * WINDOW_DAYS:-WINDOW_DAYS]
+        
+        mean = sum(this_week) / len(this_week)
+        previous = sum(last_week) / len(last_week) if last_week else None
+        
+        z = None
+        if entry['ewma'] is not None and len(entry['history']) >= 5 and entry['var'] > 0:
+            z = (current - entry['ewma']) / math.sqrt(entry['var'])
+        
+        kind, name = key.split(':', 1)
+        return {
+            'kind': kind,
+            'name': name,
+            'current': round(current, 4),
+            'week_mean': round(mean, 4),
+            'previous_week_mean': round(previous, 4) if previous is not None else None,
+            'change': round(mean - previous, 4) if previous is not None else None,
+            'ewma': round(entry['ewma'], 4) if entry['ewma'] is not None else None,
+            'z': round(z, 2) if z is not None else None,
+            'anomaly': z is not None and abs(z) >= self.z_threshold,
+            'days': len(entry['history']) + 1,
+            'series': [round(value, 4) for value in values]
+        }
+    
+    def report(self, top: int = 8, min_share: float = 0.02) -> Dict[str, List[Dict]]:
+        """
+        Ranked trends for prompts and reports
+        
+        Args:
+            top: Entries per list
+            min_share: Ignore skills below this share in both weeks
+            
+        Returns:
+            {'rising', 'falling', 'anomalies', 'budgets'}
+        """
+        if self.series is None:
+            self.series = self._load()
+        
+        skills, others = [], []
+        for key, entry in self.series.items():
+            stats = self._stats(key, entry)
+            if stats is None:
+                continue
+            if stats['kind'] != 'skill':
+                others.append(stats)
+            elif max(stats['week_mean'], stats['previous_week_mean'] or 0) >= min_share:
+                skills.append(stats)
+        
+        changed = [s for s in skills if s['change'] is not None]
+        return {
+            'rising': sorted((s for s in changed if s['change'] > 0),
+                             key=lambda s: s['change'], reverse=True)[:top],
+            'falling': sorted((s for s in changed if s['change'] < 0),
+                              key=lambda s: s['change'])[:top],
+            'anomalies': sorted((s for s in skills + others if s['anomaly']),
+                                key=lambda s: abs(s['z']), reverse=True)[:top],
+            'budgets': sorted(others, key=lambda s: (s['kind'], s['name']))
+        }
+
+def _describe(stats: Dict) -> str:
+    """One human-readable line per series"""
+    if stats['kind'] == 'budget':
+        text = f"{stats['name']} budget avg ${stats['week_mean']:,.0f}"
+        if stats['change'] is not None:
+            text += f" ({stats['change']:+,.0f} vs last week)"
+    else:
+        label = f"{stats['name']} jobs" if stats['kind'] == 'category' else stats['name']
+        text = f"{label} {stats['week_mean']:.1%} of jobs"
+        if stats['change'] is not None:
+            text += f" ({stats['change'] * 100:+.1f} pts vs last week)"
+    if stats['z'] is not None and stats['anomaly']:
+        text += f", today z={stats['z']:+.1f}"
+    return text
+
+def format_trends(report: Dict[str, List[Dict]]) -> str:
+    """Trend report as plain text lines grouped by list"""
+    if not report:
+        return ''
+    
+    blocks = []
+    for title, key in (('Rising', 'rising'), ('Falling', 'falling'),
+                       ('Unusual today', 'anomalies'), ('Budgets', 'budgets')):
+        entries = report.get(key) or []
+        if entries:
+            blocks.append(f"{title}:\n" + '\n'.join(f"- {_describe(s)}" for s in entries))
+    return '\n\n'.join(blocks)
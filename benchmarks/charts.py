@@ -0,0 +1,53 @@
+"""
+Chart Rendering Benchmark
+Report build time with an empty and a warm chart cache
+
+Run from the project root: python benchmarks/charts.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from reporter.charts import ChartRenderer
+from reporter.pdf_generator import JobReportPDF
+
+def benchmark_report(charts: int = 20) -> Dict[str, float]:
+    """
+    Time a report with `charts` charts, cold (empty cache) and warm
+    
+    Returns:
+        Seconds for each pass
+    """
+    rng = np.random.RandomState(0)
+    skills = [(f"Skill {i}", int(c)) for i, c in enumerate(sorted(rng.randint(5, 200, 15), reverse=True))]
+    budgets = rng.lognormal(6, 1, 500).tolist()
+    series = rng.rand(14).cumsum().tolist()
+    
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        renderer = ChartRenderer(tmp)
+        for label in ('cold', 'warm'):
+            started = time.perf_counter()
+            pdf = JobReportPDF()
+            pdf.add_page()
+            for i in range(charts):
+                if i % 3 == 0:
+                    pdf.add_chart(renderer.bar_chart(skills, f"Chart {i}"))
+                elif i % 3 == 1:
+                    pdf.add_chart(renderer.histogram(budgets, title=f"Chart {i}"))
+                else:
+                    pdf.add_sparkline_row(f"Skill {i}", renderer.sparkline(series), "+1.0 pts")
+            pdf.output(str(Path(tmp) / 'bench.pdf'))
+            timings[label] = time.perf_counter() - started
+    return timings
+
+if __name__ == "__main__":
+    result = benchmark_report()
+    print(f"📊 20-chart report: {result['cold'] * 1000:.0f} ms cold, {result['warm'] * 1000:.0f} ms cached")
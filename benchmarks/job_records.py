@@ -0,0 +1,67 @@
+"""
+Job Record Benchmark
+Memory of job dicts versus Job records
+
+Run from the project root: python benchmarks/job_records.py
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.job_record import SCRAPED_AT_FORMAT, jobs_from_dicts
+
+def benchmark_memory(count: int = 100_000) -> Dict[str, float]:
+    """
+    Compare the memory of job dicts and Job records with tracemalloc
+    
+    Dicts are built the way they arrive from json.load, where every
+    string is a separate object.
+    """
+    skills = ['Python', 'Machine Learning', 'LangChain', 'PyTorch', 'OpenAI API',
+              'Data Science', 'NLP', 'Computer Vision', 'AWS', 'Docker']
+    stamps = [time.strftime(SCRAPED_AT_FORMAT, time.localtime(time.time() - i * 3600)) for i in range(24)]
+    rows = json.dumps([{
+        'title': f'AI engineer needed #{i}',
+        'description': f'Build an ML pipeline for project {i}. ' * 4,
+        'skills': random.sample(skills, 5),
+        'budget': 'Hourly: $30.00 - $60.00',
+        'posted': '2 hours ago',
+        'scraped_at': stamps[i % len(stamps)]
+    } for i in range(count)])
+    
+    tracemalloc.start()
+    as_dicts = json.loads(rows)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    # Text is shared between both representations, so measure only what
+    # the records add on top of the strings they point to
+    tracemalloc.start()
+    records = jobs_from_dicts(as_dicts)
+    record_overhead = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    text_bytes = sum(sys.getsizeof(job['title']) + sys.getsizeof(job['description']) for job in as_dicts)
+    record_bytes = record_overhead + text_bytes
+    del records
+    
+    return {
+        'jobs': count,
+        'dict_mb': dict_bytes / 1024 / 1024,
+        'record_mb': record_bytes / 1024 / 1024,
+        'reduction_pct': 100 * (1 - record_bytes / dict_bytes)
+    }
+
+if __name__ == "__main__":
+    result = benchmark_memory()
+    print(f"📊 {result['jobs']:,} jobs: dicts {result['dict_mb']:.1f} MB, "
+          f"Job records {result['record_mb']:.1f} MB "
+          f"({result['reduction_pct']:.0f}% less)")
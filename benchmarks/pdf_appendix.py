@@ -0,0 +1,51 @@
+"""
+Job Appendix Benchmark
+Time and peak memory of the streaming appendix at several sizes
+
+Run from the project root: python benchmarks/pdf_appendix.py
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from reporter.pdf_appendix import write_job_appendix
+
+def _synthetic_jobs(n: int):
+    """Appendix rows with realistic field lengths"""
+    for i in range(n):
+        yield {'title': f"Build an AI assistant with retrieval over company documents #{i}",
+               'budget': f"Hourly: ${20 + i % 60}.00-${40 + i % 80}.00",
+               'skills': ['Python', 'LangChain', 'OpenAI API', 'Vector Database', 'FastAPI'],
+               'url': f"https://www.upwork.com/jobs/~01{i:016x}"}
+
+def benchmark(rows: int) -> Dict[str, float]:
+    """Time and peak RSS for one appendix of `rows` synthetic jobs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        filename = write_job_appendix(_synthetic_jobs(rows), Path(tmp) / 'appendix.pdf')
+        elapsed = time.perf_counter() - started
+        size = Path(filename).stat().st_size
+    return {'rows': rows, 'seconds': elapsed, 'mb': size / 1e6,
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming job appendix")
+    parser.add_argument('--rows', type=int, help='Run a single size in this process')
+    args = parser.parse_args()
+    
+    if args.rows:
+        r = benchmark(args.rows)
+        print(f"{r['rows']:>8} rows  {r['seconds']:6.2f}s  {r['mb']:7.1f} MB  peak RSS {r['peak_rss_mb']:6.1f} MB")
+    else:
+        # One process per size so each peak RSS is measured on its own
+        for rows in (1000, 10000, 100000):
+            subprocess.run([sys.executable, __file__, '--rows', str(rows)], check=True)
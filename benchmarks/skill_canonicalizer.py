@@ -0,0 +1,38 @@
+"""
+Skill Canonicalizer Benchmark
+Normalization throughput over common raw spellings
+
+Run from the project root: python benchmarks/skill_canonicalizer.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.skill_canonicalizer import canonicalize_skill
+
+def benchmark_throughput(count: int = 2_000_000) -> float:
+    """
+    Normalizations per second over a realistic mix of raw spellings
+    
+    Returns:
+        Throughput in lookups per second
+    """
+    variants = ['Machine Learning', 'machine learning', 'ML', 'Machine-Learning',
+                'Python', 'python', 'LangChain', 'langchain', 'NLP', 'OpenAI API',
+                'React.js', 'AWS', 'Data Labeling', 'data-labeling', 'Prompt Engineering']
+    batch = (variants * (count // len(variants) + 1))[:count]
+    
+    started = time.perf_counter()
+    for raw in batch:
+        canonicalize_skill(raw)
+    elapsed = time.perf_counter() - started
+    
+    return count / elapsed
+
+if __name__ == "__main__":
+    rate = benchmark_throughput()
+    print(f"⚡ {rate / 1e6:.1f}M skill normalizations/sec")
@@ -0,0 +1,114 @@
+"""
+SMTP Pool Benchmark
+Pooled sends versus one connection per message, against a local stand-in
+
+Run from the project root: python benchmarks/smtp_pool.py
+"""
+
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from reporter.smtp_pool import SMTPPool
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Local SMTP sink
+    
+    Accepts any mail without TLS or authentication. connect_delay stands
+    in for the TLS handshake and login of a real server; like real
+    servers it can drop a connection after `per_connection` messages.
+    """
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, connect_delay: float = 0.05, per_connection: Optional[int] = None):
+        self.connect_delay = connect_delay
+        self.per_connection = per_connection
+        self.received = 0
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accept every command and every message"""
+    
+    def handle(self):
+        time.sleep(self.server.connect_delay)
+        self.wfile.write(b'220 localhost ready\r\n')
+        delivered = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command in (b'EHLO', b'HELO'):
+                self.wfile.write(b'250 localhost\r\n')
+            elif command == b'DATA':
+                self.wfile.write(b'354 go ahead\r\n')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with self.server.lock:
+                    self.server.received += 1
+                self.wfile.write(b'250 queued\r\n')
+                delivered += 1
+                if self.server.per_connection and delivered >= self.server.per_connection:
+                    return
+            elif command == b'QUIT':
+                self.wfile.write(b'221 bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 ok\r\n')
+
+def benchmark(messages: int = 40, size: int = 4, connect_delay: float = 0.05,
+              per_connection: Optional[int] = None) -> dict:
+    """
+    Messages per second against a local stand-in, one connection per
+    message (the old behaviour) versus the pool
+    """
+    server = SMTPStandIn(connect_delay, per_connection)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    
+    def message(i):
+        msg = MIMEText(f"report {i}")
+        msg['From'], msg['To'], msg['Subject'] = 'bot@example.com', f"user{i}@example.com", 'Report'
+        return msg
+    
+    results = {}
+    try:
+        started = time.perf_counter()
+        for i in range(messages):
+            single = smtplib.SMTP(host, port)
+            single.send_message(message(i))
+            single.quit()
+        results['per_message'] = messages / (time.perf_counter() - started)
+        
+        pool = SMTPPool(host, port, user='', password='', size=size, use_tls=False)
+        started = time.perf_counter()
+        failures = pool.send_many([message(i) for i in range(messages)])
+        results['pooled'] = messages / (time.perf_counter() - started)
+        results['connections'] = pool.connects
+        results['failed'] = sum(1 for f in failures if f)
+        pool.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    results['received'] = server.received
+    return results
+
+if __name__ == "__main__":
+    for drop_after in (None, 5):
+        r = benchmark(per_connection=drop_after)
+        print(f"📧 server drops after {drop_after or 'no'} messages: "
+              f"per-message connections {r['per_message']:.1f} msg/s, "
+              f"pooled ({r['connections']} connections) {r['pooled']:.1f} msg/s, "
+              f"{r['failed']} failed, {r['received']} received")
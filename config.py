@@ -20,6 +20,21 @@ class Config:
     GMAIL_USER = os.getenv('GMAIL_USER')
     GMAIL_APP_PASSWORD = os.getenv('GMAIL_APP_PASSWORD')
     RECEIVER_EMAIL = os.getenv('RECEIVER_EMAIL')
+    RECEIVER_EMAILS = [a.strip() for a in (RECEIVER_EMAIL or '').split(',') if a.strip()]
+    SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 4))
+    SMTP_IDLE_SECONDS = float(os.getenv('SMTP_IDLE_SECONDS', 60))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_RETRY_SECONDS = float(os.getenv('OUTBOX_RETRY_SECONDS', 30))
+    OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', 30))
+    # A send claimed longer ago than this is taken to be interrupted and requeued
+    OUTBOX_CLAIM_TIMEOUT_SECONDS = float(os.getenv('OUTBOX_CLAIM_TIMEOUT_SECONDS', 600))
+    OUTBOX_DRAIN_SECONDS = float(os.getenv('OUTBOX_DRAIN_SECONDS', 60))
+    ATTACHMENT_MAX_MB = float(os.getenv('ATTACHMENT_MAX_MB', 15))
+    ATTACHMENT_CACHE_SIZE = int(os.getenv('ATTACHMENT_CACHE_SIZE', 8))
+    REPORT_BASE_URL = os.getenv('REPORT_BASE_URL', '').rstrip('/')
     
     # Scraping Settings
     SEARCH_QUERY = os.getenv('SEARCH_QUERY', 'AI and ML engineer')
@@ -31,17 +46,78 @@ class Config:
     SCHEDULE_TIME = os.getenv('SCHEDULE_TIME', '08:00')
     TIMEZONE = os.getenv('TIMEZONE', 'Asia/Kolkata')
     
+    # Watch Mode
+    WATCH_QUERIES = [q.strip() for q in os.getenv('WATCH_QUERIES', SEARCH_QUERY).split(',') if q.strip()]
+    WATCH_INTERVAL_MINUTES = float(os.getenv('WATCH_INTERVAL_MINUTES', 5))
+    WATCH_MIN_SCORE = float(os.getenv('WATCH_MIN_SCORE', 0.5))
+    TRIAGE_ENABLED = os.getenv('TRIAGE_ENABLED', 'true').lower() == 'true'
+    TRIAGE_BATCH_SIZE = int(os.getenv('TRIAGE_BATCH_SIZE', 20))
+    TRIAGE_MAX_WAIT_SECONDS = float(os.getenv('TRIAGE_MAX_WAIT_SECONDS', 2))
+    # Headroom for gemini-2.5-flash thinking tokens, which share the output cap
+    TRIAGE_OUTPUT_TOKENS = int(os.getenv('TRIAGE_OUTPUT_TOKENS', 4096))
+    
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
     
+    # Storage
+    STORAGE_FORMAT = os.getenv('STORAGE_FORMAT', 'json')  # 'json' or 'jsonl'
+    DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+    RAW_RETENTION_DAYS = int(os.getenv('RAW_RETENTION_DAYS', 30))
+    NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', 0.8))
+    
+    # Pattern Detection
+    PATTERN_CLUSTERS = int(os.getenv('PATTERN_CLUSTERS', 8))
+    PATTERN_WORKERS = int(os.getenv('PATTERN_WORKERS', 1))
+    PATTERN_HISTORY_DAYS = int(os.getenv('PATTERN_HISTORY_DAYS', 0))  # 0 = current run only
+    
+    # Trend Detection
+    TREND_EWMA_ALPHA = float(os.getenv('TREND_EWMA_ALPHA', 0.3))
+    TREND_Z_THRESHOLD = float(os.getenv('TREND_Z_THRESHOLD', 2.5))
+    
+    # Job Matching
+    TOP_MATCHES = int(os.getenv('TOP_MATCHES', 10))
+    
+    # Reports
+    REPORT_APPENDIX = os.getenv('REPORT_APPENDIX', 'true').lower() == 'true'
+    REPORT_FORMATS = [f.strip() for f in os.getenv('REPORT_FORMATS', 'pdf,html,markdown,json').split(',') if f.strip()]
+    RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+    
+    # Pipeline
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 4))
+    SCRAPE_TIMEOUT_SECONDS = float(os.getenv('SCRAPE_TIMEOUT_SECONDS', 1800))
+    ANALYSIS_TIMEOUT_SECONDS = float(os.getenv('ANALYSIS_TIMEOUT_SECONDS', 600))
+    STAGE_TIMEOUT_SECONDS = float(os.getenv('STAGE_TIMEOUT_SECONDS', 300))
+    RESUME_FAILED_RUNS = os.getenv('RESUME_FAILED_RUNS', 'true').lower() == 'true'
+    RESUME_MAX_AGE_HOURS = float(os.getenv('RESUME_MAX_AGE_HOURS', 12))
+    RUNS_RETENTION_DAYS = int(os.getenv('RUNS_RETENTION_DAYS', 14))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
     # Paths
     BASE_DIR = Path(__file__).parent
     DATA_DIR = BASE_DIR / 'data'
     RAW_DATA_DIR = DATA_DIR / 'raw'
     PROCESSED_DATA_DIR = DATA_DIR / 'processed'
     REPORTS_DIR = DATA_DIR / 'reports'
+    ARCHIVE_DIR = DATA_DIR / 'archive'
+    COLUMNAR_DIR = DATA_DIR / 'columnar'
+    NEAR_DUP_DIR = DATA_DIR / 'near_duplicates'
+    DEDUP_INDEX_FILE = DATA_DIR / 'dedup_index.json'
+    SEARCH_INDEX_FILE = DATA_DIR / 'search_index.db'
+    COOCCURRENCE_FILE = DATA_DIR / 'skill_cooccurrence.json'
+    TRENDS_FILE = DATA_DIR / 'trends.json'
     LOGS_DIR = BASE_DIR / 'logs'
+    PROFILE_FILE = Path(os.getenv('PROFILE_FILE', BASE_DIR / 'profile.json'))
+    WATCH_SEEN_FILE = DATA_DIR / 'watch_seen.json'
+    WATCH_LOG_FILE = DATA_DIR / 'watch_alerts.jsonl'
+    TRIAGE_CACHE_FILE = DATA_DIR / 'triage_cache.json'
+    CHART_CACHE_DIR = DATA_DIR / 'chart_cache'
+    FEATURES_DIR = DATA_DIR / 'features'
+    OUTBOX_FILE = DATA_DIR / 'outbox.db'
+    RUNS_DIR = DATA_DIR / 'runs'
+    METRICS_DIR = DATA_DIR / 'metrics'
+    # Point at node_exporter's --collector.textfile.directory to scrape it
+    METRICS_TEXTFILE = Path(os.getenv('METRICS_TEXTFILE', DATA_DIR / 'metrics' / 'upwork_analyzer.prom'))
     
     @classmethod
     def validate(cls):
@@ -66,7 +142,8 @@ class Config:
     def create_directories(cls):
         """Create necessary directories"""
         for dir_path in [cls.RAW_DATA_DIR, cls.PROCESSED_DATA_DIR, 
-                         cls.REPORTS_DIR, cls.LOGS_DIR]:
+                         cls.REPORTS_DIR, cls.ARCHIVE_DIR, cls.COLUMNAR_DIR,
+                         cls.LOGS_DIR]:
             dir_path.mkdir(parents=True, exist_ok=True)
 
 # Validate and create directories on import
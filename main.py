@@ -3,11 +3,13 @@ Upwork Job Analyzer - Main Application
 Production-ready automation with error handling
 """
 
+import argparse
 import schedule
 import time
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -15,10 +17,20 @@ sys.path.insert(0, str(Path(__file__).parent))
 from config import Config
 from utils.logger import logger
 from utils.database import db
+from utils.helpers import new_run_id
+from utils.pipeline import Pipeline, CONTINUE
+from utils.checkpoints import RunCheckpoints
+from utils.metrics import metrics
 from scraper.upwork_scraper import scrape_upwork_jobs
 from analyzer.gemini_analyzer import analyze_jobs_with_gemini
-from reporter.pdf_generator import generate_pdf_report
-from reporter.email_sender import send_email_report
+from analyzer.pattern_detector import detect_project_patterns
+from analyzer.job_scorer import FreelancerProfile, rank_jobs, rank_runs, format_matches
+from reporter.report_model import build_document, render_document
+from reporter.charts import chart_data
+from reporter.batch_renderer import report_name, backfill_reports
+from reporter.pdf_appendix import write_job_appendix
+from reporter.outbox import outbox, queue_email_report
+from scraper.job_watcher import watch_jobs
 
 class UpworkJobAnalyzer:
     """Main application class"""
@@ -28,11 +40,17 @@ class UpworkJobAnalyzer:
         logger.info("=" * 60)
         logger.info("🤖 Upwork Job Analyzer Initialized")
         logger.info("=" * 60)
+        
+        # Delivers queued reports, including ones left over from earlier runs
+        outbox.start()
     
-    def run_analysis(self) -> bool:
+    def run_analysis(self, resume: Optional[str] = None) -> bool:
         """
         Run complete analysis workflow
         
+        Args:
+            resume: Run ID to resume, or 'last' for the most recent failed run
+            
         Returns:
             True if successful, False otherwise
         """
@@ -41,72 +59,27 @@ class UpworkJobAnalyzer:
             logger.info(f"🚀 Starting Analysis - {datetime.now().strftime('%d %b %Y, %I:%M %p IST')}")
             logger.info(f"{'='*60}\n")
             
-            # Step 1: Scrape jobs
-            logger.info("📡 Step 1/5: Scraping Upwork...")
-            jobs = scrape_upwork_jobs(
-                self.config.SEARCH_QUERY,
-                self.config.PAGES_TO_SCRAPE
-            )
-            
-            if not jobs or len(jobs) == 0:
-                logger.warning("⚠️  No jobs found. Stopping analysis.")
+            checkpoints = self._checkpoints(resume)
+            if checkpoints is None:
                 return False
             
-            logger.info(f"✅ Found {len(jobs)} valid jobs\n")
-            
-            # Step 2: Save data
-            logger.info("💾 Step 2/5: Saving data...")
-            saved_file = db.save_jobs(jobs, 'raw')
-            if not saved_file:
-                logger.warning("⚠️  Failed to save data, continuing anyway...")
-            
-            # Step 3: Analyze with AI
-            logger.info("🧠 Step 3/5: Analyzing with Gemini AI...")
-            
-            # Get historical data for comparison
-            historical_data = db.get_historical_stats(days=7)
-            
-            analysis = analyze_jobs_with_gemini(jobs, historical_data)
-            
-            if not analysis:
+            mark = metrics.snapshot()
+            checkpoints.start(self.config.SEARCH_QUERY)
+            run = self._build_pipeline(checkpoints.run_id).run(checkpoints)
+            checkpoints.finish(run.ok)
+            RunCheckpoints.prune()
+            metrics.export(checkpoints.run_id, mark, {
+                'duration_seconds': run.seconds,
+                'success': run.ok,
+                'jobs': len(run['jobs'] or []),
+                'timestamp_seconds': time.time()
+            })
+            if not run.ok:
+                logger.info(f"💡 Resume with: python main.py --resume {checkpoints.run_id}")
                 logger.error("❌ Analysis failed")
                 return False
             
-            logger.info("✅ Analysis complete\n")
-            
-            # Preview
-            logger.info("📊 Analysis Preview:")
-            logger.info("-" * 60)
-            preview = analysis[:500].replace('\n', ' ')
-            logger.info(preview + "...")
-            logger.info("-" * 60 + "\n")
-            
-            # Step 4: Generate PDF
-            logger.info("📄 Step 4/5: Generating PDF report...")
-            
-            metadata = {
-                'total_jobs': len(jobs),
-                'pages': self.config.PAGES_TO_SCRAPE,
-                'valid_jobs': len(jobs),
-                'search_query': self.config.SEARCH_QUERY
-            }
-            
-            pdf_file = generate_pdf_report(analysis, len(jobs), metadata)
-            
-            if not pdf_file:
-                logger.warning("⚠️  PDF generation failed")
-            else:
-                logger.info(f"✅ PDF saved: {pdf_file}\n")
-            
-            # Step 5: Send email
-            logger.info("📧 Step 5/5: Sending email report...")
-            
-            email_sent = send_email_report(pdf_file, analysis, metadata)
-            
-            if email_sent:
-                logger.info("✅ Email sent successfully\n")
-            else:
-                logger.warning("⚠️  Email sending failed\n")
+            jobs, pdf_file, email_queued = run['jobs'], run['pdf'], run['email']
             
             # Success summary
             logger.info("=" * 60)
@@ -114,7 +87,7 @@ class UpworkJobAnalyzer:
             logger.info("=" * 60)
             logger.info(f"📊 Jobs analyzed: {len(jobs)}")
             logger.info(f"📄 Report: {pdf_file if pdf_file else 'N/A'}")
-            logger.info(f"📧 Email: {'Sent' if email_sent else 'Failed'}")
+            logger.info(f"📧 Email: {'Queued' if email_queued else 'Failed'}")
             logger.info(f"⏰ Time: {datetime.now().strftime('%I:%M:%S %p')}")
             logger.info("=" * 60 + "\n")
             
@@ -128,6 +101,171 @@ class UpworkJobAnalyzer:
             logger.error(f"❌ Analysis failed: {e}", exc_info=True)
             return False
     
+    def _checkpoints(self, resume: Optional[str] = None) -> Optional[RunCheckpoints]:
+        """
+        Checkpoints of the run to resume, or of a new run
+        
+        Without an explicit run, the most recent failed run for the same
+        query is resumed if it is recent enough (RESUME_FAILED_RUNS).
+        """
+        checkpoints = None
+        if resume:
+            if resume == 'last':
+                checkpoints = RunCheckpoints.latest_failed()
+            else:
+                checkpoints = RunCheckpoints(resume)
+            if checkpoints is None or not checkpoints.exists:
+                logger.error(f"❌ No run to resume ({resume})")
+                return None
+        elif self.config.RESUME_FAILED_RUNS:
+            checkpoints = RunCheckpoints.latest_failed(self.config.SEARCH_QUERY, self.config.RESUME_MAX_AGE_HOURS)
+        
+        if checkpoints is None:
+            return RunCheckpoints(new_run_id())
+        logger.info(f"♻️  Resuming run {checkpoints.run_id} "
+                    f"({len(checkpoints.completed)} stage(s) already done)")
+        return checkpoints
+    
+    def _build_pipeline(self, run_id: str) -> Pipeline:
+        """
+        The analysis as stages that start as soon as their inputs exist
+        
+        Each stage is named after what it produces and receives the
+        outputs it needs as keyword arguments. History loads while the
+        scrape runs; saving, statistics and local analytics run side by
+        side; the appendix renders during the Gemini call; the email is
+        built while the PDF renders. Checkpointed stages are restored
+        when a failed run is resumed, so the scrape and the Gemini call
+        are not repeated.
+        """
+        config = self.config
+        name = report_name({'run_id': run_id})
+        
+        def scraped():
+            logger.info("📡 Scraping Upwork...")
+            jobs = scrape_upwork_jobs(config.SEARCH_QUERY, config.PAGES_TO_SCRAPE)
+            if not jobs:
+                raise RuntimeError("no jobs found")
+            logger.info(f"✅ Found {len(jobs)} valid jobs")
+            return jobs
+        
+        def history():
+            # Earlier runs only: today's jobs are added to the corpus anyway
+            days = config.PATTERN_HISTORY_DAYS
+            return db.load_history(days - 1) if days > 1 else None
+        
+        def saved(jobs):
+            logger.info("💾 Saving data...")
+            saved_file = db.save_jobs(jobs, 'raw', query=config.SEARCH_QUERY)
+            if not saved_file:
+                logger.warning("⚠️  Failed to save data, continuing anyway...")
+            return saved_file
+        
+        def analysis(jobs, historical_data, patterns):
+            logger.info("🧠 Analyzing with Gemini AI...")
+            metrics.incr('jobs.analyzed', len(jobs))
+            # A Gemini error fails the run instead of checkpointing the
+            # fallback text, so resuming the run retries Gemini
+            result = analyze_jobs_with_gemini(jobs, historical_data, patterns, fallback=False)
+            if not result:
+                raise RuntimeError("no analysis returned")
+            logger.info("✅ Analysis complete")
+            return result
+        
+        def report(jobs, analysis, historical_data, matches, charts):
+            metadata = {
+                'total_jobs': len(jobs),
+                'pages': config.PAGES_TO_SCRAPE,
+                'valid_jobs': len(jobs),
+                'search_query': config.SEARCH_QUERY,
+                'skill_associations': (historical_data or {}).get('skill_associations', []),
+                'trends': (historical_data or {}).get('trends', {}),
+                'top_matches': matches,
+                'chart_data': charts
+            }
+            
+            # Stored so the report can be re-rendered (see `backfill`)
+            db.save_analysis(analysis, len(jobs), metadata, run_id)
+            
+            # Parsed once; every format renders from the same document
+            document = build_document(analysis, len(jobs), metadata)
+            
+            logger.info("📊 Analysis Preview:")
+            logger.info("-" * 60)
+            logger.info(document.preview())
+            logger.info("-" * 60 + "\n")
+            return metadata, document
+        
+        def pdf(report):
+            if 'pdf' not in config.REPORT_FORMATS:
+                return None
+            logger.info("📄 Generating PDF report...")
+            pdf_file = render_document(report[1], name, ['pdf']).get('pdf')
+            if not pdf_file:
+                raise RuntimeError("PDF generation failed")
+            logger.info(f"✅ PDF saved: {pdf_file}")
+            return pdf_file
+        
+        def outputs(report):
+            return render_document(report[1], name, [f for f in config.REPORT_FORMATS if f != 'pdf'])
+        
+        def appendix(jobs):
+            if not config.REPORT_APPENDIX:
+                return None
+            return write_job_appendix(jobs, config.REPORTS_DIR / f"{name}_appendix.pdf")
+        
+        def messages(analysis, report, outputs):
+            metadata, document = report
+            return outbox.sender.build_report_messages(analysis, metadata, document, outputs.get('html'))
+        
+        def email(analysis, report, outputs, pdf, appendix, messages):
+            # Delivered in the background, with retries
+            logger.info("📧 Queueing email report...")
+            metadata, document = report
+            queued = queue_email_report(pdf, analysis, metadata, document, outputs.get('html'),
+                                        appendix, send_key=run_id, messages=messages)
+            if queued:
+                logger.info("✅ Email queued for delivery")
+            else:
+                logger.warning("⚠️  Email queueing failed")
+            return queued
+        
+        def file_exists(path):
+            # A stored path is only reusable while the file is still there
+            return path is None or Path(path).exists()
+        
+        timeout = config.STAGE_TIMEOUT_SECONDS
+        return (Pipeline('analysis', config.PIPELINE_WORKERS)
+                .add('scraped', scraped, timeout=config.SCRAPE_TIMEOUT_SECONDS, checkpoint=True)
+                .add('history', history, timeout=timeout, on_error=CONTINUE)
+                .add('jobs', lambda scraped: db.collapse_near_duplicates(scraped), inputs=['scraped'],
+                     timeout=timeout, checkpoint=True)
+                .add('saved', saved, inputs=['jobs'], after=['history'], timeout=timeout, on_error=CONTINUE,
+                     checkpoint=bool)
+                .add('historical_data', lambda: db.get_historical_stats(days=7), after=['saved'],
+                     timeout=timeout, on_error=CONTINUE, default={}, checkpoint=True)
+                .add('patterns', lambda jobs, history: detect_project_patterns(jobs, history),
+                     inputs=['jobs', 'history'], timeout=timeout, on_error=CONTINUE, default=[], checkpoint=True)
+                .add('matches', rank_jobs, inputs=['jobs'], timeout=timeout, on_error=CONTINUE, default=[],
+                     checkpoint=True)
+                .add('charts', chart_data, inputs=['jobs'], timeout=timeout, on_error=CONTINUE, default={},
+                     checkpoint=True)
+                .add('compacted', lambda: db.compact_raw_data(), after=['historical_data', 'history'],
+                     timeout=timeout, on_error=CONTINUE, checkpoint=True)
+                .add('analysis', analysis, inputs=['jobs', 'historical_data', 'patterns'],
+                     timeout=config.ANALYSIS_TIMEOUT_SECONDS, checkpoint=True)
+                .add('appendix', appendix, inputs=['jobs'], timeout=timeout, on_error=CONTINUE,
+                     checkpoint=file_exists)
+                .add('report', report, inputs=['jobs', 'analysis', 'historical_data', 'matches', 'charts'],
+                     timeout=timeout)
+                .add('pdf', pdf, inputs=['report'], timeout=timeout, on_error=CONTINUE, checkpoint=file_exists)
+                .add('outputs', outputs, inputs=['report'], timeout=timeout, on_error=CONTINUE, default={},
+                     checkpoint=lambda paths: all(file_exists(path) for path in paths.values()))
+                .add('messages', messages, inputs=['analysis', 'report', 'outputs'],
+                     timeout=timeout, on_error=CONTINUE)
+                .add('email', email, inputs=['analysis', 'report', 'outputs', 'pdf', 'appendix', 'messages'],
+                     timeout=timeout, on_error=CONTINUE, default=False, checkpoint=bool))
+    
     def schedule_daily(self):
         """Schedule daily automatic runs"""
         schedule_time = self.config.SCHEDULE_TIME
@@ -164,11 +302,12 @@ class UpworkJobAnalyzer:
             print("2. Schedule daily automatic runs")
             print("3. View configuration")
             print("4. Test credentials")
-            print("5. Exit")
+            print("5. Watch for new jobs (instant alerts)")
+            print("6. Exit")
             print("\n" + "=" * 60)
             
             try:
-                choice = input("\nEnter choice (1-5): ").strip()
+                choice = input("\nEnter choice (1-6): ").strip()
                 
                 if choice == "1":
                     logger.info("\n🧪 Running test analysis...")
@@ -188,6 +327,10 @@ class UpworkJobAnalyzer:
                     self._test_credentials()
                 
                 elif choice == "5":
+                    watch_jobs()
+                
+                elif choice == "6":
+                    self._stop_outbox()
                     logger.info("\n👋 Goodbye!")
                     break
                 
@@ -195,6 +338,7 @@ class UpworkJobAnalyzer:
                     print("\n❌ Invalid choice. Please try again.")
             
             except KeyboardInterrupt:
+                self._stop_outbox()
                 logger.info("\n\n👋 Goodbye!")
                 break
             
@@ -202,12 +346,21 @@ class UpworkJobAnalyzer:
                 logger.error(f"\n❌ Error: {e}")
                 input("\nPress Enter to continue...")
     
+    def _stop_outbox(self):
+        """Deliver what is due, then stop; unsent mail is kept for the next start"""
+        outbox.flush(self.config.OUTBOX_DRAIN_SECONDS)
+        outbox.stop()
+        pending = outbox.status().get('pending', 0) + outbox.status().get('sending', 0)
+        if pending:
+            logger.info(f"📮 {pending} email(s) still queued, they will be sent on the next start")
+    
     def _show_config(self):
         """Display current configuration"""
         print("\n" + "=" * 60)
         print("⚙️  CURRENT CONFIGURATION")
         print("=" * 60)
         print(f"\n📧 Email: {self.config.GMAIL_USER}")
+        print(f"📬 Receivers: {', '.join(self.config.RECEIVER_EMAILS) or 'Not set'}")
         print(f"🔍 Search Query: {self.config.SEARCH_QUERY}")
         print(f"📄 Pages to Scrape: {self.config.PAGES_TO_SCRAPE}")
         print(f"⏰ Schedule Time: {self.config.SCHEDULE_TIME} {self.config.TIMEZONE}")
@@ -238,7 +391,7 @@ class UpworkJobAnalyzer:
         print("\n2️⃣ Testing Gmail SMTP...")
         try:
             import smtplib
-            server = smtplib.SMTP('smtp.gmail.com', 587)
+            server = smtplib.SMTP(self.config.SMTP_HOST, self.config.SMTP_PORT)
             server.starttls()
             server.login(self.config.GMAIL_USER, self.config.GMAIL_APP_PASSWORD)
             server.quit()
@@ -249,8 +402,156 @@ class UpworkJobAnalyzer:
         print("\n" + "=" * 60)
         input("\nPress Enter to continue...")
 
+def build_parser() -> argparse.ArgumentParser:
+    """Command line interface"""
+    parser = argparse.ArgumentParser(description="Upwork Job Analyzer")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Resume a failed analysis run ('last' for the most recent one) and exit")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    search = subparsers.add_parser('search', help='Search stored jobs')
+    search.add_argument('text', nargs='?', help='Full-text query over title and description')
+    search.add_argument('--skill', action='append', dest='skills', help='Required skill (repeatable)')
+    search.add_argument('--days', type=int, help='Only jobs scraped in the last N days')
+    search.add_argument('--min-budget', type=float, help='Minimum budget in USD')
+    search.add_argument('--max-budget', type=float, help='Maximum budget in USD')
+    search.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+    search.add_argument('--rank', action='store_true', help='Order text matches by relevance')
+    search.add_argument('--reindex', action='store_true', help='Rebuild the index from stored data first')
+    
+    compact = subparsers.add_parser('compact', help='Compact old raw snapshots into the columnar archive')
+    compact.add_argument('--retention-days', type=int, default=None,
+                         help=f'Keep snapshots newer than this as JSON (default: {Config.RAW_RETENTION_DAYS})')
+    
+    related = subparsers.add_parser('related', help='Skills most often requested together with a skill')
+    related.add_argument('skill', help='Skill name (any spelling)')
+    related.add_argument('-k', type=int, default=5, help='Number of related skills (default: 5)')
+    related.add_argument('--rebuild', action='store_true', help='Recount pairs from stored data first')
+    
+    match = subparsers.add_parser('match', help='Rank stored jobs against your freelancer profile')
+    match.add_argument('--profile', help=f'Profile JSON (default: {Config.PROFILE_FILE})')
+    match.add_argument('--days', type=int, default=None, help='Only the last N runs (default: all)')
+    match.add_argument('-k', type=int, default=Config.TOP_MATCHES,
+                       help=f'Number of matches (default: {Config.TOP_MATCHES})')
+    
+    watch = subparsers.add_parser('watch', help='Poll the newest jobs and alert on new matches')
+    watch.add_argument('--query', action='append', dest='queries',
+                       help='Search query to watch (repeatable, default: WATCH_QUERIES)')
+    watch.add_argument('--interval', type=float, default=None,
+                       help=f'Minutes between polls (default: {Config.WATCH_INTERVAL_MINUTES:g})')
+    watch.add_argument('--once', action='store_true', help='Poll once and exit')
+    
+    backfill = subparsers.add_parser('backfill', help='Re-render reports for every stored analysis')
+    backfill.add_argument('--days', type=int, default=None, help='Only analyses from the last N days')
+    backfill.add_argument('--workers', type=int, default=None,
+                          help=f'Worker processes (default: {Config.RENDER_WORKERS})')
+    
+    appendix = subparsers.add_parser('appendix', help='Write a PDF table of every stored job')
+    appendix.add_argument('--days', type=int, default=None, help='Only the last N runs (default: all)')
+    appendix.add_argument('--output', default=None, help='Output file (default: reports/job_appendix_<date>.pdf)')
+    
+    mail = subparsers.add_parser('outbox', help='Show or deliver queued emails')
+    mail.add_argument('--flush', action='store_true', help='Deliver everything due now, then exit')
+    
+    return parser
+
+def run_search(args: argparse.Namespace):
+    """Run the search subcommand"""
+    if args.reindex:
+        db.rebuild_search_index()
+    
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    
+    started = time.perf_counter()
+    results = db.search_jobs(
+        text=args.text,
+        skills=args.skills,
+        since=since,
+        min_budget=args.min_budget,
+        max_budget=args.max_budget,
+        limit=args.limit,
+        rank=args.rank
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"\n🔎 {len(results)} result(s) in {elapsed_ms:.1f} ms\n")
+    for i, job in enumerate(results, 1):
+        print(f"{i}. {job['title']}")
+        print(f"   💰 {job['budget'] or 'Not specified'} | 🕒 {job['scraped_at'] or 'N/A'}")
+        if job['skills']:
+            print(f"   🛠️  {', '.join(job['skills'][:8])}")
+
+def run_related(args: argparse.Namespace):
+    """Run the related subcommand"""
+    if args.rebuild:
+        db.rebuild_skill_graph()
+    
+    started = time.perf_counter()
+    rules = db.related_skills(args.skill, args.k)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"\n🔗 {len(rules)} skill(s) requested with {args.skill} ({elapsed_ms:.1f} ms)\n")
+    for i, rule in enumerate(rules, 1):
+        print(f"{i}. {rule['consequent']} - {rule['confidence']:.0%} of jobs "
+              f"({rule['jobs']} jobs, lift {rule['lift']})")
+
+def run_match(args: argparse.Namespace):
+    """Run the match subcommand"""
+    profile = FreelancerProfile.load(args.profile)
+    if profile is None:
+        print(f"❌ No profile found at {args.profile or Config.PROFILE_FILE}")
+        return
+    
+    runs = db.load_history_runs(args.days)
+    started = time.perf_counter()
+    matches = rank_runs(runs, args.k, profile)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"\n🎯 Top {len(matches)} of {sum(len(jobs) for _, jobs in runs)} stored jobs ({elapsed_ms:.0f} ms)\n")
+    print(format_matches(matches))
+
 def main():
     """Main entry point"""
+    args = build_parser().parse_args()
+    
+    if args.command == 'search':
+        run_search(args)
+        return
+    
+    if args.command == 'watch':
+        watch_jobs(args.queries, args.interval, 1 if args.once else None)
+        return
+    
+    if args.command == 'match':
+        run_match(args)
+        return
+    
+    if args.command == 'related':
+        run_related(args)
+        return
+    
+    if args.command == 'backfill':
+        reports = backfill_reports(args.days, args.workers)
+        print(f"📄 Re-rendered {sum(1 for r in reports if r)}/{len(reports)} reports")
+        return
+    
+    if args.command == 'appendix':
+        output = args.output or Config.REPORTS_DIR / f"job_appendix_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        started = time.perf_counter()
+        filename = write_job_appendix(db.iter_jobs(args.days), output)
+        print(f"📎 {filename or 'Appendix failed'} ({time.perf_counter() - started:.1f}s)")
+        return
+    
+    if args.command == 'outbox':
+        counts = outbox.flush() if args.flush else outbox.status()
+        print("📮 " + (', '.join(f"{status}: {count}" for status, count in sorted(counts.items())) or 'empty'))
+        return
+    
+    if args.command == 'compact':
+        compacted = db.compact_raw_data(args.retention_days)
+        print(f"🗜️  Compacted {compacted} jobs ({db.columnar.row_count()} in archive)")
+        return
+    
     try:
         # Validate configuration
         Config.validate()
@@ -258,6 +559,11 @@ def main():
         # Create analyzer instance
         analyzer = UpworkJobAnalyzer()
         
+        if args.resume:
+            success = analyzer.run_analysis(resume=args.resume)
+            analyzer._stop_outbox()
+            sys.exit(0 if success else 1)
+        
         # Run interactive menu
         analyzer.run_interactive()
     
@@ -0,0 +1,124 @@
+"""
+Email Attachments
+Encode each report file once and share it across messages
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from email import encoders
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from utils.logger import logger
+from utils.metrics import metrics
+
+class AttachmentCache:
+    """
+    Base64-encoded MIME parts keyed by content hash
+    
+    Encoding a report costs a read, a base64 pass and a copy a third
+    larger than the file. A part never changes once built and the email
+    generator only reads it, so one part can be attached to the message
+    of every receiver and to every retry. Files are hashed once per
+    (path, size, mtime); the least recently used parts are dropped once
+    more than `size` are held.
+    """
+    
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or Config.ATTACHMENT_CACHE_SIZE
+        self._parts: 'OrderedDict[str, MIMEBase]' = OrderedDict()
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def file_hash(self, path: str) -> str:
+        """Content hash of a file, recomputed only when the file changes"""
+        stat = Path(path).stat()
+        key = (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(block)
+            digest = self._hashes[key] = sha.hexdigest()
+        return digest
+    
+    def part(self, digest: str, name: str, load: Callable[[], bytes]) -> MIMEBase:
+        """
+        Encoded attachment part for content `digest`
+        
+        Args:
+            digest: sha256 of the content
+            name: Filename shown to the receiver
+            load: Returns the raw bytes, called only on a cache miss
+        """
+        with self._lock:
+            part = self._parts.get(digest)
+            if part is not None and part.get_filename() == name:
+                self._parts.move_to_end(digest)
+                self.hits += 1
+                metrics.incr('attachment_cache.hits')
+                return part
+        
+        part = MIMEBase('application', 'pdf' if name.lower().endswith('.pdf') else 'octet-stream')
+        part.set_payload(load())
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', 'attachment', filename=name)
+        
+        metrics.incr('attachment_cache.misses')
+        with self._lock:
+            self.misses += 1
+            self._parts[digest] = part
+            while len(self._parts) > self.size:
+                self._parts.popitem(last=False)
+        return part
+    
+    def file_part(self, path: str) -> MIMEBase:
+        """Encoded attachment part for a file on disk"""
+        return self.part(self.file_hash(path), Path(path).name, Path(path).read_bytes)
+    
+    def clear(self):
+        with self._lock:
+            self._parts.clear()
+            self._hashes.clear()
+
+# Global cache instance
+attachment_cache = AttachmentCache()
+
+def plan_attachments(files: List[str], max_mb: Optional[float] = None) -> Tuple[List[str], List[str]]:
+    """
+    Split report files into those to attach and those to leave out
+    
+    Files are taken in order while their total stays under the limit;
+    the rest are mentioned in the body (as links when REPORT_BASE_URL
+    is set) instead of being attached.
+    
+    Returns:
+        (files to attach, files left out)
+    """
+    limit = (Config.ATTACHMENT_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    attach, omitted, total = [], [], 0
+    for path in files:
+        size = Path(path).stat().st_size
+        if total + size <= limit:
+            attach.append(path)
+            total += size
+        else:
+            omitted.append(path)
+            logger.warning(f"⚠️  {Path(path).name} ({size / 1048576:.1f} MB) exceeds the "
+                           f"attachment limit, linking it instead")
+    return attach, omitted
+
+def omitted_note(files: List[str]) -> str:
+    """Body text pointing at files too large to attach"""
+    lines = ["📎 Some report files were too large to attach:"]
+    for path in files:
+        name = Path(path).name
+        size = Path(path).stat().st_size / 1048576
+        where = f"{Config.REPORT_BASE_URL}/{name}" if Config.REPORT_BASE_URL else str(Path(path).resolve())
+        lines.append(f"   - {name} ({size:.1f} MB): {where}")
+    return '\n'.join(lines)
@@ -0,0 +1,109 @@
+"""
+Batch Report Renderer
+Renders many PDF reports in parallel worker processes
+"""
+
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional
+from config import Config
+from utils.helpers import new_run_id
+from utils.logger import logger
+
+# One generator per worker process, created by the pool initializer
+_worker_generator = None
+
+def _init_worker():
+    """Build the generator once and warm fonts, so no task pays for it"""
+    global _worker_generator
+    from reporter.charts import _font
+    from reporter.pdf_generator import PDFReportGenerator, JobReportPDF
+    
+    _worker_generator = PDFReportGenerator()
+    for size in (18, 20, 24):
+        _font(size)
+    pdf = JobReportPDF()
+    pdf.alias_nb_pages()
+    pdf.add_page()
+    pdf.chapter_title("Warm-up")
+    pdf.chapter_body("Warm-up")
+    pdf.output()
+
+def _render(payload: Dict) -> Optional[str]:
+    """Render one payload in the current process"""
+    if _worker_generator is None:
+        _init_worker()
+    return _worker_generator.generate_report(
+        payload.get('analysis', ''),
+        payload.get('job_count', 0),
+        payload.get('metadata'),
+        payload['name']
+    )
+
+def report_name(payload: Dict) -> str:
+    """File name for a payload: run id plus an optional label such as the query"""
+    name = f"upwork_report_{payload.get('run_id') or new_run_id()}"
+    label = payload.get('label')
+    if label:
+        name += '_' + re.sub(r'[^a-z0-9]+', '-', str(label).lower()).strip('-')[:40]
+    return name
+
+def render_reports(payloads: List[Dict], workers: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Render one report per payload
+    
+    Each payload is what `JobDatabase.save_analysis` stores: 'analysis',
+    'job_count', 'metadata' and optionally 'run_id', 'label' (query or
+    recipient profile) and 'name'. Names are made unique within the
+    batch so parallel workers never write the same file.
+    
+    Args:
+        payloads: Analysis payloads
+        workers: Worker processes (default: Config.RENDER_WORKERS)
+        
+    Returns:
+        Report filename per payload, in order (None where rendering failed)
+    """
+    if not payloads:
+        return []
+    
+    workers = max(1, min(workers or Config.RENDER_WORKERS, len(payloads)))
+    
+    taken = set()
+    tasks = []
+    for payload in payloads:
+        name = base = payload.get('name') or report_name(payload)
+        suffix = 1
+        while name in taken:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        taken.add(name)
+        tasks.append({**payload, 'name': name})
+    
+    started = time.perf_counter()
+    try:
+        if workers == 1:
+            results = [_render(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                results = list(pool.map(_render, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    except Exception as e:
+        logger.error(f"Batch rendering error: {e}")
+        return [None] * len(payloads)
+    
+    elapsed = time.perf_counter() - started
+    done = sum(1 for result in results if result)
+    logger.info(f"📄 Rendered {done}/{len(tasks)} reports with {workers} worker(s) in {elapsed:.1f}s "
+                f"({done / elapsed if elapsed else 0:.1f} reports/s)")
+    return results
+
+def backfill_reports(days: Optional[int] = None, workers: Optional[int] = None) -> List[Optional[str]]:
+    """Re-render every stored analysis (last N days when given)"""
+    from utils.database import db
+    
+    payloads = db.load_analyses(days)
+    if not payloads:
+        logger.warning("No stored analyses to render")
+        return []
+    return render_reports(payloads, workers)
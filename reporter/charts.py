@@ -0,0 +1,187 @@
+"""
+Report Charts
+Bar charts, histograms and sparklines rendered with Pillow
+"""
+
+import hashlib
+import io
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from config import Config
+from analyzer.trend_detector import budget_type
+from utils.helpers import parse_budget, atomic_write_bytes
+from utils.metrics import metrics
+from utils.skill_canonicalizer import canonicalize_skills
+
+# Bump when the drawing code changes so cached images are not reused
+CHART_STYLE_VERSION = 2
+
+BLUE = (0, 102, 204)
+GREY = (100, 100, 100)
+TEXT = (50, 50, 50)
+RED = (204, 51, 51)
+
+@lru_cache(maxsize=16)
+def _font(size: int):
+    """Default font at a size (bitmap fallback on old Pillow)"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def _money(value: float) -> str:
+    return f"${value / 1000:.1f}k" if value >= 1000 else f"${value:.0f}"
+
+def chart_data(jobs: List[Dict], top: int = 15) -> Dict:
+    """
+    Statistics the report charts are drawn from
+    
+    Returns:
+        {'skill_counts': [(skill, count)], 'hourly_rates': [...], 'fixed_budgets': [...]}
+    """
+    counts: Dict[str, int] = {}
+    hourly, fixed = [], []
+    
+    for job in jobs:
+        for skill in canonicalize_skills(job.get('skills', [])):
+            counts[skill] = counts.get(skill, 0) + 1
+        
+        budget = job.get('budget', '')
+        kind = budget_type(budget)
+        if kind:
+            low, high = parse_budget(budget)
+            (hourly if kind == 'hourly' else fixed).append((low + high) / 2)
+    
+    return {
+        'skill_counts': sorted(counts.items(), key=lambda x: x[1], reverse=True)[:top],
+        'hourly_rates': hourly,
+        'fixed_budgets': fixed
+    }
+
+class ChartRenderer:
+    """
+    Renders charts to PNG files named by a hash of their input
+    
+    The hash covers the chart kind, data, size and style version, so an
+    unchanged chart (in a re-rendered report, or repeated across
+    reports) is a file lookup instead of a redraw.
+    """
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        self.cache_dir = Path(cache_dir or Config.CHART_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+    
+    def _cached(self, kind: str, payload: Dict, draw) -> Path:
+        """Return the cached image for payload, drawing it on a miss"""
+        key = hashlib.sha1(
+            json.dumps([CHART_STYLE_VERSION, kind, payload], sort_keys=True, default=float).encode('utf-8')
+        ).hexdigest()[:20]
+        path = self.cache_dir / f"{kind}_{key}.png"
+        
+        if path.exists():
+            self.hits += 1
+            metrics.incr('chart_cache.hits')
+            return path
+        
+        buffer = io.BytesIO()
+        draw().quantize(colors=32, method=Image.Quantize.FASTOCTREE).save(buffer, 'PNG', optimize=True)
+        atomic_write_bytes(path, buffer.getvalue())
+        self.misses += 1
+        metrics.incr('chart_cache.misses')
+        return path
+    
+    def bar_chart(self, items: Sequence[Tuple[str, float]], title: str = '',
+                  width: int = 1000, bar_height: int = 34) -> Path:
+        """Horizontal bar chart, largest first as given"""
+        items = [(str(label), float(value)) for label, value in items]
+        
+        def draw():
+            top = 60 if title else 16
+            height = top + bar_height * max(len(items), 1) + 16
+            image = Image.new('RGB', (width, height), 'white')
+            canvas = ImageDraw.Draw(image)
+            font, title_font = _font(20), _font(24)
+            
+            if title:
+                canvas.text((16, 16), title, fill=TEXT, font=title_font)
+            
+            label_width = 300
+            peak = max((value for _, value in items), default=0) or 1
+            span = width - label_width - 110
+            for i, (label, value) in enumerate(items):
+                y = top + i * bar_height
+                canvas.text((16, y + 6), label[:28], fill=TEXT, font=font)
+                length = max(2, int(span * value / peak))
+                canvas.rectangle([label_width, y + 4, label_width + length, y + bar_height - 6], fill=BLUE)
+                canvas.text((label_width + length + 10, y + 6), f"{value:g}", fill=GREY, font=font)
+            return image
+        
+        return self._cached('bar', {'items': items, 'title': title, 'width': width, 'bar': bar_height}, draw)
+    
+    def histogram(self, values: Sequence[float], bins: int = 12, title: str = '',
+                  width: int = 1000, height: int = 380) -> Path:
+        """Histogram of money values; the top 2% is folded into the last bin"""
+        values = np.asarray(values, dtype=np.float64)
+        
+        def draw():
+            image = Image.new('RGB', (width, height), 'white')
+            canvas = ImageDraw.Draw(image)
+            font, title_font = _font(18), _font(24)
+            if title:
+                canvas.text((16, 16), title, fill=TEXT, font=title_font)
+            if not len(values):
+                return image
+            
+            upper = float(np.percentile(values, 98)) if len(values) > 10 else float(values.max())
+            lower = float(values.min())
+            counts, edges = np.histogram(np.clip(values, lower, upper), bins=bins,
+                                         range=(lower, upper if upper > lower else lower + 1))
+            
+            left, right, top, bottom = 60, width - 30, 70, height - 50
+            slot = (right - left) / bins
+            peak = counts.max() or 1
+            for i, count in enumerate(counts):
+                x0 = left + i * slot + 3
+                y0 = bottom - (bottom - top) * count / peak
+                canvas.rectangle([x0, y0, x0 + slot - 6, bottom], fill=BLUE)
+                if count:
+                    canvas.text((x0 + 2, y0 - 22), str(int(count)), fill=GREY, font=font)
+            
+            canvas.line([left, bottom, right, bottom], fill=GREY, width=2)
+            for i in (0, bins // 2, bins):
+                label = _money(edges[i]) + ('+' if i == bins and values.max() > upper else '')
+                canvas.text((left + i * slot - 20, bottom + 10), label, fill=GREY, font=font)
+            return image
+        
+        payload = {'values': values.round(2).tolist(), 'bins': bins, 'title': title, 'size': [width, height]}
+        return self._cached('hist', payload, draw)
+    
+    def sparkline(self, values: Sequence[float], width: int = 300, height: int = 60) -> Path:
+        """Small trend line with the last point marked"""
+        values = [float(v) for v in values]
+        
+        def draw():
+            image = Image.new('RGB', (width, height), 'white')
+            canvas = ImageDraw.Draw(image)
+            if len(values) < 2:
+                return image
+            
+            low, high = min(values), max(values)
+            spread = (high - low) or 1.0
+            pad = 6
+            points = [(pad + i * (width - 2 * pad) / (len(values) - 1),
+                       height - pad - (value - low) * (height - 2 * pad) / spread)
+                      for i, value in enumerate(values)]
+            
+            canvas.line(points, fill=BLUE, width=3)
+            x, y = points[-1]
+            colour = BLUE if values[-1] >= values[0] else RED
+            canvas.ellipse([x - 5, y - 5, x + 5, y + 5], fill=colour)
+            return image
+        
+        return self._cached('spark', {'values': [round(v, 6) for v in values], 'size': [width, height]}, draw)
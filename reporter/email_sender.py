@@ -6,12 +6,14 @@ Production-ready email sending with retry logic
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from config import Config
+from analyzer.job_scorer import format_matches
+from reporter.attachments import attachment_cache, omitted_note, plan_attachments
+from reporter.report_model import ReportDocument
+from reporter.smtp_pool import SMTPPool
 from utils.logger import logger
 
 class EmailSender:
@@ -19,56 +21,84 @@ class EmailSender:
     
     def __init__(self):
         self.config = Config
+        self.pool = SMTPPool()
     
     def send_report(self, pdf_file: str, analysis_text: str, 
-                   metadata: Optional[dict] = None) -> bool:
+                   metadata: Optional[dict] = None, document: Optional[ReportDocument] = None,
+                   html_file: Optional[str] = None, appendix_file: Optional[str] = None) -> bool:
         """
-        Send email with PDF report
+        Send email with PDF report to every receiver
         
         Args:
             pdf_file: Path to PDF file
             analysis_text: Analysis summary
             metadata: Additional metadata
+            document: Parsed report, used for the preview
+            html_file: Rendered HTML report, sent as the rich body
+            appendix_file: Job appendix PDF, attached after the report
             
         Returns:
-            True if successful, False otherwise
+            True if every receiver got it, False otherwise
         """
         try:
             logger.info("📧 Preparing email...")
             
-            # Create message
-            msg = self._create_message(analysis_text, metadata)
-            
-            # Attach PDF
-            if pdf_file and Path(pdf_file).exists():
-                self._attach_pdf(msg, pdf_file)
-            else:
-                logger.warning("⚠️  PDF file not found, sending without attachment")
+            attachments, omitted = plan_attachments(self.report_attachments(pdf_file, appendix_file))
+            messages = self.build_report_messages(analysis_text, metadata, document, html_file, omitted)
+            for msg in messages:
+                for attachment in attachments:
+                    self._attach_pdf(msg, attachment)
             
             # Send email
-            self._send_email(msg)
+            if not self._send_all(messages):
+                return False
             
-            logger.info("✅ Email sent successfully")
+            logger.info(f"✅ Email sent successfully to {len(messages)} receiver(s)")
             return True
         
         except Exception as e:
             logger.error(f"Email sending error: {e}")
             return False
     
-    def _create_message(self, analysis_text: str, metadata: Optional[dict]) -> MIMEMultipart:
+    def build_report_messages(self, analysis_text: str, metadata: Optional[dict] = None,
+                              document: Optional[ReportDocument] = None,
+                              html_file: Optional[str] = None,
+                              omitted: Optional[List[str]] = None) -> List[MIMEMultipart]:
+        """One report message per receiver (without attachments), so each gets a personal copy"""
+        preview = document.preview() if document else analysis_text[:500].strip() + "..."
+        body = self._create_body(preview, metadata, omitted)
+        html = Path(html_file).read_text(encoding='utf-8') if html_file and Path(html_file).exists() else None
+        return [self._create_message(body, html, receiver)
+                for receiver in self.config.RECEIVER_EMAILS]
+    
+    def report_attachments(self, pdf_file: Optional[str], appendix_file: Optional[str] = None) -> List[str]:
+        """Existing report files to attach, report first"""
+        if not (pdf_file and Path(pdf_file).exists()):
+            logger.warning("⚠️  PDF file not found, sending without attachment")
+        return [f for f in (pdf_file, appendix_file) if f and Path(f).exists()]
+    
+    def _create_message(self, body_text: str, html: Optional[str] = None,
+                        receiver: Optional[str] = None) -> MIMEMultipart:
         """Create email message"""
         msg = MIMEMultipart()
         msg['From'] = self.config.GMAIL_USER
-        msg['To'] = self.config.RECEIVER_EMAIL
+        msg['To'] = receiver or self.config.RECEIVER_EMAIL
         msg['Subject'] = f"🤖 Upwork Job Analysis - {datetime.now().strftime('%d %b %Y')}"
         
-        # Email body
-        body = self._create_body(analysis_text, metadata)
-        msg.attach(MIMEText(body, 'plain'))
+        # Email body, with the HTML report as the rich alternative when there is one
+        body = MIMEText(body_text, 'plain')
+        if html:
+            alternative = MIMEMultipart('alternative')
+            alternative.attach(body)
+            alternative.attach(MIMEText(html, 'html'))
+            msg.attach(alternative)
+        else:
+            msg.attach(body)
         
         return msg
     
-    def _create_body(self, analysis_text: str, metadata: Optional[dict]) -> str:
+    def _create_body(self, preview: str, metadata: Optional[dict],
+                     omitted: Optional[List[str]] = None) -> str:
         """Create email body"""
         body = f"""
 Hi,
@@ -80,7 +110,7 @@ SUMMARY
 {'='*60}
 
 Date: {datetime.now().strftime('%d %B %Y, %I:%M %p IST')}
-Search Query: {self.config.SEARCH_QUERY}
+Search Query: {(metadata or {}).get('search_query') or self.config.SEARCH_QUERY}
 """
         
         if metadata:
@@ -91,12 +121,20 @@ Search Query: {self.config.SEARCH_QUERY}
         body += "PREVIEW\n"
         body += f"{'='*60}\n\n"
         
-        # Add preview of analysis (first 500 chars)
-        preview = analysis_text[:500].strip()
-        body += preview + "...\n\n"
+        body += preview + "\n\n"
+        
+        matches = (metadata or {}).get('top_matches')
+        if matches:
+            body += f"{'='*60}\n"
+            body += "TOP MATCHES FOR YOUR PROFILE\n"
+            body += f"{'='*60}\n\n"
+            body += format_matches(matches[:5]) + "\n\n"
         
         body += f"{'='*60}\n\n"
-        body += "📎 Full detailed report is attached as PDF.\n\n"
+        if omitted:
+            body += omitted_note(omitted) + "\n\n"
+        else:
+            body += "📎 Full detailed report is attached as PDF.\n\n"
         body += "Best regards,\n"
         body += "Your Upwork Job Analyzer Bot\n"
         body += f"\n{'='*60}\n"
@@ -104,55 +142,84 @@ Search Query: {self.config.SEARCH_QUERY}
         
         return body
     
-    def _attach_pdf(self, msg: MIMEMultipart, pdf_file: str):
-        """Attach PDF to email"""
-        try:
-            with open(pdf_file, 'rb') as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
+    def send_alert(self, job: dict) -> bool:
+        """
+        Send a short alert for one new job
+        
+        Args:
+            job: Job dictionary
             
-            encoders.encode_base64(part)
+        Returns:
+            True if every receiver got it, False otherwise
+        """
+        try:
+            body = f"{job.get('title', '')}\n\n"
+            if job.get('triage'):
+                body += f"Verdict: {job['triage']['verdict'].upper()} - {job['triage']['reason']}\n"
+            body += f"Budget: {job.get('budget', 'Not specified')}\n"
+            body += f"Posted: {job.get('posted', 'Unknown')}\n"
+            if job.get('match_score') is not None:
+                body += f"Match score: {job['match_score']:.2f}\n"
+            if job.get('skills'):
+                body += f"Skills: {', '.join(job['skills'][:10])}\n"
+            if job.get('url'):
+                body += f"\n{job['url']}\n"
+            body += f"\n{job.get('description', '')[:600]}\n"
             
-            filename = Path(pdf_file).name
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename= {filename}'
-            )
+            messages = []
+            for receiver in self.config.RECEIVER_EMAILS:
+                msg = MIMEMultipart()
+                msg['From'] = self.config.GMAIL_USER
+                msg['To'] = receiver
+                msg['Subject'] = f"🔔 New Upwork job: {job.get('title', '')[:80]}"
+                msg.attach(MIMEText(body, 'plain'))
+                messages.append(msg)
             
-            msg.attach(part)
-            logger.info(f"✅ PDF attached: {filename}")
+            return self._send_all(messages)
         
         except Exception as e:
-            logger.error(f"Error attaching PDF: {e}")
+            logger.error(f"Alert sending error: {e}")
+            return False
     
-    def _send_email(self, msg: MIMEMultipart):
-        """Send email via SMTP"""
+    def _attach_pdf(self, msg: MIMEMultipart, pdf_file: str):
+        """Attach PDF to email (encoded once, shared by every message)"""
         try:
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            
-            server.login(
-                self.config.GMAIL_USER,
-                self.config.GMAIL_APP_PASSWORD
-            )
-            
-            server.send_message(msg)
-            server.quit()
+            msg.attach(attachment_cache.file_part(pdf_file))
+            logger.info(f"✅ PDF attached: {Path(pdf_file).name}")
         
-        except smtplib.SMTPAuthenticationError:
-            logger.error("❌ SMTP Authentication failed. Check Gmail App Password")
-            raise
-        except smtplib.SMTPException as e:
-            logger.error(f"❌ SMTP error: {e}")
-            raise
         except Exception as e:
-            logger.error(f"❌ Email sending error: {e}")
-            raise
+            logger.error(f"Error attaching PDF: {e}")
+    
+    def _send_all(self, messages: List[MIMEMultipart]) -> bool:
+        """Send messages concurrently over pooled connections"""
+        if not messages:
+            logger.error("❌ No receivers configured (RECEIVER_EMAIL)")
+            return False
+        
+        failures = self.pool.send_many(messages)
+        for msg, error in zip(messages, failures):
+            if error is not None:
+                self.log_error(error, msg['To'])
+        return not any(failures)
+    
+    def log_error(self, error: Exception, receiver: str):
+        """Log a failed delivery"""
+        if isinstance(error, smtplib.SMTPAuthenticationError):
+            logger.error("❌ SMTP Authentication failed. Check Gmail App Password")
+        elif isinstance(error, smtplib.SMTPException):
+            logger.error(f"❌ SMTP error for {receiver}: {error}")
+        else:
+            logger.error(f"❌ Email sending error for {receiver}: {error}")
 
 # Global sender instance
 email_sender = EmailSender()
 
 def send_email_report(pdf_file: str, analysis_text: str, 
-                     metadata: Optional[dict] = None) -> bool:
+                     metadata: Optional[dict] = None, document: Optional[ReportDocument] = None,
+                     html_file: Optional[str] = None, appendix_file: Optional[str] = None) -> bool:
     """Main email sending function"""
-    return email_sender.send_report(pdf_file, analysis_text, metadata)
+    return email_sender.send_report(pdf_file, analysis_text, metadata, document, html_file, appendix_file)
+
+def send_job_alert(job: dict) -> bool:
+    """Per-job alert function"""
+    return email_sender.send_alert(job)
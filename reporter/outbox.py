@@ -0,0 +1,344 @@
+"""
+Email Outbox
+Durable SQLite queue with background delivery and retries
+"""
+
+import hashlib
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from email import message_from_bytes
+from email.message import Message
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import List, Dict, Optional, Union
+from config import Config
+from reporter.attachments import attachment_cache, plan_attachments
+from utils.logger import logger
+from utils.metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    send_id TEXT PRIMARY KEY,       -- idempotency key, also the Message-ID
+    kind TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    message BLOB NOT NULL,          -- MIME message without attachments
+    attachments TEXT NOT NULL,      -- attachment hashes, newline separated
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_ts REAL NOT NULL,
+    claimed_ts REAL,
+    created_ts REAL NOT NULL,
+    sent_ts REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_ts);
+
+-- Attachments are stored once, however many messages carry them
+CREATE TABLE IF NOT EXISTS attachments (
+    hash TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+def _permanent(error: Exception) -> bool:
+    """Failures retrying cannot fix (a bad login can be fixed, so it is retried)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return (isinstance(error, smtplib.SMTPResponseException)
+            and not isinstance(error, smtplib.SMTPAuthenticationError)
+            and 500 <= error.smtp_code < 600)
+
+class EmailOutbox:
+    """
+    Outgoing email stored in SQLite and delivered by a worker thread
+    
+    Every message has a send ID derived from its kind, a caller-supplied
+    key (such as the run ID) and the receiver. Queueing the same message
+    twice is a no-op, and the ID doubles as the Message-ID, so a message
+    re-sent after a crash between delivery and bookkeeping is
+    recognisable as a duplicate by the receiving mail system. Failed
+    sends are retried with exponential backoff. Pending messages survive
+    restarts and are picked up when the next worker starts.
+    """
+    
+    def __init__(self, db_file: Optional[Union[str, Path]] = None, sender=None):
+        self.db_file = Path(db_file or Config.OUTBOX_FILE)
+        self._sender = sender
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def sender(self):
+        """EmailSender whose SMTP pool delivers the messages"""
+        if self._sender is None:
+            from reporter.email_sender import email_sender
+            self._sender = email_sender
+        return self._sender
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the outbox database on first use"""
+        if self._conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _store_attachment(self, path: Union[str, Path]) -> str:
+        """Store a file once by content hash (read only if not stored yet)"""
+        digest = attachment_cache.file_hash(str(path))
+        if not self.conn.execute('SELECT 1 FROM attachments WHERE hash = ?', (digest,)).fetchone():
+            self.conn.execute('INSERT INTO attachments (hash, name, data) VALUES (?, ?, ?)',
+                              (digest, Path(path).name, Path(path).read_bytes()))
+        return digest
+    
+    def enqueue(self, msg: Message, send_key: str, attachments: Optional[List[str]] = None,
+                kind: str = 'report') -> Optional[str]:
+        """
+        Queue one message for delivery
+        
+        Args:
+            msg: Message without attachments, 'To' set to one receiver
+            send_key: Stable key for this logical send (e.g. the run ID)
+            attachments: Files to attach at delivery time
+            kind: Message kind, part of the send ID
+            
+        Returns:
+            Send ID, or None if the message could not be stored
+        """
+        try:
+            send_id = hashlib.sha256(f"{kind}\n{send_key}\n{msg['To']}".encode('utf-8')).hexdigest()[:32]
+            del msg['Message-ID']
+            msg['Message-ID'] = f"<{send_id}@upwork-job-analyzer>"
+            
+            with self._lock, self.conn:
+                hashes = [self._store_attachment(path) for path in attachments or []]
+                cursor = self.conn.execute(
+                    'INSERT OR IGNORE INTO outbox (send_id, kind, receiver, message, attachments, '
+                    'next_attempt_ts, created_ts) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (send_id, kind, msg['To'], msg.as_bytes(), '\n'.join(hashes), time.time(), time.time())
+                )
+            
+            if cursor.rowcount:
+                logger.info(f"📮 Queued {kind} for {msg['To']} ({send_id[:8]})")
+            else:
+                logger.info(f"📮 {kind} for {msg['To']} already queued ({send_id[:8]})")
+            self._wake.set()
+            return send_id
+        
+        except Exception as e:
+            logger.error(f"Error queueing email: {e}")
+            return None
+    
+    def _attachment_part(self, digest: str) -> MIMEBase:
+        """MIME part for a stored attachment, encoded once for all receivers and retries"""
+        name = self.conn.execute('SELECT name FROM attachments WHERE hash = ?', (digest,)).fetchone()['name']
+        
+        def load():
+            return self.conn.execute('SELECT data FROM attachments WHERE hash = ?', (digest,)).fetchone()['data']
+        
+        return attachment_cache.part(digest, name, load)
+    
+    def _build(self, row: sqlite3.Row) -> Message:
+        """Stored message plus its attachments"""
+        msg = message_from_bytes(row['message'])
+        for digest in filter(None, row['attachments'].split('\n')):
+            msg.attach(self._attachment_part(digest))
+        return msg
+    
+    def _claim(self, limit: int) -> List[sqlite3.Row]:
+        """Mark due messages as being sent and return them"""
+        now = time.time()
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_ts <= ? "
+                "ORDER BY next_attempt_ts LIMIT ?", (now, limit)
+            ).fetchall()
+            # Another process may have claimed a row since the SELECT
+            return [row for row in rows if self.conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_ts = ? WHERE send_id = ? AND status = 'pending'",
+                (now, row['send_id'])
+            ).rowcount]
+    
+    def _record(self, row: sqlite3.Row, error: Optional[Exception]):
+        """Mark a delivery attempt as sent, retried later or failed"""
+        with self._lock, self.conn:
+            if error is None:
+                self.conn.execute("UPDATE outbox SET status = 'sent', sent_ts = ?, attempts = attempts + 1, "
+                                  "last_error = NULL WHERE send_id = ?", (time.time(), row['send_id']))
+                logger.info(f"✅ Delivered {row['kind']} to {row['receiver']} ({row['send_id'][:8]})")
+                return
+            
+            attempts = row['attempts'] + 1
+            self.sender.log_error(error, row['receiver'])
+            if attempts >= Config.OUTBOX_MAX_ATTEMPTS or _permanent(error):
+                status, delay = 'failed', 0.0
+                metrics.incr('emails.failed')
+                logger.error(f"❌ Giving up on {row['kind']} to {row['receiver']} after {attempts} attempt(s)")
+            else:
+                # Exponential backoff with jitter, capped at an hour
+                status = 'pending'
+                metrics.incr('emails.retries')
+                delay = min(3600.0, Config.OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                logger.warning(f"⚠️  Retrying {row['kind']} to {row['receiver']} in {delay:.0f}s")
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, attempts = ?, next_attempt_ts = ?, last_error = ? WHERE send_id = ?',
+                (status, attempts, time.time() + delay, str(error)[:500], row['send_id'])
+            )
+    
+    def deliver_due(self) -> int:
+        """
+        Send every message that is due, over the SMTP pool
+        
+        Returns:
+            Number of messages attempted
+        """
+        rows = self._claim(Config.SMTP_POOL_SIZE * 4)
+        if not rows:
+            return 0
+        
+        messages, claimed = [], []
+        for row in rows:
+            try:
+                with self._lock:
+                    messages.append(self._build(row))
+                claimed.append(row)
+            except Exception as e:
+                self._record(row, e)
+        
+        for row, error in zip(claimed, self.sender.pool.send_many(messages)):
+            self._record(row, error)
+        return len(rows)
+    
+    def recover(self, stale_seconds: Optional[float] = None):
+        """
+        Requeue sends interrupted by a crash and drop old sent messages
+        
+        Args:
+            stale_seconds: Age of a claim after which its send is taken to
+                be interrupted (default OUTBOX_CLAIM_TIMEOUT_SECONDS). Newer
+                claims may belong to a worker that is sending right now.
+        """
+        stale_seconds = Config.OUTBOX_CLAIM_TIMEOUT_SECONDS if stale_seconds is None else stale_seconds
+        now = time.time()
+        with self._lock, self.conn:
+            requeued = self.conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND claimed_ts < ?",
+                (now - stale_seconds,)
+            ).rowcount
+            self.conn.execute("DELETE FROM outbox WHERE status = 'sent' AND sent_ts < ?",
+                              (now - Config.OUTBOX_RETENTION_DAYS * 86400,))
+            referenced = {digest for (hashes,) in self.conn.execute('SELECT attachments FROM outbox')
+                          for digest in hashes.split('\n') if digest}
+            self.conn.executemany('DELETE FROM attachments WHERE hash = ?',
+                                  [(digest,) for (digest,) in self.conn.execute('SELECT hash FROM attachments')
+                                   if digest not in referenced])
+        if requeued:
+            logger.info(f"📮 Requeued {requeued} interrupted send(s)")
+    
+    def _next_wait(self) -> float:
+        """Seconds until the next pending message is due"""
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(next_attempt_ts) FROM outbox WHERE status = 'pending'").fetchone()
+        if row[0] is None:
+            return 60.0
+        return min(60.0, max(0.0, row[0] - time.time()))
+    
+    def _run(self):
+        """Worker loop: deliver what is due, sleep until the next due time or a new message"""
+        self.recover()
+        while not self._stop.is_set():
+            try:
+                if self.deliver_due():
+                    continue
+                self._wake.wait(self._next_wait())
+                self._wake.clear()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                self._stop.wait(5)
+    
+    def start(self):
+        """Start the background delivery thread (once per process)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker; undelivered messages stay queued"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def flush(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        Deliver everything due now in this thread (for one-shot use and exit)
+        
+        The background worker is stopped first so the two never work the
+        queue at once; call start() to resume background delivery.
+        
+        Args:
+            timeout: Seconds to keep delivering (default OUTBOX_DRAIN_SECONDS)
+        """
+        self.stop()
+        self.recover()
+        deadline = time.time() + (Config.OUTBOX_DRAIN_SECONDS if timeout is None else timeout)
+        while time.time() < deadline and self.deliver_due():
+            pass
+        return self.status()
+    
+    def status(self) -> Dict[str, int]:
+        """Message count per status"""
+        with self._lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+# Global outbox instance
+outbox = EmailOutbox()
+
+def queue_email_report(pdf_file: Optional[str], analysis_text: str, metadata: Optional[dict] = None,
+                       document=None, html_file: Optional[str] = None,
+                       appendix_file: Optional[str] = None, send_key: Optional[str] = None,
+                       messages: Optional[List[Message]] = None) -> bool:
+    """
+    Queue the report for every receiver and return without waiting for SMTP
+    
+    Args:
+        messages: Messages built ahead of time (e.g. while the PDF rendered);
+            rebuilt if some files turn out too large to attach
+            
+    Returns:
+        True if a message was queued for every receiver
+    """
+    sender = outbox.sender
+    attachments, omitted = plan_attachments(sender.report_attachments(pdf_file, appendix_file))
+    if messages is None or omitted:
+        messages = sender.build_report_messages(analysis_text, metadata, document, html_file, omitted)
+    if not messages:
+        logger.error("❌ No receivers configured (RECEIVER_EMAIL)")
+        return False
+    
+    key = send_key or hashlib.sha256(analysis_text.encode('utf-8')).hexdigest()
+    queued = [outbox.enqueue(msg, key, attachments) for msg in messages]
+    outbox.start()
+    return all(queued)
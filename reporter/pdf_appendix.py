@@ -0,0 +1,207 @@
+"""
+Job Appendix PDF
+Streaming table of every analyzed job with bounded memory
+"""
+
+import os
+import zlib
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+from utils.logger import logger
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4 in points
+MARGIN = 36
+FONT_SIZE = 7.5
+ROW_HEIGHT = 10.5
+
+# (header, key, width in points)
+COLUMNS = [('#', 'index', 34), ('Title', 'title', 230), ('Budget', 'budget', 80),
+           ('Skills', 'skills', 120), ('Link', 'url', 59)]
+
+_CHARS = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"',
+                        '–': '-', '—': '-', '•': '-', '…': '...', '\n': ' ', '\r': ' '})
+
+def _pdf_string(text: str) -> bytes:
+    """Text as an escaped PDF string literal in WinAnsi encoding"""
+    data = text.translate(_CHARS).encode('cp1252', 'replace')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+class StreamingPDFWriter:
+    """
+    Minimal PDF writer that writes each page as soon as it is complete
+    
+    Only object offsets and page ids are kept (a few bytes per page), so
+    memory does not grow with the content. Text uses the standard
+    Helvetica fonts, which need no embedding. The file is written under
+    a temporary name and renamed on close.
+    """
+    
+    CATALOG, PAGES, FONT, FONT_BOLD = 1, 2, 3, 4
+    
+    def __init__(self, path: Union[str, Path], title: str = ''):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self.file = open(self.tmp_path, 'wb')
+        self.title = title
+        self.offsets: Dict[int, int] = {}
+        self.page_ids = array('l')
+        self.next_id = 5
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    
+    def _object(self, obj_id: int, body: bytes):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(b'%d 0 obj\n' % obj_id + body + b'\nendobj\n')
+    
+    def _new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id - 1
+    
+    def add_page(self, content: bytes, annotations: Optional[List[bytes]] = None):
+        """Write one page: its content stream and page dictionary"""
+        stream = zlib.compress(content, 6)
+        content_id = self._new_id()
+        self._object(content_id, b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(stream)
+                     + stream + b'\nendstream')
+        
+        page_id = self._new_id()
+        annots = b' /Annots [' + b' '.join(annotations) + b']' if annotations else b''
+        self._object(page_id, b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+                     b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R%s >>'
+                     % (self.PAGES, PAGE_WIDTH, PAGE_HEIGHT, self.FONT, self.FONT_BOLD, content_id, annots))
+        self.page_ids.append(page_id)
+    
+    def close(self) -> Path:
+        """Write fonts, page tree, catalog and cross-reference table"""
+        for obj_id, name in ((self.FONT, b'Helvetica'), (self.FONT_BOLD, b'Helvetica-Bold')):
+            self._object(obj_id, b'<< /Type /Font /Subtype /Type1 /BaseFont /%s '
+                         b'/Encoding /WinAnsiEncoding >>' % name)
+        
+        self.offsets[self.PAGES] = self.file.tell()
+        self.file.write(b'%d 0 obj\n<< /Type /Pages /Count %d /Kids [' % (self.PAGES, len(self.page_ids)))
+        for start in range(0, len(self.page_ids), 1000):
+            self.file.write(b' '.join(b'%d 0 R' % i for i in self.page_ids[start:start + 1000]) + b' ')
+        self.file.write(b'] >>\nendobj\n')
+        
+        self._object(self.CATALOG, b'<< /Type /Catalog /Pages %d 0 R >>' % self.PAGES)
+        info_id = self._new_id()
+        self._object(info_id, b'<< /Title ' + _pdf_string(self.title) + b' /Producer (Upwork Job Analyzer) >>')
+        
+        xref = self.file.tell()
+        self.file.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_id)
+        for obj_id in range(1, self.next_id):
+            self.file.write(b'%010d 00000 n \n' % self.offsets[obj_id])
+        self.file.write(b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                        % (self.next_id, self.CATALOG, info_id, xref))
+        
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return self.path
+    
+    def abort(self):
+        """Discard a partly written file"""
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+class AppendixRenderer:
+    """Lays jobs out as a compact table, one page at a time"""
+    
+    def __init__(self, title: str = 'Appendix: All Analyzed Jobs'):
+        self.title = title
+        self.widths = CORE_FONTS_CHARWIDTHS['helvetica']
+        self.rows_per_page = int((PAGE_HEIGHT - 2 * MARGIN - 40) // ROW_HEIGHT)
+    
+    def _fit(self, text: str, width: float) -> str:
+        """Cut text to fit a column, measuring Helvetica glyph widths"""
+        limit = (width - 4) * 1000 / FONT_SIZE
+        total = 0
+        for i, char in enumerate(text):
+            total += self.widths.get(char, 556)
+            if total > limit:
+                return text[:max(i - 2, 0)] + '...'
+        return text
+    
+    @staticmethod
+    def _cell(job: Dict, key: str, index: int) -> str:
+        if key == 'index':
+            return str(index)
+        if key == 'skills':
+            return ', '.join(job.get('skills') or [])
+        if key == 'url':
+            return (job.get('url') or '').split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+        return str(job.get(key) or '')
+    
+    def _page(self, rows: List[Dict], first_index: int, page_no: int):
+        """Content stream and link annotations for one page"""
+        out = [b'BT /F2 11 Tf %.2f %.2f Td ' % (MARGIN, PAGE_HEIGHT - MARGIN - 11)
+               + _pdf_string(self.title) + b' Tj ET']
+        
+        y = PAGE_HEIGHT - MARGIN - 32
+        x = MARGIN
+        for header, _, width in COLUMNS:
+            out.append(b'BT /F2 %.1f Tf %.2f %.2f Td ' % (FONT_SIZE, x + 2, y) + _pdf_string(header) + b' Tj ET')
+            x += width
+        out.append(b'0.6 G %.2f %.2f m %.2f %.2f l S' % (MARGIN, y - 3, PAGE_WIDTH - MARGIN, y - 3))
+        
+        annotations = []
+        for offset, job in enumerate(rows):
+            y -= ROW_HEIGHT
+            if offset % 2:
+                out.append(b'0.95 g %.2f %.2f %.2f %.2f re f 0 g'
+                           % (MARGIN, y - 2.5, PAGE_WIDTH - 2 * MARGIN, ROW_HEIGHT))
+            x = MARGIN
+            for _, key, width in COLUMNS:
+                text = self._fit(self._cell(job, key, first_index + offset), width)
+                if text:
+                    out.append(b'BT /F1 %.1f Tf %.2f %.2f Td ' % (FONT_SIZE, x + 2, y) + _pdf_string(text) + b' Tj ET')
+                x += width
+            if job.get('url'):
+                annotations.append(b'<< /Type /Annot /Subtype /Link /Border [0 0 0] /Rect [%.2f %.2f %.2f %.2f] '
+                                   b'/A << /S /URI /URI ' % (MARGIN, y - 2.5, PAGE_WIDTH - MARGIN, y + 8)
+                                   + _pdf_string(job['url']) + b' >> >>')
+        
+        out.append(b'BT /F1 8 Tf %.2f %.2f Td ' % (PAGE_WIDTH / 2 - 12, MARGIN / 2)
+                   + _pdf_string(f'Page {page_no}') + b' Tj ET')
+        return b'\n'.join(out), annotations
+    
+    def render(self, jobs: Iterable[Dict], path: Union[str, Path]) -> Optional[str]:
+        """
+        Stream jobs into a PDF table
+        
+        Args:
+            jobs: Any iterable of job dicts (a generator keeps memory flat)
+            path: Output file
+            
+        Returns:
+            Filename if successful, None otherwise
+        """
+        writer = StreamingPDFWriter(path, self.title)
+        try:
+            iterator = iter(jobs)
+            index, page_no = 1, 0
+            while True:
+                rows = list(islice(iterator, self.rows_per_page))
+                if not rows and page_no:
+                    break
+                page_no += 1
+                content, annotations = self._page(rows, index, page_no)
+                writer.add_page(content, annotations)
+                index += len(rows)
+                if not rows:
+                    break
+            
+            filename = writer.close()
+            logger.info(f"📎 Job appendix: {index - 1} jobs on {page_no} pages -> {filename}")
+            return str(filename)
+        
+        except Exception as e:
+            writer.abort()
+            logger.error(f"Appendix rendering error: {e}")
+            return None
+
+def write_job_appendix(jobs: Iterable[Dict], path: Union[str, Path]) -> Optional[str]:
+    """Main appendix function"""
+    return AppendixRenderer().render(jobs, path)
@@ -13,9 +13,18 @@ except ImportError:
 
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List
 from config import Config
+from reporter.charts import ChartRenderer
+from reporter.report_model import ReportDocument, Section, build_document, register_renderer
 from utils.logger import logger
+from utils.metrics import metrics
+
+# Typographic characters Gemini likes, mapped into Latin-1
+_PDF_CHARS = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"', '\u2013': '-', '\u2014': '-',
+    '\u2022': '-', '\u2026': '...', '\u2192': '->', '\u2265': '>=', '\u2264': '<=', '\u00a0': ' '
+})
 
 class JobReportPDF(FPDF):
     """Custom PDF report class"""
@@ -60,15 +69,60 @@ class JobReportPDF(FPDF):
         self.set_text_color(50, 50, 50)
         self.multi_cell(0, 5, body)
         self.ln()
+    
+    def add_chart(self, image_path, width: float = 190):
+        """Add a chart image across the page"""
+        self.image(str(image_path), x=self.l_margin, w=width)
+        self.ln(4)
+    
+    def add_sparkline_row(self, label: str, image_path, text: str):
+        """Add one 'label - sparkline - text' line"""
+        if self.get_y() + 8 > self.page_break_trigger:
+            self.add_page()
+        
+        self.set_font('Arial', '', 10)
+        self.set_text_color(50, 50, 50)
+        y = self.get_y()
+        self.cell(60, 7, label[:32])
+        self.image(str(image_path), x=self.get_x(), y=y + 0.5, w=30, h=6)
+        self.set_x(self.get_x() + 34)
+        self.cell(0, 7, text, 0, 1)
+    
+    def add_table(self, columns: List[str], rows: List[List[str]], widths: Optional[List[float]] = None):
+        """Add a compact table; cells are cut to fit their column"""
+        widths = widths or [1] * len(columns)
+        scale = self.epw / sum(widths)
+        widths = [w * scale for w in widths]
+        
+        def row_cells(cells, style):
+            self.set_font('Arial', style, 9)
+            for width, cell in zip(widths, cells):
+                text = str(cell)
+                while text and self.get_string_width(text) > width - 2:
+                    text = text[:-1]
+                self.cell(width, 6, text, 'B' if style else 0, 0, 'L', bool(style))
+            self.ln()
+        
+        self.set_text_color(50, 50, 50)
+        self.set_fill_color(230, 240, 250)
+        row_cells(columns, 'B')
+        for row in rows:
+            if self.get_y() + 6 > self.page_break_trigger:
+                self.add_page()
+                row_cells(columns, 'B')
+            row_cells(row, '')
+        self.ln(4)
 
 class PDFReportGenerator:
     """PDF report generator with error handling"""
     
     def __init__(self):
         self.config = Config
+        self.charts = ChartRenderer(Config.CHART_CACHE_DIR)
     
     def generate_report(self, analysis_text: str, job_count: int, 
-                       metadata: Optional[dict] = None) -> Optional[str]:
+                       metadata: Optional[dict] = None, name: Optional[str] = None,
+                       document: Optional[ReportDocument] = None) -> Optional[str]:
         """
         Generate PDF report
         
@@ -76,6 +130,8 @@ class PDFReportGenerator:
             analysis_text: Analysis from Gemini
             job_count: Number of jobs analyzed
             metadata: Additional metadata
+            name: File name without extension (default: timestamped)
+            document: Already parsed report (skips parsing the text again)
             
         Returns:
             PDF filename if successful, None otherwise
@@ -83,94 +139,74 @@ class PDFReportGenerator:
         try:
             logger.info("📄 Generating PDF report...")
             
+            document = document or build_document(analysis_text, job_count, metadata)
+            
             pdf = JobReportPDF()
             pdf.alias_nb_pages()
             pdf.add_page()
             
             # Summary section
             pdf.chapter_title("Executive Summary")
-            summary = f"Total Jobs Analyzed: {job_count}\n"
-            summary += f"Analysis Date: {datetime.now().strftime('%d %B %Y')}\n"
-            summary += f"Search Query: {self.config.SEARCH_QUERY}\n"
-            
-            if metadata:
-                summary += f"Pages Scraped: {metadata.get('pages', 'N/A')}\n"
-                summary += f"Valid Jobs: {metadata.get('valid_jobs', 'N/A')}\n"
-            
-            pdf.chapter_body(summary)
-            
-            # Clean and format analysis text
-            clean_text = self._clean_text(analysis_text)
-            
-            # Parse sections
-            sections = self._parse_sections(clean_text)
+            pdf.chapter_body(self._clean_text('\n'.join(f"{key}: {value}" for key, value in document.facts)))
             
-            # Add each section
-            for title, content in sections:
-                pdf.chapter_title(title)
-                pdf.chapter_body(content)
+            for section in document.sections:
+                self._add_section(pdf, section)
             
             # Save PDF
-            filename = self._get_filename()
-            pdf.output(str(filename))
+            filename = self._get_filename(name)
+            with metrics.span('pdf.output'):
+                pdf.output(str(filename))
             
             logger.info(f"✅ PDF saved: {filename}")
             return str(filename)
         
         except Exception as e:
             logger.error(f"PDF generation error: {e}")
-            return self._generate_text_fallback(analysis_text, job_count)
+            return self._generate_text_fallback(analysis_text, job_count, name)
     
     def _clean_text(self, text: str) -> str:
-        """Clean text for PDF"""
-        # Remove emojis and special characters
-        text = text.encode('ascii', 'ignore').decode('ascii')
-        # Remove markdown symbols
-        text = text.replace('##', '').replace('**', '').replace('*', '')
-        return text
+        """Map text onto the core fonts' Latin-1 character set"""
+        return text.translate(_PDF_CHARS).encode('latin-1', 'ignore').decode('latin-1')
     
-    def _parse_sections(self, text: str) -> list:
-        """Parse text into sections"""
-        sections = []
-        current_title = "Analysis"
-        current_content = []
+    def _add_section(self, pdf: JobReportPDF, section: Section):
+        """One document section: title, charts, table, text"""
+        pdf.chapter_title(self._clean_text(section.title))
         
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line is a section header
-            if line.isupper() or (len(line) < 100 and line.endswith(':')):
-                # Save previous section
-                if current_content:
-                    sections.append((current_title, '\n'.join(current_content)))
-                    current_content = []
-                
-                current_title = line.rstrip(':')
-            else:
-                current_content.append(line)
+        try:
+            for chart in section.charts:
+                if chart.kind == 'bar':
+                    pdf.add_chart(self.charts.bar_chart(chart.data, chart.title))
+                elif chart.kind == 'histogram':
+                    pdf.add_chart(self.charts.histogram(chart.data, title=chart.title), width=170)
+                elif chart.kind == 'sparkline':
+                    pdf.add_sparkline_row(self._clean_text(chart.label), self.charts.sparkline(chart.data),
+                                          self._clean_text(chart.caption))
+            if section.charts and section.charts[-1].kind == 'sparkline':
+                pdf.ln(3)
+        except Exception as e:
+            logger.error(f"Chart rendering error: {e}")
         
-        # Add last section
-        if current_content:
-            sections.append((current_title, '\n'.join(current_content)))
+        if section.table:
+            pdf.add_table(section.table.columns,
+                          [[self._clean_text(cell) for cell in row] for row in section.table.rows],
+                          section.table.widths)
         
-        return sections
+        if section.text:
+            pdf.chapter_body(self._clean_text(section.text))
     
-    def _get_filename(self) -> Path:
+    def _get_filename(self, name: Optional[str] = None, suffix: str = '.pdf') -> Path:
         """Generate unique filename"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = self.config.REPORTS_DIR / f"upwork_report_{timestamp}.pdf"
+        name = name or f"upwork_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = self.config.REPORTS_DIR / f"{name}{suffix}"
         return filename
     
-    def _generate_text_fallback(self, analysis_text: str, job_count: int) -> Optional[str]:
+    def _generate_text_fallback(self, analysis_text: str, job_count: int,
+                                name: Optional[str] = None) -> Optional[str]:
         """Generate text file as fallback"""
         try:
             logger.warning("⚠️  Falling back to text report")
             
-            filename = self.config.REPORTS_DIR / f"upwork_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            filename = self._get_filename(name, '.txt')
             
             with open(filename, 'w', encoding='utf-8') as f:
                 f.write("=" * 60 + "\n")
@@ -193,6 +229,13 @@ class PDFReportGenerator:
 pdf_generator = PDFReportGenerator()
 
 def generate_pdf_report(analysis_text: str, job_count: int, 
-                       metadata: Optional[dict] = None) -> Optional[str]:
+                       metadata: Optional[dict] = None, name: Optional[str] = None) -> Optional[str]:
     """Main PDF generation function"""
-    return pdf_generator.generate_report(analysis_text, job_count, metadata)
+    return pdf_generator.generate_report(analysis_text, job_count, metadata, name)
+
+@register_renderer('pdf')
+def render_pdf(document: ReportDocument, name: str) -> Optional[str]:
+    """PDF renderer for reporter.report_model"""
+    job_count = dict(document.facts).get("Total Jobs Analyzed", 0)
+    text = '\n\n'.join(s.text for s in document.sections if s.kind == 'analysis')
+    return pdf_generator.generate_report(text, job_count, name=name, document=document)
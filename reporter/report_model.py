@@ -0,0 +1,323 @@
+"""
+Report Document Model
+Analysis parsed once into sections, tables and charts for every output format
+"""
+
+import html
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Callable
+from config import Config
+from analyzer.trend_detector import format_trends
+from utils.helpers import atomic_write_bytes
+from utils.logger import logger
+
+_MARKUP_RE = re.compile(r'\*\*|__|`')
+_HEADING_RE = re.compile(r'^#{1,6}\s*')
+_BULLET_RE = re.compile(r'^[*•]\s+')
+_SPARK_BARS = '▁▂▃▄▅▆▇█'
+
+@dataclass
+class Table:
+    """Rows of cells under a header"""
+    columns: List[str]
+    rows: List[List[str]]
+    widths: List[float] = field(default_factory=list)  # relative column widths
+
+@dataclass
+class Chart:
+    """
+    Chart data; renderers decide how to draw it
+    
+    kind is 'bar' (data: [(label, value)]), 'histogram' (data: [values])
+    or 'sparkline' (data: [values], drawn inline next to label/caption).
+    """
+    kind: str
+    title: str
+    data: list
+    label: str = ''
+    caption: str = ''
+
+@dataclass
+class Section:
+    """One titled block of the report"""
+    title: str
+    text: str = ''
+    charts: List[Chart] = field(default_factory=list)
+    table: Optional[Table] = None
+    kind: str = 'analysis'
+
+@dataclass
+class ReportDocument:
+    """Everything a renderer needs, independent of the output format"""
+    title: str
+    created_at: str
+    facts: List[Tuple[str, str]]
+    sections: List[Section]
+    metadata: Dict = field(default_factory=dict)
+    
+    def preview(self, chars: int = 500) -> str:
+        """Start of the analysis text, cut at a word boundary"""
+        text = ' '.join(s.text for s in self.sections if s.kind == 'analysis' and s.text)
+        text = ' '.join(text.split())
+        if len(text) <= chars:
+            return text
+        return text[:chars].rsplit(' ', 1)[0] + '...'
+
+def _clean_line(line: str) -> str:
+    """Drop markdown emphasis and headings; keep the text itself intact"""
+    line = _HEADING_RE.sub('', line.strip())
+    line = _BULLET_RE.sub('- ', line)
+    return _MARKUP_RE.sub('', line).strip()
+
+def parse_sections(text: str) -> List[Section]:
+    """Split Gemini's answer on header lines (ALL CAPS or ending in ':')"""
+    sections = []
+    title, content = "Analysis", []
+    
+    for raw in (text or '').split('\n'):
+        is_heading = bool(_HEADING_RE.match(raw.strip()))
+        line = _clean_line(raw)
+        if not line:
+            continue
+        
+        letters = line.encode('ascii', 'ignore').decode('ascii')
+        if is_heading or (letters.isupper() and letters.strip()) or (len(line) < 100 and line.endswith(':')):
+            if content:
+                sections.append(Section(title, '\n'.join(content)))
+                content = []
+            title = line.rstrip(':')
+        else:
+            content.append(line)
+    
+    if content:
+        sections.append(Section(title, '\n'.join(content)))
+    return sections
+
+def _chart_sections(data: Optional[Dict]) -> List[Section]:
+    """Skill demand and budget distribution sections"""
+    if not data:
+        return []
+    sections = []
+    if data.get('skill_counts'):
+        sections.append(Section("Skill Demand", charts=[
+            Chart('bar', "Jobs requesting each skill", [list(item) for item in data['skill_counts']])
+        ], kind='chart'))
+    
+    charts = []
+    for key, title in (('hourly_rates', "Hourly rate (midpoint, USD)"),
+                       ('fixed_budgets', "Fixed-price budget (USD)")):
+        if len(data.get(key) or []) >= 3:
+            charts.append(Chart('histogram', title, list(data[key])))
+    if charts:
+        sections.append(Section("Budget Distribution", charts=charts, kind='chart'))
+    return sections
+
+def _matches_section(matches: Optional[List[Dict]]) -> Optional[Section]:
+    """Best matching jobs as a table"""
+    if not matches:
+        return None
+    rows = [[str(i), job.get('title', '')[:90], job.get('budget', 'Not specified'),
+             f"{job['match_score']:.2f}", ', '.join(job.get('match_reasons', {}).get('skills', [])[:6])]
+            for i, job in enumerate(matches, 1)]
+    return Section("Best Matching Jobs", table=Table(['#', 'Job', 'Budget', 'Score', 'Matching skills'],
+                                                     rows, [1, 9, 4, 2, 6]), kind='matches')
+
+def _trends_section(trends: Optional[Dict]) -> Optional[Section]:
+    """Measured trends with a sparkline per rising/falling skill"""
+    text = format_trends(trends)
+    if not text:
+        return None
+    charts = []
+    for stats in (trends.get('rising') or []) + (trends.get('falling') or []):
+        if len(stats.get('series') or []) >= 2:
+            change = f"{stats['change'] * 100:+.1f} pts" if stats.get('change') is not None else ''
+            charts.append(Chart('sparkline', stats['name'], stats['series'], stats['name'],
+                                f"{stats['week_mean']:.1%} of jobs  {change}".strip()))
+    return Section("Measured Market Trends", text, charts, kind='trends')
+
+def _associations_section(summary: Optional[List[Dict]]) -> Optional[Section]:
+    """Measured skill associations"""
+    lines = []
+    for entry in summary or []:
+        if not entry.get('related'):
+            continue
+        lines.append(f"{entry['skill']} ({entry['jobs']} jobs):")
+        for rule in entry['related']:
+            lines.append(f"  - {rule['consequent']}: {rule['confidence']:.0%} of these jobs "
+                         f"(lift {rule['lift']})")
+    return Section("Skills Requested Together", '\n'.join(lines), kind='associations') if lines else None
+
+def build_document(analysis_text: str, job_count: int, metadata: Optional[Dict] = None) -> ReportDocument:
+    """
+    Parse the analysis and metadata once into a report document
+    
+    Args:
+        analysis_text: Analysis from Gemini
+        job_count: Number of jobs analyzed
+        metadata: Run metadata (matches, trends, chart data, ...)
+        
+    Returns:
+        Document shared by every renderer
+    """
+    metadata = metadata or {}
+    now = datetime.now()
+    
+    facts = [("Total Jobs Analyzed", str(job_count)),
+             ("Analysis Date", now.strftime('%d %B %Y')),
+             ("Search Query", metadata.get('search_query') or Config.SEARCH_QUERY)]
+    if metadata:
+        facts += [("Pages Scraped", str(metadata.get('pages', 'N/A'))),
+                  ("Valid Jobs", str(metadata.get('valid_jobs', 'N/A')))]
+    
+    sections = _chart_sections(metadata.get('chart_data')) + parse_sections(analysis_text)
+    for extra in (_matches_section(metadata.get('top_matches')),
+                  _trends_section(metadata.get('trends')),
+                  _associations_section(metadata.get('skill_associations'))):
+        if extra:
+            sections.append(extra)
+    
+    return ReportDocument(
+        title="Upwork Job Analysis Report",
+        created_at=now.isoformat(timespec='seconds'),
+        facts=facts,
+        sections=sections,
+        metadata={k: metadata[k] for k in ('search_query', 'total_jobs', 'pages') if k in metadata}
+    )
+
+def spark_text(values: List[float]) -> str:
+    """Sparkline as block characters, for text formats"""
+    if len(values) < 2:
+        return ''
+    low, spread = min(values), (max(values) - min(values)) or 1.0
+    return ''.join(_SPARK_BARS[int((v - low) / spread * (len(_SPARK_BARS) - 1))] for v in values)
+
+def distribution_text(values: List[float]) -> str:
+    """One-line summary of a money distribution, for text formats"""
+    ordered = sorted(values)
+    if not ordered:
+        return ''
+    
+    def quartile(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    return (f"{len(ordered)} jobs, median ${quartile(0.5):,.0f}, middle half "
+            f"${quartile(0.25):,.0f}-${quartile(0.75):,.0f}, range ${ordered[0]:,.0f}-${ordered[-1]:,.0f}")
+
+# Renderers take (document, name) and return the written file or None
+RENDERERS: Dict[str, Callable[[ReportDocument, str], Optional[str]]] = {}
+
+def register_renderer(fmt: str):
+    """Decorator adding an output format"""
+    def decorator(func):
+        RENDERERS[fmt] = func
+        return func
+    return decorator
+
+def _write(name: str, suffix: str, text: str) -> str:
+    filename = Config.REPORTS_DIR / f"{name}{suffix}"
+    atomic_write_bytes(filename, text.encode('utf-8'))
+    return str(filename)
+
+@register_renderer('markdown')
+def render_markdown(document: ReportDocument, name: str) -> str:
+    """GitHub-flavoured Markdown"""
+    blocks = [f"# {document.title}", '\n'.join(f"- **{key}:** {value}" for key, value in document.facts)]
+    
+    for section in document.sections:
+        blocks.append(f"## {section.title}")
+        sparklines = []
+        for chart in section.charts:
+            if chart.kind == 'bar':
+                blocks.append('\n'.join(["| Skill | Jobs |", "| --- | ---: |"] +
+                                        [f"| {label} | {value:g} |" for label, value in chart.data]))
+            elif chart.kind == 'histogram':
+                blocks.append(f"**{chart.title}:** {distribution_text(chart.data)}")
+            elif chart.kind == 'sparkline':
+                sparklines.append(f"- {chart.label} `{spark_text(chart.data)}` {chart.caption}")
+        if sparklines:
+            blocks.append('\n'.join(sparklines))
+        if section.table:
+            blocks.append('\n'.join(
+                ['| ' + ' | '.join(section.table.columns) + ' |', '|' + ' --- |' * len(section.table.columns)] +
+                ['| ' + ' | '.join(cell.replace('|', '\\|') for cell in row) + ' |' for row in section.table.rows]
+            ))
+        if section.text:
+            blocks.append(section.text)
+    return _write(name, '.md', '\n\n'.join(blocks) + '\n')
+
+@register_renderer('html')
+def render_html(document: ReportDocument, name: str) -> str:
+    """Self-contained HTML with inline styles, usable as an email body"""
+    e = html.escape
+    out = [f'<html><body style="font-family:Arial,sans-serif;color:#323232;max-width:760px">',
+           f'<h1 style="color:#0066cc">{e(document.title)}</h1>', '<table>']
+    out += [f'<tr><td><b>{e(key)}</b></td><td>{e(value)}</td></tr>' for key, value in document.facts]
+    out.append('</table>')
+    
+    for section in document.sections:
+        out.append(f'<h2 style="background:#e6f0fa;padding:6px">{e(section.title)}</h2>')
+        for chart in section.charts:
+            if chart.kind == 'bar':
+                peak = max((value for _, value in chart.data), default=0) or 1
+                out.append('<table style="width:100%">')
+                out += [f'<tr><td style="width:30%">{e(str(label))}</td><td><div style="background:#0066cc;'
+                        f'height:14px;width:{80 * value / peak:.0f}%;display:inline-block"></div> {value:g}</td></tr>'
+                        for label, value in chart.data]
+                out.append('</table>')
+            elif chart.kind == 'histogram':
+                out.append(f'<p><b>{e(chart.title)}:</b> {e(distribution_text(chart.data))}</p>')
+            elif chart.kind == 'sparkline':
+                out.append(f'<div>{e(chart.label)} <span style="color:#0066cc">{spark_text(chart.data)}</span> '
+                           f'{e(chart.caption)}</div>')
+        if section.table:
+            out.append('<table style="border-collapse:collapse;width:100%"><tr>' +
+                       ''.join(f'<th style="text-align:left;border-bottom:1px solid #999">{e(c)}</th>'
+                               for c in section.table.columns) + '</tr>')
+            out += ['<tr>' + ''.join(f'<td>{e(cell)}</td>' for cell in row) + '</tr>' for row in section.table.rows]
+            out.append('</table>')
+        if section.text:
+            out.append('<p>' + '<br>'.join(e(line) for line in section.text.split('\n')) + '</p>')
+    
+    out.append('</body></html>')
+    return _write(name, '.html', '\n'.join(out))
+
+@register_renderer('json')
+def render_json(document: ReportDocument, name: str) -> str:
+    """The document itself, for other tools"""
+    return _write(name, '.json', json.dumps(asdict(document), indent=2, ensure_ascii=False, default=str))
+
+def render_document(document: ReportDocument, name: str,
+                    formats: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Render a document to several formats concurrently
+    
+    Args:
+        document: Parsed report
+        name: File name without extension
+        formats: Output formats (default: Config.REPORT_FORMATS)
+        
+    Returns:
+        Written file per format (None where rendering failed)
+    """
+    if 'pdf' not in RENDERERS:
+        import reporter.pdf_generator  # registers the 'pdf' renderer
+    
+    # An empty list means nothing to render, not the configured default
+    formats = [fmt for fmt in (formats if formats is not None else Config.REPORT_FORMATS) if fmt in RENDERERS]
+    if not formats:
+        return {}
+    
+    def render(fmt):
+        try:
+            return RENDERERS[fmt](document, name)
+        except Exception as e:
+            logger.error(f"{fmt} rendering error: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(formats))) as pool:
+        futures = {fmt: pool.submit(render, fmt) for fmt in formats}
+        return {fmt: future.result() for fmt, future in futures.items()}
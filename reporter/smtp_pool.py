@@ -0,0 +1,135 @@
+"""
+SMTP Connection Pool
+Reusable authenticated SMTP connections with reconnect on drop
+"""
+
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import Message
+from typing import List, Optional
+from config import Config
+from utils.logger import logger
+from utils.metrics import metrics
+
+# Errors that mean the connection is gone rather than the message refused
+_DROPPED = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+class SMTPPool:
+    """
+    Bounded pool of logged-in SMTP connections
+    
+    A connection costs a TCP connect, STARTTLS and a login; a message on
+    an open connection costs one MAIL/RCPT/DATA exchange. Connections are
+    returned to the pool after each send and reused, at most `size` are
+    open at once, and idle ones older than `idle_seconds` are closed
+    instead of reused because servers drop them. A send that finds its
+    connection dropped reconnects and tries once more.
+    """
+    
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 user: Optional[str] = None, password: Optional[str] = None,
+                 size: Optional[int] = None, use_tls: Optional[bool] = None,
+                 idle_seconds: Optional[float] = None):
+        self.host = host or Config.SMTP_HOST
+        self.port = port or Config.SMTP_PORT
+        self.user = Config.GMAIL_USER if user is None else user
+        self.password = Config.GMAIL_APP_PASSWORD if password is None else password
+        self.size = size or Config.SMTP_POOL_SIZE
+        self.use_tls = Config.SMTP_USE_TLS if use_tls is None else use_tls
+        self.idle_seconds = Config.SMTP_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self._idle = deque()  # (connection, returned_at)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.connects = 0
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and log in one connection"""
+        server = smtplib.SMTP(self.host, self.port, timeout=Config.TIMEOUT_SECONDS)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.connects += 1
+        metrics.incr('smtp.connections')
+        return server
+    
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless it broke"""
+        with self._slots:
+            server, stale = None, []
+            with self._lock:
+                while self._idle:
+                    candidate, returned_at = self._idle.pop()
+                    if time.monotonic() - returned_at <= self.idle_seconds:
+                        server = candidate
+                        break
+                    stale.append(candidate)
+            for candidate in stale:
+                self._close(candidate)
+            if server is None:
+                server = self._connect()
+            
+            try:
+                yield server
+            except BaseException:
+                self._close(server)
+                raise
+            with self._lock:
+                self._idle.append((server, time.monotonic()))
+    
+    def send(self, msg: Message, to_addrs: Optional[List[str]] = None):
+        """Send one message, reconnecting once if the connection was dropped"""
+        for attempt in (1, 2):
+            try:
+                with self.connection() as server, metrics.span('smtp.send'):
+                    server.send_message(msg, to_addrs=to_addrs)
+                metrics.incr('emails.sent')
+                return
+            except _DROPPED as e:
+                if attempt == 2:
+                    raise
+                metrics.incr('smtp.reconnects')
+                logger.warning(f"⚠️  SMTP connection dropped ({e}), reconnecting")
+    
+    def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send messages concurrently over at most `size` connections
+        
+        Returns:
+            None per delivered message, the exception for failed ones
+        """
+        def deliver(msg):
+            try:
+                self.send(msg)
+                return None
+            except Exception as e:
+                return e
+        
+        with metrics.span('smtp.send_many'):
+            if len(messages) == 1:
+                return [deliver(messages[0])]
+            with ThreadPoolExecutor(max_workers=min(self.size, len(messages))) as pool:
+                return list(pool.map(deliver, messages))
+    
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            while self._idle:
+                self._close(self._idle.pop()[0])
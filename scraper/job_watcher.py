@@ -0,0 +1,183 @@
+"""
+Job Watcher
+Low-latency polling of the newest jobs with per-job alerts
+"""
+
+import json
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import List, Dict, Optional, Callable
+from config import Config
+from analyzer.job_scorer import FreelancerProfile, JobFeatures
+from reporter.email_sender import send_job_alert
+from scraper.upwork_scraper import UpworkScraper
+from utils.dedup_index import DedupIndex
+from utils.helpers import job_fingerprint
+from utils.logger import logger
+from utils.validators import validate_jobs_list
+
+class JobWatcher:
+    """
+    Polls page 1 of each query with one warm browser
+    
+    Jobs are compared against a seen-jobs index of their own, so the
+    watcher never hides jobs from the daily pipeline. Every new job that
+    passes the profile filter is alerted on immediately. The full Gemini
+    and PDF pipeline is skipped entirely.
+    """
+    
+    def __init__(self, queries: Optional[List[str]] = None, interval_minutes: Optional[float] = None,
+                 min_score: Optional[float] = None, alert: Optional[Callable[[Dict], bool]] = None):
+        self.config = Config
+        self.queries = queries or Config.WATCH_QUERIES
+        self.interval = 60 * (interval_minutes or Config.WATCH_INTERVAL_MINUTES)
+        self.min_score = Config.WATCH_MIN_SCORE if min_score is None else min_score
+        self.alert = alert or send_job_alert
+        self.profile = FreelancerProfile.load()
+        self.seen = DedupIndex(Config.WATCH_SEEN_FILE)
+        self.scraper = UpworkScraper()
+        self.triage = None
+        if Config.TRIAGE_ENABLED:
+            from analyzer.gemini_analyzer import analyzer, TriageQueue
+            self.triage = TriageQueue(analyzer, self.profile)
+    
+    def _ensure_driver(self):
+        """Start the browser once and restart it only if it died"""
+        if self.scraper.driver is not None:
+            try:
+                self.scraper.driver.current_url
+                return
+            except Exception:
+                logger.warning("⚠️  Browser session lost, restarting")
+                self.scraper.cleanup()
+        self.scraper.driver = self.scraper.setup_driver()
+    
+    def _new_jobs(self, jobs: List[Dict], priming: bool = False) -> List[Dict]:
+        """Jobs never seen before (none while priming an empty index)"""
+        fresh = self.seen.update(jobs)
+        if priming:
+            logger.info(f"👀 Seen-jobs index primed with {len(jobs)} jobs")
+            return []
+        return [job for job in fresh if self.seen.get(job_fingerprint(job))['sightings'] == 1]
+    
+    def _matching(self, jobs: List[Dict]) -> List[Dict]:
+        """Jobs good enough to alert on, scored against the profile when there is one"""
+        if self.profile is None or not jobs:
+            return jobs
+        
+        scores = JobFeatures(jobs).score(self.profile)['total']
+        matching = []
+        for job, score in zip(jobs, scores):
+            if score >= self.min_score:
+                job['match_score'] = round(float(score), 3)
+                matching.append(job)
+        return matching
+    
+    def _record(self, entry: Dict):
+        """Append one alert to the latency log"""
+        try:
+            Config.WATCH_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(Config.WATCH_LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        except Exception as e:
+            logger.error(f"Error recording alert: {e}")
+    
+    def _late_verdict(self, job: Dict, future: Future):
+        """Log a verdict that arrived after the job was alerted on"""
+        verdict = future.result()
+        if not verdict:
+            return
+        logger.info(f"🩺 Late verdict '{verdict['verdict']}' for {job.get('title', '')[:60]}: {verdict['reason']}")
+        self._record({'fingerprint': job_fingerprint(job), 'verdict': verdict['verdict'], 'follow_up': True})
+    
+    def poll_once(self) -> int:
+        """
+        Poll every query once and alert on new matching jobs
+        
+        Returns:
+            Number of alerts sent
+        """
+        self._ensure_driver()
+        sent = 0
+        # Without any history every listed job would look new
+        priming = len(self.seen) == 0
+        
+        for query in self.queries:
+            started = time.time()
+            jobs = validate_jobs_list(self.scraper._scrape_page(query, 1) or [])
+            detected = time.time()
+            
+            new_jobs = self._new_jobs(jobs, priming)
+            matching = self._matching(new_jobs)
+            logger.info(f"👀 '{query}': {len(jobs)} listed, {len(new_jobs)} new, "
+                        f"{len(matching)} matching ({detected - started:.1f}s)")
+            
+            # Queue every match, then flush: they share one triage request
+            # and nothing waits for the queue's deadline
+            verdicts = [self.triage.submit(job) for job in matching] if self.triage else []
+            if verdicts:
+                self.triage.flush()
+            # Alerts wait for triage at most TRIAGE_MAX_WAIT_SECONDS in total;
+            # a later verdict is only logged
+            deadline = time.monotonic() + Config.TRIAGE_MAX_WAIT_SECONDS
+            
+            for i, job in enumerate(matching):
+                if verdicts:
+                    try:
+                        job['triage'] = verdicts[i].result(timeout=max(0.0, deadline - time.monotonic()))
+                    except FutureTimeout:
+                        verdicts[i].add_done_callback(lambda future, job=job: self._late_verdict(job, future))
+                    except Exception as e:
+                        logger.warning(f"⚠️  No triage verdict: {e}")
+                ok = self.alert(job)
+                alerted = time.time()
+                sent += ok
+                posted_ts = job.get('posted_ts')
+                self._record({
+                    'fingerprint': job_fingerprint(job),
+                    'title': job.get('title', ''),
+                    'query': query,
+                    'match_score': job.get('match_score'),
+                    'verdict': (job.get('triage') or {}).get('verdict'),
+                    'detected_at': datetime.fromtimestamp(detected).isoformat(),
+                    'alert_latency_s': round(alerted - detected, 3),
+                    'posted_age_s': round(detected - posted_ts) if posted_ts else None,
+                    'sent': bool(ok)
+                })
+                logger.info(f"🔔 Alert {'sent' if ok else 'FAILED'} in {alerted - detected:.2f}s: "
+                            f"{job.get('title', '')[:60]}")
+        
+        return sent
+    
+    def run(self, max_polls: Optional[int] = None):
+        """Poll until interrupted (or max_polls times)"""
+        logger.info(f"👀 Watching {len(self.queries)} quer{'y' if len(self.queries) == 1 else 'ies'} "
+                    f"every {self.interval / 60:g} min")
+        if self.profile is None:
+            logger.warning("⚠️  No profile found, alerting on every new job")
+        
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                started = time.time()
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    logger.error(f"❌ Watch poll failed: {e}")
+                polls += 1
+                
+                if max_polls is None or polls < max_polls:
+                    time.sleep(max(0.0, self.interval - (time.time() - started)))
+        
+        except KeyboardInterrupt:
+            logger.info("\n👋 Watcher stopped by user")
+        
+        finally:
+            self.scraper.cleanup()
+            self.scraper.driver = None
+
+def watch_jobs(queries: Optional[List[str]] = None, interval_minutes: Optional[float] = None,
+               max_polls: Optional[int] = None):
+    """Main watch function"""
+    JobWatcher(queries, interval_minutes).run(max_polls)
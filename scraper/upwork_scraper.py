@@ -15,6 +15,7 @@ import time
 from typing import List, Dict, Optional
 from config import Config
 from utils.logger import logger
+from utils.metrics import metrics
 from utils.validators import validate_jobs_list
 
 class UpworkScraper:
@@ -71,6 +72,7 @@ class UpworkScraper:
                     all_jobs.extend(jobs)
                     logger.info(f"✅ Page {page}: Found {len(jobs)} jobs")
                 else:
+                    metrics.incr('scraper.empty_pages')
                     logger.warning(f"⚠️  Page {page}: No jobs found")
                 
                 # Rate limiting
@@ -79,6 +81,8 @@ class UpworkScraper:
             
             # Validate jobs
             valid_jobs = validate_jobs_list(all_jobs)
+            metrics.incr('jobs.scraped', len(valid_jobs))
+            metrics.incr('jobs.invalid', len(all_jobs) - len(valid_jobs))
             logger.info(f"✅ Total valid jobs: {len(valid_jobs)}")
             
             return valid_jobs
@@ -90,6 +94,7 @@ class UpworkScraper:
         finally:
             self.cleanup()
     
+    @metrics.timed('scraper.page')
     def _scrape_page(self, search_query: str, page: int) -> List[Dict]:
         """Scrape single page with retry"""
         for attempt in range(self.config.MAX_RETRIES):
@@ -118,6 +123,7 @@ class UpworkScraper:
             except TimeoutException:
                 logger.warning(f"Timeout on page {page}, attempt {attempt + 1}/{self.config.MAX_RETRIES}")
                 if attempt < self.config.MAX_RETRIES - 1:
+                    metrics.incr('scraper.retries')
                     time.sleep(5)
                 else:
                     return []
@@ -166,6 +172,13 @@ class UpworkScraper:
             except:
                 pass
             
+            # Job link (used by alerts)
+            url = None
+            try:
+                url = card.find_element(By.CSS_SELECTOR, "a[href*='/jobs/']").get_attribute('href')
+            except:
+                pass
+            
             if title and title != "N/A":
                 return {
                     "title": title,
@@ -173,6 +186,7 @@ class UpworkScraper:
                     "skills": skills[:20],  # Limit skills
                     "budget": budget,
                     "posted": posted,
+                    "url": url,
                     "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
                 }
             
@@ -0,0 +1,18 @@
+"""
+Test Configuration
+Shared fixtures
+"""
+
+from pathlib import Path
+import pytest
+from config import Config
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point every Config path under data/ at a temporary directory"""
+    base = Config.DATA_DIR
+    for name in dir(Config):
+        value = getattr(Config, name)
+        if isinstance(value, Path) and base in (value, *value.parents):
+            monkeypatch.setattr(Config, name, tmp_path / value.relative_to(base))
+    return tmp_path
@@ -1 +1,95 @@
+"""
+Analyzer Tests
+Local pattern detection and profile scoring
+"""
 
+import json
+import numpy as np
+from analyzer.gemini_analyzer import GeminiAnalyzer, _complete_items
+from analyzer.job_scorer import FeatureCache, FreelancerProfile, JobFeatures
+from analyzer.pattern_detector import detect_project_patterns, summarize_patterns
+
+def _job(title: str, budget: str) -> dict:
+    return {'title': title, 'description': f"{title} with python scraping automation",
+            'budget': budget, 'skills': ['Python']}
+
+def test_pattern_budgets_split_by_type():
+    jobs = [_job('Python scraping bot', 'Hourly: $20.00 - $40.00'),
+            _job('Python scraping script', 'Hourly: $40.00'),
+            _job('Python scraping tool', '$500'),
+            _job('Python scraping app', '$1,500'),
+            _job('Python scraping crawler', '')]
+    patterns = detect_project_patterns(jobs)
+    assert len(patterns) == 1 and patterns[0]['size'] == len(jobs)
+    assert patterns[0]['median_hourly_rate'] == 35.0
+    assert patterns[0]['median_fixed_budget'] == 1000.0
+    
+    summary = json.loads(summarize_patterns(patterns))
+    assert {'median_hourly_rate_usd', 'median_fixed_budget_usd'} <= set(summary[0])
+
+def test_pattern_sizes_count_only_the_run():
+    jobs = [_job('Python scraping bot', 'Hourly: $20.00 - $40.00'),
+            _job('Python scraping script', '$500')]
+    topics = ('Logo design for bakery', 'Logo design for gym', 'Mobile app design', 'Mobile app redesign')
+    history = [_job(f"{topics[i % 4]} {i}", '$9,000') for i in range(20)]
+    patterns = detect_project_patterns(jobs, history)
+    
+    assert sum(p['size'] for p in patterns) == len(jobs)
+    assert sum(p['share'] for p in patterns) == 1.0
+    assert all(p['median_fixed_budget'] in (None, 500.0) for p in patterns)
+
+def _profile(**overrides) -> FreelancerProfile:
+    values = {'skills': {'Python': 1.0, 'SQL': 0.5}, 'min_hourly_rate': 30,
+              'min_fixed_budget': 500, 'project_types': ['data pipeline', 'AI chatbot']}
+    values.update(overrides)
+    return FreelancerProfile(**values)
+
+def test_project_types_match_whole_phrases():
+    jobs = [{'title': 'Build a data pipeline in Airflow'},
+            {'title': 'Data entry for a small shop'},
+            {'title': 'AI chatbot for support'},
+            {'title': 'AI image tagging'}]
+    matched = JobFeatures(jobs).score(_profile())['project_type']
+    assert matched.tolist() == [1.0, 0.0, 1.0, 0.0]
+
+def test_cached_and_merged_features_score_the_same(tmp_path):
+    runs = [('run_a', [_job('Python ETL data pipeline', '$600'), _job('SQL report', 'Hourly: $25.00')]),
+            ('run_b', [_job('AI chatbot in Python', 'Hourly: $50.00')]),
+            ('run_c', [])]
+    jobs = [job for _, run in runs for job in run]
+    expected = JobFeatures(jobs).score(_profile())['total']
+    
+    cache = FeatureCache(tmp_path)
+    merged = JobFeatures.concat([cache.features(key, run) for key, run in runs])
+    assert np.allclose(merged.score(_profile())['total'], expected)
+    assert cache.misses == 3
+    
+    cached = JobFeatures.concat([cache.features(key, run) for key, run in runs])
+    assert cache.hits == 3
+    assert np.allclose(cached.score(_profile())['total'], expected)
+    assert [job['title'] for job in cached.top_k(_profile(), 3)] == \
+           [job['title'] for job in JobFeatures(jobs).top_k(_profile(), 3)]
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+def test_complete_items_of_cut_off_array():
+    assert _complete_items('[{"id": 1, "verdict": "apply"}, {"id": 2, "verd') == [{'id': 1, 'verdict': 'apply'}]
+    assert _complete_items('') == []
+
+def test_truncated_triage_keeps_verdicts_and_retries_the_rest(data_dir):
+    analyzer = GeminiAnalyzer()
+    jobs = [_job(f"Python task {n}", '$500') for n in range(3)]
+    responses = [
+        _Response('[{"id": 1, "verdict": "good fit", "reason": "fit"}, {"id": 2, "verdict": "ma'),
+        _Response('[{"id": 1, "verdict": "skip", "reason": "low"}, {"id": 2, "verdict": "maybe", "reason": "?"}]'),
+    ]
+    prompts = []
+    analyzer._generate = lambda prompt, kind, **kwargs: prompts.append(prompt) or responses.pop(0)
+    
+    verdicts = analyzer.triage_jobs(jobs)
+    assert [v['verdict'] for v in verdicts] == ['good fit', 'skip', 'maybe']
+    assert len(prompts) == 2 and 'Python task 0' not in prompts[1]
+    cached = analyzer.triage_jobs(jobs)
+    assert [v['verdict'] for v in cached] == ['good fit', 'skip', 'maybe'] and not responses
@@ -0,0 +1,126 @@
+"""
+Checkpoint Tests
+Resuming a failed pipeline run from stored stage outputs
+"""
+
+import json
+import os
+import time
+from config import Config
+from utils.checkpoints import RunCheckpoints
+from utils.pipeline import Pipeline
+
+def _pipeline(calls: list, fail: bool) -> Pipeline:
+    def stage(name, value):
+        def run(**inputs):
+            calls.append(name)
+            return value(**inputs)
+        return run
+    
+    def report(jobs, stats):
+        calls.append('report')
+        if fail:
+            raise RuntimeError('renderer crashed')
+        return f"{len(jobs)} jobs, {stats['skills']} skills"
+    
+    return (Pipeline('test')
+            .add('scraped', stage('scraped', lambda: [{'title': 'a'}, {'title': 'b'}]))
+            .add('jobs', stage('jobs', lambda scraped: scraped[:1]), inputs=['scraped'], checkpoint=True)
+            .add('stats', stage('stats', lambda jobs: {'skills': 3}), inputs=['jobs'],
+                 checkpoint=lambda value: 'skills' in value)
+            .add('report', report, inputs=['jobs', 'stats']))
+
+def test_resume_restores_completed_stages(tmp_path):
+    checkpoints = RunCheckpoints('run1', tmp_path)
+    checkpoints.start('python')
+    calls = []
+    run = _pipeline(calls, fail=True).run(checkpoints)
+    checkpoints.finish(run.ok)
+    assert not run.ok
+    assert set(checkpoints.completed) == {'jobs', 'stats'}
+    
+    resumed = RunCheckpoints.latest_failed('python', runs_dir=tmp_path)
+    assert resumed.run_id == 'run1'
+    calls.clear()
+    run = _pipeline(calls, fail=False).run(resumed)
+    
+    assert run.ok
+    assert calls == ['report']
+    assert run['report'] == '1 jobs, 3 skills'
+    assert {name for name, r in run.results.items() if r.restored} == {'jobs', 'stats'}
+    # Not checkpointed, but only restored stages need it
+    assert run.results['scraped'].status == 'unused'
+
+def test_unusable_checkpoint_reruns_stage(tmp_path):
+    checkpoints = RunCheckpoints('run2', tmp_path)
+    _pipeline([], fail=True).run(checkpoints)
+    checkpoints.save('stats', {'stale': True})
+    (checkpoints.dir / 'jobs.json').write_text('[{"title"', encoding='utf-8')
+    
+    calls = []
+    run = _pipeline(calls, fail=False).run(RunCheckpoints('run2', tmp_path))
+    assert run.ok
+    assert calls == ['scraped', 'jobs', 'stats', 'report']
+
+def test_completed_runs_are_not_resumed_and_get_pruned(tmp_path):
+    checkpoints = RunCheckpoints('run3', tmp_path)
+    checkpoints.start('python')
+    checkpoints.finish(True)
+    assert RunCheckpoints.latest_failed('python', runs_dir=tmp_path) is None
+    
+    manifest = json.loads((checkpoints.dir / 'run.json').read_text())
+    manifest['updated'] = time.time() - 3 * 86400
+    (checkpoints.dir / 'run.json').write_text(json.dumps(manifest))
+    assert RunCheckpoints.prune(days=2, runs_dir=tmp_path) == 1
+    assert not os.path.exists(checkpoints.dir)
+
+def test_output_after_timeout_is_not_checkpointed(tmp_path):
+    checkpoints = RunCheckpoints('run4', tmp_path)
+    
+    def slow():
+        time.sleep(0.3)
+        return 'late'
+    
+    run = Pipeline('test').add('slow', slow, timeout=0.05, checkpoint=True).run(checkpoints)
+    checkpoints.finish(run.ok)
+    time.sleep(0.4)
+    assert run.results['slow'].status == 'timeout'
+    assert not checkpoints.has('slow')
+    assert not (checkpoints.dir / 'slow.json').exists()
+
+def test_resume_after_gemini_failure_calls_gemini_again(data_dir, monkeypatch):
+    import main
+    from analyzer import gemini_analyzer
+    from utils.database import JobDatabase
+    
+    calls = {'scrape': 0, 'gemini': 0}
+    
+    def scrape(query, pages):
+        calls['scrape'] += 1
+        return [{'title': 'Build a chatbot', 'description': 'LLM work', 'skills': ['Python'],
+                 'budget': '$500', 'posted': '1 hour ago'}]
+    
+    class Model:
+        def generate_content(self, prompt, **kwargs):
+            calls['gemini'] += 1
+            if calls['gemini'] == 1:
+                raise RuntimeError('503 overloaded')
+            return type('Response', (), {'text': 'Gemini analysis'})()
+    
+    monkeypatch.setattr(main, 'db', JobDatabase())
+    monkeypatch.setattr(main, 'scrape_upwork_jobs', scrape)
+    monkeypatch.setattr(main, 'queue_email_report', lambda *args, **kwargs: True)
+    monkeypatch.setattr(main.outbox, 'start', lambda: None)
+    monkeypatch.setattr(gemini_analyzer.analyzer, 'model', Model())
+    monkeypatch.setattr(Config, 'REPORT_FORMATS', [])
+    monkeypatch.setattr(Config, 'REPORT_APPENDIX', False)
+    monkeypatch.setattr(Config, 'RESUME_FAILED_RUNS', True)
+    
+    app = main.UpworkJobAnalyzer()
+    assert not app.run_analysis()
+    failed = RunCheckpoints.latest_failed(Config.SEARCH_QUERY)
+    assert failed is not None and not failed.has('analysis')
+    
+    assert app.run_analysis()
+    assert calls == {'scrape': 1, 'gemini': 2}
+    assert RunCheckpoints(failed.run_id).load('analysis') == 'Gemini analysis'
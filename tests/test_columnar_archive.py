@@ -0,0 +1,95 @@
+"""
+Columnar Archive Tests
+Compaction round trip and reading compacted history back
+"""
+
+import json
+import lzma
+from datetime import datetime, timedelta
+from config import Config
+from utils.columnar_archive import ColumnarArchive, ColumnarChunk
+from utils.database import JobDatabase
+
+def _snapshot(raw_dir, days_ago: int, jobs: list, name: str = None):
+    """Write a raw snapshot dated `days_ago` days back"""
+    stamp = (datetime.now() - timedelta(days=days_ago)).strftime('%Y%m%d_%H%M%S')
+    path = raw_dir / (name or f"jobs_{stamp}.json")
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'query': 'python', 'jobs': jobs}), encoding='utf-8')
+    return path
+
+def _job(title: str, **extra) -> dict:
+    job = {'title': title, 'description': f"{title} description", 'budget': '$100 - $200',
+           'posted': '1 day ago', 'skills': ['Python', 'SQL'], 'url': f"https://example.com/{title}",
+           'scraped_ts': 1700000000.0, 'posted_ts': None}
+    job.update(extra)
+    return job
+
+def test_compaction_round_trip(data_dir):
+    old = [_job('a', client_country='DE'), _job('b')]
+    _snapshot(Config.RAW_DATA_DIR, 40, old)
+    _snapshot(Config.RAW_DATA_DIR, 35, [_job('c')])
+    _snapshot(Config.RAW_DATA_DIR, 1, [_job('d')])
+    
+    archive = ColumnarArchive()
+    assert archive.compact(retention_days=30) == 3
+    assert len(list(Config.RAW_DATA_DIR.glob('jobs_*.json'))) == 1
+    
+    chunk, = archive.chunks()
+    assert chunk.run_sizes == [2, 1]
+    assert list(chunk.iter_runs()) == [old, [_job('c')]]
+    
+    with lzma.open(chunk.path / 'text.jsonl.xz', 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert not any({'skills', 'scraped_ts', 'posted_ts'} & set(row) for row in rows)
+
+def test_stats_read_compacted_runs_from_columns(data_dir, monkeypatch):
+    _snapshot(Config.RAW_DATA_DIR, 40, [_job('a', skills=['ML', 'Machine Learning']), _job('b')])
+    _snapshot(Config.RAW_DATA_DIR, 35, [_job('a', skills=['Python']), _job('c', duplicate_of='x')])
+    _snapshot(Config.RAW_DATA_DIR, 34, [_job('d', duplicate_of='x')])
+    _snapshot(Config.RAW_DATA_DIR, 1, [_job('b'), _job('e')])
+    db = JobDatabase()
+    before = db.get_historical_stats(days=None)
+    
+    assert db.compact_raw_data(30) == 5
+    def inflate(self):
+        raise AssertionError("stats decompressed the jobs")
+    monkeypatch.setattr(ColumnarChunk, 'iter_jobs', inflate)
+    
+    after = db.get_historical_stats(days=None)
+    assert (after['total_jobs'], after['files_analyzed']) == (before['total_jobs'], 4) == (4, 4)
+    assert dict(after['top_skills']) == dict(before['top_skills']) == {'Python': 4, 'SQL': 3}
+    assert db.get_historical_stats(days=2)['total_jobs'] == 3
+
+def test_history_includes_compacted_runs(data_dir):
+    _snapshot(Config.RAW_DATA_DIR, 40, [_job('a')])
+    _snapshot(Config.RAW_DATA_DIR, 35, [_job('b')])
+    _snapshot(Config.RAW_DATA_DIR, 1, [_job('c')])
+    db = JobDatabase()
+    before = [job['title'] for job in db.iter_jobs()]
+    
+    assert db.compact_raw_data(30) == 2
+    assert [job['title'] for job in db.iter_jobs()] == before == ['a', 'b', 'c']
+    assert [job.title for job in db.load_history(2)] == ['c', 'b']
+    assert db.get_historical_stats(days=None)['total_jobs'] == 3
+    assert db.rebuild_search_index() == 3
+    
+    keys = [key for key, _ in db.load_history_runs(None)]
+    assert keys[0].startswith('jobs_') and keys[1].startswith('chunk_') and len(set(keys)) == 3
+
+def test_unreadable_snapshot_is_skipped(data_dir):
+    _snapshot(Config.RAW_DATA_DIR, 40, [_job('a')])
+    bad = Config.RAW_DATA_DIR / f"jobs_{(datetime.now() - timedelta(days=39)).strftime('%Y%m%d_%H%M%S')}.json"
+    bad.write_text('{"jobs": [', encoding='utf-8')
+    
+    archive = ColumnarArchive()
+    assert archive.compact(retention_days=30) == 1
+    assert bad.exists()
+    assert not list(Config.COLUMNAR_DIR.glob('.*.tmp'))
+    assert archive.compact(retention_days=30) == 0
+
+def test_jsonl_storage_is_not_compacted(data_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'STORAGE_FORMAT', 'jsonl')
+    path = _snapshot(Config.RAW_DATA_DIR, 40, [_job('a')])
+    assert JobDatabase().compact_raw_data(30) == 0
+    assert path.exists()
@@ -0,0 +1,65 @@
+"""
+Dedup Tests
+Fingerprints, content hashes and the sighting index
+"""
+
+from utils.dedup_index import DedupIndex
+from utils.helpers import job_content_hash, job_fingerprint
+
+def _card_job(age: str, **overrides) -> dict:
+    """Job scraped from a card without a description element"""
+    job = {
+        'title': 'Build a data pipeline',
+        'description': f"Build a data pipeline\nPosted {age}\nWe need an ETL job in Python.",
+        'posted': f"Posted {age}",
+        'skills': ['Python', 'ETL'],
+        'budget': '$500',
+    }
+    job.update(overrides)
+    return job
+
+def test_hash_ignores_posted_text():
+    first = _card_job('5 minutes ago')
+    later = _card_job('2 hours ago')
+    assert job_fingerprint(first) == job_fingerprint(later)
+    assert job_content_hash(first) == job_content_hash(later)
+
+def test_hash_ignores_relative_time_when_posted_unknown():
+    first = _card_job('5 minutes ago', posted='Unknown')
+    later = _card_job('yesterday', posted='Unknown')
+    assert job_content_hash(first) == job_content_hash(later)
+
+def test_hash_ignores_whitespace_and_case():
+    job = _card_job('1 day ago')
+    spaced = dict(job, title='  build a   DATA pipeline ',
+                  description=job['description'].replace(' ', '  ').replace('\n', ' \n '))
+    assert job_content_hash(job) == job_content_hash(spaced)
+
+def test_hash_changes_on_edit():
+    job = _card_job('1 day ago')
+    assert job_content_hash(job) != job_content_hash(dict(job, budget='$800'))
+    assert job_content_hash(job) != job_content_hash(dict(job, skills=['Python', 'Airflow']))
+    edited = dict(job, description=job['description'].replace('Python', 'Go'))
+    assert job_content_hash(job) != job_content_hash(edited)
+
+def test_index_reports_new_and_changed_only(tmp_path):
+    index = DedupIndex(tmp_path / 'index.json')
+    job = _card_job('5 minutes ago')
+    
+    assert index.update([job], seen_at='2026-01-01T00:00:00') == [job]
+    assert index.update([_card_job('3 hours ago')], seen_at='2026-01-01T03:00:00') == []
+    
+    edited = _card_job('4 hours ago', budget='$900')
+    assert index.update([edited], seen_at='2026-01-01T04:00:00') == [edited]
+    
+    reloaded = DedupIndex(tmp_path / 'index.json')
+    entry = reloaded.get(job_fingerprint(job))
+    assert entry['sightings'] == 3
+    assert entry['first_seen'] == '2026-01-01T00:00:00'
+    assert entry['last_seen'] == '2026-01-01T04:00:00'
+
+def test_duplicate_in_one_batch_counts_once(tmp_path):
+    index = DedupIndex(tmp_path / 'index.json')
+    job = _card_job('5 minutes ago')
+    assert index.update([job, dict(job)]) == [job]
+    assert index.get(job_fingerprint(job))['sightings'] == 1
@@ -0,0 +1,67 @@
+"""
+Metrics Tests
+Per-run differences, export and the disabled fast path
+"""
+
+import json
+import pytest
+from config import Config
+from utils.metrics import Metrics
+
+def test_since_reports_only_the_interval():
+    m = Metrics()
+    m.observe('stage.scraped', 2.0)
+    m.incr('jobs.scraped', 40)
+    m.incr('emails.sent')
+    mark = m.snapshot()
+    
+    m.observe('stage.scraped', 3.0)
+    m.observe('stage.report', 0.5)
+    m.incr('jobs.scraped', 10)
+    
+    delta = m.since(mark)
+    assert delta['spans'] == {
+        'stage.scraped': {'count': 1, 'seconds': 3.0, 'max_seconds': 3.0},
+        'stage.report': {'count': 1, 'seconds': 0.5, 'max_seconds': 0.5},
+    }
+    assert delta['counters'] == {'jobs.scraped': 10}
+    assert m.since(None)['counters'] == {'jobs.scraped': 50, 'emails.sent': 1}
+
+def test_span_counts_errors():
+    m = Metrics()
+    with pytest.raises(ValueError):
+        with m.span('gemini.generate_content.analysis'):
+            raise ValueError('quota')
+    assert m.snapshot()['spans']['gemini.generate_content.analysis'][0] == 1
+    assert m.snapshot()['counters'] == {'gemini.generate_content.analysis.errors': 1}
+
+def test_disabled_records_nothing():
+    m = Metrics(enabled=False)
+    
+    @m.timed('scraper.page')
+    def page():
+        return 'ok'
+    
+    with m.span('pdf.output'):
+        m.incr('jobs.scraped', 5)
+    assert page() == 'ok'
+    assert m.snapshot() == {'spans': {}, 'counters': {}}
+    assert m.export('run') is None
+
+def test_export_writes_run_json_and_prometheus(data_dir):
+    m = Metrics()
+    m.incr('gemini.prompt_tokens', 123456789)
+    mark = m.snapshot()
+    m.observe('stage.pdf', 1.25)
+    m.incr('gemini.prompt_tokens', 1000)
+    
+    filename = m.export('run42', mark, {'jobs': 50, 'seconds': 12.5})
+    data = json.loads(open(filename, encoding='utf-8').read())
+    assert data['run_id'] == 'run42'
+    assert data['counters'] == {'gemini.prompt_tokens': 1000}
+    assert data['gauges'] == {'jobs': 50, 'seconds': 12.5}
+    
+    text = Config.METRICS_TEXTFILE.read_text()
+    assert 'upwork_gemini_prompt_tokens_total 123457789\n' in text
+    assert 'upwork_span_seconds_sum{span="stage.pdf"} 1.250000' in text
+    assert 'upwork_last_run_jobs 50\n' in text
@@ -0,0 +1,72 @@
+"""
+Near-Duplicate Tests
+Collapsing repeats within a batch and marking reposts of older postings
+"""
+
+from utils.helpers import job_fingerprint
+from utils.near_duplicates import NearDuplicateIndex
+
+BODY = ("We are looking for an experienced Python developer to build a web scraping "
+        "pipeline that collects product listings from several e-commerce sites, cleans "
+        "the data and loads it into PostgreSQL every night. Experience with Selenium, "
+        "proxies and scheduling is required. Please share similar work you have done.")
+
+def _job(title: str, description: str = BODY) -> dict:
+    return {'title': title, 'description': description, 'posted': 'Unknown'}
+
+def test_batch_repeats_collapse(tmp_path):
+    index = NearDuplicateIndex(tmp_path, threshold=0.8)
+    original = _job('Python web scraping pipeline')
+    repeat = _job('Python web scraping pipeline', BODY + ' Thanks!')
+    other = _job('Logo design', 'Design a minimalist logo for a coffee shop brand in two colours.')
+    
+    reworded = _job('Python web scraping pipeline', BODY.replace('experienced', 'skilled', 1))
+    
+    kept, dropped = index.collapse_batch([original, repeat, reworded, other])
+    assert kept == [original, other]
+    assert dropped == 2
+    assert 'duplicate_of' not in original
+
+def test_reposts_are_kept_and_marked(tmp_path):
+    original = _job('Python web scraping pipeline')
+    index = NearDuplicateIndex(tmp_path, threshold=0.8)
+    index.collapse_batch([original])
+    index.save()
+    
+    repost = _job('Python web scraping pipeline (reposted)', BODY)
+    kept, dropped = NearDuplicateIndex(tmp_path, threshold=0.8).collapse_batch([repost])
+    assert kept == [repost] and dropped == 0
+    assert repost['duplicate_of'] == job_fingerprint(original)
+    assert repost['duplicate_similarity'] >= 0.8
+
+def test_distinct_jobs_not_marked(tmp_path):
+    index = NearDuplicateIndex(tmp_path, threshold=0.8)
+    jobs = [_job('Python web scraping pipeline'),
+            _job('Data entry', 'Copy 500 rows from scanned invoices into a Google Sheet by Friday.')]
+    kept, dropped = index.collapse_batch(jobs)
+    assert dropped == 0
+    assert not any('duplicate_of' in job for job in kept)
+
+def test_repost_of_repost_points_at_the_original(tmp_path):
+    words = BODY.split()
+    def reword(base, positions, tag):
+        changed = list(base)
+        for i in positions:
+            changed[i] = f"{tag}{i}"
+        return changed
+    
+    first = reword(words, [10, 30], 'x')
+    second = reword(first, [20, 45], 'y')
+    original, repost, repost_of_repost = (_job('Python web scraping pipeline', ' '.join(text))
+                                          for text in (words, first, second))
+    
+    index = NearDuplicateIndex(tmp_path, threshold=0.7)
+    index.collapse_batch([original])
+    index.collapse_batch([repost])
+    index.save()
+    # Close to the repost only, not to the original
+    assert [key for key, _ in index.query(index.signature(repost_of_repost))] == [job_fingerprint(repost)]
+    
+    kept, _ = NearDuplicateIndex(tmp_path, threshold=0.7).collapse_batch([repost_of_repost])
+    assert repost['duplicate_of'] == job_fingerprint(original)
+    assert kept[0]['duplicate_of'] == job_fingerprint(original)
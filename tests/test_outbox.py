@@ -0,0 +1,113 @@
+"""
+Outbox Tests
+Idempotent queueing, retries with backoff and claim recovery
+"""
+
+import smtplib
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+import pytest
+from config import Config
+from reporter.outbox import EmailOutbox
+
+class _Pool:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.sent = []
+    
+    def send_many(self, messages):
+        self.sent.extend(messages)
+        return [self.errors.pop(0) if self.errors else None for _ in messages]
+
+class _Sender:
+    def __init__(self, *errors):
+        self.pool = _Pool(errors)
+    
+    def log_error(self, error, receiver):
+        pass
+
+def _message(receiver: str = 'a@example.com') -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg.attach(MIMEText('report body'))
+    msg['To'] = receiver
+    msg['Subject'] = 'Report'
+    return msg
+
+def _row(outbox: EmailOutbox, send_id: str):
+    return outbox.conn.execute('SELECT * FROM outbox WHERE send_id = ?', (send_id,)).fetchone()
+
+@pytest.fixture
+def outbox(data_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'OUTBOX_RETRY_SECONDS', 30)
+    monkeypatch.setattr(Config, 'OUTBOX_MAX_ATTEMPTS', 3)
+    box = EmailOutbox(data_dir / 'outbox.db', _Sender())
+    yield box
+    box.close()
+
+def test_enqueue_is_idempotent(outbox, tmp_path):
+    report = tmp_path / 'report.pdf'
+    report.write_bytes(b'%PDF-1.4 report')
+    first = outbox.enqueue(_message(), 'run-1', [str(report)])
+    assert outbox.enqueue(_message(), 'run-1', [str(report)]) == first
+    other = outbox.enqueue(_message('b@example.com'), 'run-1', [str(report)])
+    
+    assert other != first
+    assert outbox.status() == {'pending': 2}
+    assert outbox.conn.execute('SELECT COUNT(*) FROM attachments').fetchone()[0] == 1
+    
+    outbox.flush(5)
+    assert outbox.status() == {'sent': 2}
+    assert [msg['Message-ID'] for msg in outbox.sender.pool.sent] == \
+           [f"<{first}@upwork-job-analyzer>", f"<{other}@upwork-job-analyzer>"]
+    assert outbox.enqueue(_message(), 'run-1') == first
+    assert outbox.status() == {'sent': 2}
+
+def test_retry_with_backoff_then_give_up(outbox):
+    outbox._sender = _Sender(*[smtplib.SMTPServerDisconnected('dropped')] * 3)
+    send_id = outbox.enqueue(_message(), 'run-2')
+    
+    before = time.time()
+    outbox.deliver_due()
+    row = _row(outbox, send_id)
+    assert (row['status'], row['attempts']) == ('pending', 1)
+    assert 30 * 0.8 <= row['next_attempt_ts'] - before <= 30 * 1.2 + 1
+    assert outbox.deliver_due() == 0  # not due yet
+    
+    outbox.conn.execute('UPDATE outbox SET next_attempt_ts = 0')
+    before = time.time()
+    outbox.deliver_due()
+    row = _row(outbox, send_id)
+    assert row['attempts'] == 2
+    assert 60 * 0.8 <= row['next_attempt_ts'] - before <= 60 * 1.2 + 1
+    
+    outbox.conn.execute('UPDATE outbox SET next_attempt_ts = 0')
+    outbox.deliver_due()
+    assert _row(outbox, send_id)['status'] == 'failed'
+
+def test_permanent_error_fails_at_once(outbox):
+    outbox._sender = _Sender(smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'no such user')}))
+    send_id = outbox.enqueue(_message(), 'run-3')
+    outbox.deliver_due()
+    assert (_row(outbox, send_id)['status'], _row(outbox, send_id)['attempts']) == ('failed', 1)
+
+def test_flush_leaves_fresh_claims_alone(outbox):
+    send_id = outbox.enqueue(_message(), 'run-4')
+    assert len(outbox._claim(10)) == 1
+    
+    outbox.flush(1)
+    assert _row(outbox, send_id)['status'] == 'sending'
+    assert outbox.sender.pool.sent == []
+    
+    outbox.conn.execute('UPDATE outbox SET claimed_ts = ?', (time.time() - Config.OUTBOX_CLAIM_TIMEOUT_SECONDS - 1,))
+    outbox.flush(1)
+    assert _row(outbox, send_id)['status'] == 'sent'
+
+def test_claimed_row_is_not_claimed_twice(outbox, data_dir):
+    outbox.enqueue(_message(), 'run-5')
+    other = EmailOutbox(data_dir / 'outbox.db', _Sender())
+    try:
+        assert len(outbox._claim(10)) == 1
+        assert other._claim(10) == []
+    finally:
+        other.close()
@@ -0,0 +1,93 @@
+"""
+Pipeline Tests
+Stage ordering, overlap, timeouts and failure policies
+"""
+
+import threading
+import time
+import pytest
+from reporter import report_model
+from utils.pipeline import CONTINUE, Pipeline
+
+def _sleeper(seconds: float, value=None):
+    def stage(**inputs):
+        time.sleep(seconds)
+        return value
+    return stage
+
+def test_dependencies_finish_before_dependents_start():
+    pipeline = (Pipeline('test', max_workers=4)
+                .add('a', _sleeper(0.05, 1))
+                .add('b', _sleeper(0.05, 2))
+                .add('c', lambda a, b: a + b, inputs=['a', 'b'])
+                .add('d', lambda: 'done', after=['c']))
+    run = pipeline.run()
+    
+    assert run.ok
+    assert run['c'] == 3
+    assert run.results['c'].started >= max(run.results['a'].finished, run.results['b'].finished)
+    assert run.results['d'].started >= run.results['c'].finished
+    # Independent stages overlap
+    assert run.results['b'].started < run.results['a'].finished
+    assert [r.name for r in run.critical_path()][-2:] == ['c', 'd']
+
+def test_max_workers_limits_concurrency():
+    active, peak, lock = [0], [0], threading.Lock()
+    
+    def stage():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.03)
+        with lock:
+            active[0] -= 1
+    
+    pipeline = Pipeline('test', max_workers=2)
+    for n in range(5):
+        pipeline.add(f"s{n}", stage)
+    assert pipeline.run().ok
+    assert peak[0] == 2
+
+def test_timeout_aborts_and_skips_dependents():
+    run = (Pipeline('test')
+           .add('slow', _sleeper(1.0), timeout=0.1)
+           .add('after', lambda slow: slow, inputs=['slow'])
+           .run())
+    
+    assert not run.ok
+    assert run.results['slow'].status == 'timeout'
+    assert run.results['after'].status == 'skipped'
+    assert run.seconds < 0.5
+
+def test_continue_policy_passes_default():
+    def broken():
+        raise RuntimeError('boom')
+    
+    run = (Pipeline('test')
+           .add('broken', broken, on_error=CONTINUE, default=[])
+           .add('late', _sleeper(1.0), timeout=0.1, on_error=CONTINUE, default='fallback')
+           .add('use', lambda broken, late: (broken, late), inputs=['broken', 'late'])
+           .run())
+    
+    assert run.ok
+    assert run.results['broken'].error == 'boom'
+    assert run['use'] == ([], 'fallback')
+
+def test_add_validates_stages():
+    pipeline = Pipeline('test').add('a', lambda: 1)
+    with pytest.raises(ValueError):
+        pipeline.add('a', lambda: 1)
+    with pytest.raises(ValueError):
+        pipeline.add('b', lambda missing: missing, inputs=['missing'])
+    with pytest.raises(ValueError):
+        pipeline.add('c', lambda other: other, inputs=['a'])
+
+def test_empty_format_list_renders_nothing(monkeypatch):
+    rendered = []
+    monkeypatch.setitem(report_model.RENDERERS, 'pdf', lambda document, name: rendered.append('pdf'))
+    monkeypatch.setitem(report_model.RENDERERS, 'html', lambda document, name: rendered.append('html'))
+    
+    assert report_model.render_document(None, 'report', []) == {}
+    assert rendered == []
+    report_model.render_document(None, 'report', ['html'])
+    assert rendered == ['html']
@@ -1 +1,48 @@
+"""
+Scraper Tests
+Watch-mode alerting
+"""
 
+import json
+import time
+from concurrent.futures import Future
+from config import Config
+from scraper.job_watcher import JobWatcher
+
+class _SlowTriage:
+    """Triage queue whose verdicts arrive only when resolved by the test"""
+    
+    def __init__(self):
+        self.futures = []
+    
+    def submit(self, job):
+        self.futures.append(Future())
+        return self.futures[-1]
+    
+    def flush(self):
+        pass
+
+def _job(title: str) -> dict:
+    return {'title': title, 'description': f"{title} for a small team", 'skills': ['Python'],
+            'scraped_at': '2026-01-01 00:00:00', 'budget': '$500', 'posted': '1 minute ago'}
+
+def test_alerts_do_not_wait_for_slow_triage(data_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'TRIAGE_ENABLED', False)
+    monkeypatch.setattr(Config, 'TRIAGE_MAX_WAIT_SECONDS', 0.2)
+    alerts = []
+    watcher = JobWatcher(queries=['python'], alert=lambda job: alerts.append(dict(job)) or True)
+    watcher.profile = None
+    watcher.triage = _SlowTriage()
+    watcher._ensure_driver = lambda: None
+    watcher.seen.update([_job('Older job')])
+    watcher.scraper._scrape_page = lambda query, page: [_job('Scraper for shop'), _job('Bot for shop')]
+    
+    started = time.perf_counter()
+    assert watcher.poll_once() == 2
+    assert time.perf_counter() - started < 1.0
+    assert [job.get('triage') for job in alerts] == [None, None]
+    
+    watcher.triage.futures[0].set_result({'verdict': 'good fit', 'reason': 'matches the profile'})
+    entries = [json.loads(line) for line in Config.WATCH_LOG_FILE.read_text().splitlines()]
+    assert [entry.get('follow_up') for entry in entries] == [None, None, True]
+    assert entries[-1]['verdict'] == 'good fit'
@@ -0,0 +1,38 @@
+"""
+Skill Canonicalizer Tests
+Aliases, grouping of spelling variants and display names
+"""
+
+import pytest
+from utils.skill_canonicalizer import canonicalize_skill, canonicalize_skills
+
+@pytest.mark.parametrize('raw, canonical', [
+    ('machine learning', 'Machine Learning'),
+    ('ML', 'Machine Learning'),
+    ('Machine-Learning', 'Machine Learning'),
+    ('react.js', 'React'),
+    ('AWS', 'Amazon Web Services'),
+    ('cpp', 'C++'),
+])
+def test_aliases(raw, canonical):
+    assert canonicalize_skill(raw) == canonical
+
+@pytest.mark.parametrize('raw', [
+    '.NET', 'ASP.NET', 'GraphQL', 'OpenCV', 'Vue.js', 'UI/UX Design', 'C/C++', 'macOS',
+])
+def test_table_spellings_are_kept(raw):
+    assert canonicalize_skill(raw) == raw
+
+def test_unknown_variants_share_one_name_regardless_of_order():
+    names = {canonicalize_skill(raw) for raw in ('svelte kit  test', 'SVELTE_KIT TEST', 'Svelte-Kit Test')}
+    assert names == {'Svelte Kit Test'}
+    assert canonicalize_skills(['SVELTE_KIT TEST', 'Svelte-Kit Test']) == ['Svelte Kit Test']
+
+@pytest.mark.parametrize('raw, name', [
+    ('TF', 'Tf'), ('Transformers', 'Transformers'), ('ETL', 'ETL'), ('API', 'API'),
+])
+def test_ambiguous_abbreviations_are_not_aliased(raw, name):
+    assert canonicalize_skill(raw) == name
+
+def test_empty_and_duplicate_skills_dropped():
+    assert canonicalize_skills(['Python', '', 'python3', ' - ']) == ['Python']
@@ -0,0 +1,138 @@
+"""
+Run Checkpoints
+Stage outputs stored per run so a failed run can resume where it stopped
+"""
+
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config import Config
+from utils.helpers import atomic_write_json
+from utils.logger import logger
+
+def _jsonable(value: Any) -> Any:
+    """Fallback for values json cannot encode (numpy scalars, sets, paths)"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+class RunCheckpoints:
+    """
+    Checkpoint directory of one pipeline run
+    
+    Layout: ``<RUNS_DIR>/<run_id>/run.json`` holds the run's status and
+    the stages completed so far; each stage output is a JSON file next
+    to it. Files are written atomically, so a crash mid-write leaves the
+    previous state. Checkpoints are best effort: a value that cannot be
+    stored is logged and the run goes on.
+    """
+    
+    def __init__(self, run_id: str, runs_dir: Optional[Path] = None):
+        self.run_id = run_id
+        self.dir = Path(runs_dir or Config.RUNS_DIR) / run_id
+        self.manifest = self._read_manifest()
+        self._lock = threading.Lock()
+    
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.dir / 'run.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'run_id': self.run_id, 'status': 'new', 'stages': {}}
+    
+    def _write_manifest(self):
+        self.manifest['updated'] = time.time()
+        atomic_write_json(self.dir / 'run.json', self.manifest, indent=2)
+    
+    @property
+    def exists(self) -> bool:
+        return (self.dir / 'run.json').exists()
+    
+    @property
+    def completed(self) -> List[str]:
+        """Stages with a stored output"""
+        return list(self.manifest.get('stages', {}))
+    
+    def start(self, query: str):
+        """Mark the run as in progress"""
+        self.manifest.setdefault('started', time.time())
+        self.manifest['query'] = query
+        self.manifest['status'] = 'running'
+        self.manifest['attempts'] = self.manifest.get('attempts', 0) + 1
+        self._write_manifest()
+    
+    def finish(self, ok: bool):
+        """Mark the run completed or failed"""
+        self.manifest['status'] = 'completed' if ok else 'failed'
+        self._write_manifest()
+    
+    def has(self, stage: str) -> bool:
+        return stage in self.manifest.get('stages', {})
+    
+    def save(self, stage: str, value: Any, seconds: float = 0.0):
+        """Store one stage output"""
+        try:
+            atomic_write_json(self.dir / f"{stage}.json", value, ensure_ascii=False, default=_jsonable)
+            with self._lock:
+                self.manifest.setdefault('stages', {})[stage] = {'seconds': round(seconds, 3), 'saved': time.time()}
+                self._write_manifest()
+        except Exception as e:
+            logger.warning(f"⚠️  Could not checkpoint stage {stage}: {e}")
+    
+    def load(self, stage: str) -> Any:
+        """Stored output of a stage (raises if missing or unreadable)"""
+        with open(self.dir / f"{stage}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @classmethod
+    def latest_failed(cls, query: Optional[str] = None, max_age_hours: Optional[float] = None,
+                      runs_dir: Optional[Path] = None) -> Optional['RunCheckpoints']:
+        """
+        Most recent failed (or interrupted) run worth resuming
+        
+        Args:
+            query: Only runs for this search query
+            max_age_hours: Ignore runs started longer ago than this
+        """
+        runs_dir = Path(runs_dir or Config.RUNS_DIR)
+        if not runs_dir.exists():
+            return None
+        
+        for run_dir in sorted(runs_dir.iterdir(), reverse=True):
+            run = cls(run_dir.name, runs_dir)
+            if not run.exists:
+                continue
+            if max_age_hours is not None and time.time() - run.manifest.get('started', 0) > max_age_hours * 3600:
+                break
+            if run.manifest.get('status') == 'completed':
+                break
+            if query is None or run.manifest.get('query') == query:
+                return run
+        return None
+    
+    @classmethod
+    def prune(cls, days: Optional[int] = None, runs_dir: Optional[Path] = None) -> int:
+        """
+        Delete finished (completed or failed) runs older than `days`
+        
+        Returns:
+            Number of runs removed
+        """
+        runs_dir = Path(runs_dir or Config.RUNS_DIR)
+        days = Config.RUNS_RETENTION_DAYS if days is None else days
+        if not runs_dir.exists():
+            return 0
+        
+        removed = 0
+        cutoff = time.time() - days * 86400
+        for run_dir in runs_dir.iterdir():
+            run = cls(run_dir.name, runs_dir)
+            if run.manifest.get('updated', 0) < cutoff and run.manifest.get('status') in ('completed', 'failed'):
+                shutil.rmtree(run_dir, ignore_errors=True)
+                removed += 1
+        return removed
@@ -0,0 +1,353 @@
+"""
+Columnar Job Archive
+Compressed long-term storage for compacted raw snapshots
+"""
+
+import json
+import lzma
+import shutil
+import time
+from itertools import islice
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Tuple, Union
+import numpy as np
+from config import Config
+from utils.helpers import parse_budget, file_lock, job_fingerprint
+from utils.logger import logger
+from utils.skill_canonicalizer import canonicalize_skill
+
+def _snapshot_time(path: Path) -> Optional[datetime]:
+    """Run time encoded in a jobs_YYYYMMDD_HHMMSS*.json filename"""
+    try:
+        return datetime.strptime(path.stem[5:20], '%Y%m%d_%H%M%S')
+    except ValueError:
+        return None
+
+def _epoch(job: Dict, fallback: float) -> float:
+    """Epoch seconds a job was scraped at"""
+    if job.get('scraped_ts') is not None:
+        return job['scraped_ts']
+    try:
+        return time.mktime(time.strptime(job.get('scraped_at'), "%Y-%m-%d %H:%M:%S"))
+    except (TypeError, ValueError):
+        return fallback
+
+# Job fields stored as columns rather than in the text stream
+_COLUMN_FIELDS = ('skills', 'scraped_ts', 'posted_ts')
+
+def _posting_key(job: Dict) -> str:
+    """Posting a job counts as: the one it duplicates, or itself"""
+    return job.get('duplicate_of') or job_fingerprint(job)
+
+class ColumnarChunk:
+    """
+    One compacted batch of snapshots
+    
+    Numeric columns are ``.npy`` files opened with memory mapping, skills,
+    queries and postings are dictionary-encoded integer ids, and the rest
+    of each job lives in an lzma-compressed JSON Lines file that is only
+    read on demand. ``meta['runs']`` holds the job count of each source
+    snapshot, so the jobs can be read back run by run.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.skills: List[str] = self.meta['skills']
+        self.queries: List[str] = self.meta['queries']
+    
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped column"""
+        return np.load(self.path / f'{name}.npy', mmap_mode='r')
+    
+    def __len__(self) -> int:
+        return self.meta['rows']
+    
+    @property
+    def run_sizes(self) -> List[int]:
+        """Job count per source snapshot (chunks from before per-run sizes are one run)"""
+        return self.meta.get('runs') or [len(self)]
+    
+    def run_bounds(self) -> np.ndarray:
+        """First row of every run, followed by the row count"""
+        return np.concatenate(([0], np.cumsum(self.run_sizes))).astype(np.int64)
+    
+    def skill_counts(self, mask: np.ndarray) -> Dict[str, int]:
+        """
+        Canonical skill frequencies over the selected rows
+        
+        A skill counts once per row, even when several of the row's raw
+        spellings canonicalize to it.
+        """
+        canonical = [canonicalize_skill(skill) for skill in self.skills]
+        names = list(dict.fromkeys(skill for skill in canonical if skill))
+        if not names:
+            return {}
+        index = {skill: i for i, skill in enumerate(names)}
+        remap = np.array([index.get(skill, -1) for skill in canonical], dtype=np.int64)
+        
+        offsets = self.column('skill_offsets')
+        skill_ids = remap[self.column('skill_ids')]
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(offsets))
+        keep = mask[rows] & (skill_ids >= 0)
+        pairs = np.unique(rows[keep] * len(names) + skill_ids[keep])
+        counts = np.bincount(pairs % len(names), minlength=len(names))
+        return {names[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+    
+    def postings(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Posting keys and the posting id of every row
+        
+        A posting key is the row's ``duplicate_of`` or its fingerprint.
+        Chunks from before the posting column rebuild it from the jobs.
+        """
+        if 'postings' in self.meta:
+            return self.meta['postings'], self.column('posting_id')
+        keys: Dict[str, int] = {}
+        ids = [keys.setdefault(_posting_key(job), len(keys)) for job in self.iter_jobs()]
+        return list(keys), np.array(ids, dtype=np.int32)
+    
+    def iter_jobs(self) -> Iterator[Dict]:
+        """
+        Stream the stored jobs row by row
+        
+        The text stream holds only the fields without a column; skills,
+        ``scraped_ts`` and ``posted_ts`` are restored from the columns.
+        Chunks from before that kept only the text fields as a list.
+        """
+        offsets = self.column('skill_offsets')
+        skill_ids = self.column('skill_ids')
+        scraped = self.column('scraped_ts')
+        posted = self.column('posted_ts')
+        with lzma.open(self.path / 'text.jsonl.xz', 'rt', encoding='utf-8') as f:
+            for row, line in enumerate(f):
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    title, description, budget, posted_text = record
+                    record = {'title': title, 'description': description,
+                              'budget': budget, 'posted': posted_text}
+                if 'skills' not in record:
+                    record['skills'] = [self.skills[i] for i in skill_ids[offsets[row]:offsets[row + 1]]]
+                if 'scraped_ts' not in record:
+                    record['scraped_ts'] = float(scraped[row])
+                if 'posted_ts' not in record:
+                    record['posted_ts'] = None if np.isnan(posted[row]) else float(posted[row])
+                yield record
+    
+    def iter_runs(self) -> Iterator[List[Dict]]:
+        """Stream the stored jobs one source snapshot at a time"""
+        jobs = self.iter_jobs()
+        for size in self.run_sizes:
+            yield list(islice(jobs, size))
+
+class ColumnarArchive:
+    """Compaction of raw snapshots and analytics over the compacted history"""
+    
+    def __init__(self, archive_dir: Optional[Union[str, Path]] = None,
+                 raw_dir: Optional[Union[str, Path]] = None):
+        self.archive_dir = Path(archive_dir or Config.COLUMNAR_DIR)
+        self.raw_dir = Path(raw_dir or Config.RAW_DATA_DIR)
+    
+    def chunks(self) -> List[ColumnarChunk]:
+        """Compacted chunks, oldest first"""
+        if not self.archive_dir.exists():
+            return []
+        return [ColumnarChunk(path) for path in sorted(self.archive_dir.glob('chunk_*'))
+                if (path / 'meta.json').exists()]
+    
+    def runs(self) -> List[Tuple[ColumnarChunk, int]]:
+        """(chunk, position) of every compacted run, oldest first"""
+        return [(chunk, i) for chunk in self.chunks() for i in range(len(chunk.run_sizes))]
+    
+    def _by_chunk(self, runs: List[Tuple[ColumnarChunk, int]],
+                  newest_first: bool) -> List[Tuple[ColumnarChunk, set]]:
+        """Group (chunk, position) pairs by chunk"""
+        groups: List[Tuple[ColumnarChunk, set]] = []
+        for chunk, position in runs:
+            if not groups or groups[-1][0] is not chunk:
+                groups.append((chunk, set()))
+            groups[-1][1].add(position)
+        return groups[::-1] if newest_first else groups
+    
+    def iter_runs(self, runs: List[Tuple[ColumnarChunk, int]],
+                  newest_first: bool = False) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        (run key, jobs) of the given compacted runs
+        
+        Each chunk is decompressed once; with `newest_first` the selected
+        runs of one chunk are held in memory to reverse them.
+        
+        Args:
+            runs: (chunk, position) pairs from runs()
+            newest_first: Yield the newest run first
+        """
+        for chunk, positions in self._by_chunk(runs, newest_first):
+            try:
+                selected = ((f"{chunk.path.name}_{i}", jobs)
+                            for i, jobs in enumerate(chunk.iter_runs()) if i in positions)
+                yield from (reversed(list(selected)) if newest_first else selected)
+            except (OSError, ValueError, lzma.LZMAError) as e:
+                logger.warning(f"⚠️  Skipping unreadable chunk {chunk.path.name}: {e}")
+    
+    def posting_stats(self, runs: List[Tuple[ColumnarChunk, int]],
+                      counted: set) -> Tuple[int, Dict[str, int]]:
+        """
+        Posting and skill counts over compacted runs, read from the columns
+        
+        Runs are taken newest first and each posting counts once, in its
+        newest version, unless its key is already in `counted`. Counted
+        keys are added to `counted`.
+        
+        Args:
+            runs: (chunk, position) pairs from runs()
+            counted: Posting keys counted so far
+            
+        Returns:
+            (postings counted, canonical skill -> count)
+        """
+        total = 0
+        skills: Dict[str, int] = {}
+        for chunk, positions in self._by_chunk(runs, newest_first=True):
+            try:
+                keys, ids = chunk.postings()
+                seen = np.fromiter((key in counted for key in keys), dtype=bool, count=len(keys))
+                bounds = chunk.run_bounds()
+                mask = np.zeros(len(chunk), dtype=bool)
+                for position in sorted(positions, reverse=True):
+                    start, end = bounds[position], bounds[position + 1]
+                    run_ids, first = np.unique(ids[start:end], return_index=True)
+                    new = ~seen[run_ids]
+                    mask[start + first[new]] = True
+                    seen[run_ids[new]] = True
+                chunk_skills = chunk.skill_counts(mask)
+            except (OSError, ValueError, lzma.LZMAError) as e:
+                logger.warning(f"⚠️  Skipping unreadable chunk {chunk.path.name}: {e}")
+                continue
+            
+            counted.update(keys[i] for i in np.flatnonzero(seen))
+            total += int(mask.sum())
+            for skill, count in chunk_skills.items():
+                skills[skill] = skills.get(skill, 0) + count
+        return total, skills
+    
+    def compact(self, retention_days: Optional[int] = None, delete: bool = True) -> int:
+        """
+        Roll raw snapshots older than the retention window into a chunk
+        
+        Args:
+            retention_days: Keep snapshots newer than this as JSON
+            delete: Remove the compacted JSON files afterwards
+            
+        Returns:
+            Number of jobs compacted
+        """
+        # One compactor at a time, so no snapshot lands in two chunks
+        with file_lock(self.archive_dir / 'compact'):
+            return self._compact(retention_days, delete)
+    
+    def _read_snapshots(self, files: List[Path]) -> List[Tuple[Path, Dict]]:
+        """Parsed snapshots; unreadable ones are logged and left in place"""
+        snapshots = []
+        for path in files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshots.append((path, json.load(f)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Skipping unreadable snapshot {path.name}: {e}")
+        return snapshots
+    
+    def _compact(self, retention_days: Optional[int], delete: bool) -> int:
+        """Compaction body, called with the compaction lock held"""
+        retention_days = Config.RAW_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        
+        files = [path for path in sorted(self.raw_dir.glob('jobs_*.json'))
+                 if (_snapshot_time(path) or cutoff) < cutoff]
+        snapshots = self._read_snapshots(files)
+        if not snapshots:
+            return 0
+        files = [path for path, _ in snapshots]
+        
+        name = f"chunk_{files[0].stem[5:20]}_{files[-1].stem[5:20]}"
+        if (self.archive_dir / name).exists():
+            logger.warning(f"⚠️  {name} already exists, skipping compaction")
+            return 0
+        
+        tmp_dir = self.archive_dir / f".{name}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+        try:
+            rows = self._write_chunk(tmp_dir, snapshots)
+            tmp_dir.rename(self.archive_dir / name)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        if delete:
+            for path in files:
+                path.unlink()
+        
+        logger.info(f"🗜️  Compacted {len(files)} snapshots ({rows} jobs) into {name}")
+        return rows
+    
+    def _write_chunk(self, chunk_dir: Path, snapshots: List[Tuple[Path, Dict]]) -> int:
+        """Write the columns, jobs and metadata of a chunk; returns the row count"""
+        skills: Dict[str, int] = {}
+        queries: Dict[str, int] = {}
+        scraped_ts, posted_ts, budget_min, budget_max, query_ids = [], [], [], [], []
+        skill_offsets, skill_ids = [0], []
+        postings: Dict[str, int] = {}
+        posting_ids = []
+        run_sizes = []
+        
+        with lzma.open(chunk_dir / 'text.jsonl.xz', 'wt', encoding='utf-8', preset=6) as text:
+            for path, data in snapshots:
+                run_time = (_snapshot_time(path) or datetime.now()).timestamp()
+                query_id = queries.setdefault(data.get('query') or '', len(queries))
+                jobs = data.get('jobs', [])
+                run_sizes.append(len(jobs))
+                
+                for job in jobs:
+                    low, high = parse_budget(job.get('budget', ''))
+                    scraped_ts.append(_epoch(job, run_time))
+                    posted_ts.append(np.nan if job.get('posted_ts') is None else job['posted_ts'])
+                    budget_min.append(np.nan if low is None else low)
+                    budget_max.append(np.nan if high is None else high)
+                    query_ids.append(query_id)
+                    
+                    for skill in job.get('skills', []):
+                        skill_ids.append(skills.setdefault(skill, len(skills)))
+                    skill_offsets.append(len(skill_ids))
+                    posting_ids.append(postings.setdefault(_posting_key(job), len(postings)))
+                    
+                    # Fields with a column are restored from it on read
+                    rest = {key: value for key, value in job.items() if key not in _COLUMN_FIELDS}
+                    text.write(json.dumps(rest, ensure_ascii=False) + '\n')
+        
+        np.save(chunk_dir / 'scraped_ts.npy', np.array(scraped_ts, dtype=np.float64))
+        np.save(chunk_dir / 'posted_ts.npy', np.array(posted_ts, dtype=np.float64))
+        np.save(chunk_dir / 'budget_min.npy', np.array(budget_min, dtype=np.float32))
+        np.save(chunk_dir / 'budget_max.npy', np.array(budget_max, dtype=np.float32))
+        np.save(chunk_dir / 'query_id.npy', np.array(query_ids, dtype=np.int32))
+        np.save(chunk_dir / 'skill_offsets.npy', np.array(skill_offsets, dtype=np.int64))
+        np.save(chunk_dir / 'skill_ids.npy', np.array(skill_ids, dtype=np.int32))
+        np.save(chunk_dir / 'posting_id.npy', np.array(posting_ids, dtype=np.int32))
+        
+        with open(chunk_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(),
+                'rows': len(scraped_ts),
+                'sources': [path.name for path, _ in snapshots],
+                'runs': run_sizes,
+                'skills': list(skills),
+                'queries': list(queries),
+                'postings': list(postings)
+            }, f, ensure_ascii=False)
+        return len(scraped_ts)
+    
+    def row_count(self) -> int:
+        """Total compacted jobs"""
+        return sum(len(chunk) for chunk in self.chunks())
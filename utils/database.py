@@ -7,8 +7,18 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Tuple
 from config import Config
+from analyzer.skill_cooccurrence import SkillCooccurrence
+from analyzer.trend_detector import TrendDetector
+from utils.columnar_archive import ColumnarArchive
+from utils.dedup_index import DedupIndex
+from utils.helpers import job_fingerprint, new_run_id, atomic_write_json
+from utils.job_archive import JobArchive
+from utils.job_record import Job, jobs_from_dicts, jobs_to_dicts
+from utils.near_duplicates import NearDuplicateIndex
+from utils.search_index import JobSearchIndex
+from utils.skill_canonicalizer import canonicalize_skills
 from utils.logger import logger
 
 class JobDatabase:
@@ -17,14 +27,31 @@ class JobDatabase:
     def __init__(self):
         self.raw_dir = Config.RAW_DATA_DIR
         self.processed_dir = Config.PROCESSED_DATA_DIR
+        self.storage_format = Config.STORAGE_FORMAT
+        self.archive = JobArchive(Config.ARCHIVE_DIR)
+        self.dedup = DedupIndex(Config.DEDUP_INDEX_FILE) if Config.DEDUP_ENABLED else None
+        self.search_index = JobSearchIndex(Config.SEARCH_INDEX_FILE)
+        self.columnar = ColumnarArchive(Config.COLUMNAR_DIR, Config.RAW_DATA_DIR)
+        self.near_dups = NearDuplicateIndex(Config.NEAR_DUP_DIR)
+        self.skill_graph = SkillCooccurrence(Config.COOCCURRENCE_FILE)
+        self.trends = TrendDetector(Config.TRENDS_FILE)
     
-    def save_jobs(self, jobs: List[Dict], data_type='raw') -> Optional[str]:
+    def _use_archive(self, data_type: str) -> bool:
+        """Raw data goes to the JSONL archive when configured"""
+        return self.storage_format == 'jsonl' and data_type == 'raw'
+    
+    def save_jobs(self, jobs: List[Dict], data_type='raw',
+                  query: Optional[str] = None) -> Optional[str]:
         """
         Save jobs to JSON file
         
+        Raw jobs go through the dedup index first, so only postings that
+        are new or changed since they were last seen are stored.
+        
         Args:
-            jobs: List of job dictionaries
+            jobs: List of job dictionaries or Job records
             data_type: 'raw' or 'processed'
+            query: Search query that produced the jobs
             
         Returns:
             Filename if successful, None otherwise
@@ -35,16 +62,40 @@ class JobDatabase:
             else:
                 directory = self.processed_dir
             
+            jobs = jobs_to_dicts(jobs)
+            run_id = new_run_id()
+            seen = len(jobs)
+            if data_type == 'raw':
+                # Trends measure what was listed today, repeats included
+                self._update_trends(jobs)
+            
+            if self.dedup is not None and data_type == 'raw':
+                jobs = self.dedup.update(jobs)
+                logger.info(f"🔁 {len(jobs)}/{seen} jobs are new or changed")
+            
+            if data_type == 'raw':
+                self._index_jobs(jobs)
+                self._update_skill_graph(jobs)
+            
+            if self._use_archive(data_type):
+                segment = self.archive.append_jobs(jobs, run_id)
+                logger.info(f"💾 Archived {len(jobs)} jobs to {segment} (run {run_id})")
+                return str(segment)
+            
             directory.mkdir(parents=True, exist_ok=True)
             
-            filename = directory / f"jobs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = directory / f"jobs_{run_id}.json"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'timestamp': datetime.now().isoformat(),
-                    'count': len(jobs),
-                    'jobs': jobs
-                }, f, indent=2, ensure_ascii=False)
+            # Written to a temp file and renamed, so a crash or a concurrent
+            # run can never leave a truncated snapshot behind
+            atomic_write_json(filename, {
+                'timestamp': datetime.now().isoformat(),
+                'run_id': run_id,
+                'query': query,
+                'count': len(jobs),
+                'seen': seen,
+                'jobs': jobs
+            }, indent=2, ensure_ascii=False)
             
             logger.info(f"💾 Saved {len(jobs)} jobs to {filename}")
             return str(filename)
@@ -53,9 +104,63 @@ class JobDatabase:
             logger.error(f"Error saving jobs: {e}")
             return None
     
+    def save_analysis(self, analysis: str, job_count: int, metadata: Optional[Dict] = None,
+                      run_id: Optional[str] = None) -> Optional[str]:
+        """
+        Store an analysis payload so its report can be rendered again
+        
+        Args:
+            analysis: Analysis text from Gemini
+            job_count: Number of jobs analyzed
+            metadata: Report metadata (matches, trends, chart data, ...)
+            run_id: Run identifier (default: a new one)
+            
+        Returns:
+            Filename if successful, None otherwise
+        """
+        try:
+            run_id = run_id or new_run_id()
+            filename = self.processed_dir / f"analysis_{run_id}.json"
+            atomic_write_json(filename, {
+                'timestamp': datetime.now().isoformat(),
+                'run_id': run_id,
+                'job_count': job_count,
+                'analysis': analysis,
+                'metadata': metadata or {}
+            }, indent=2, ensure_ascii=False, default=str)
+            
+            logger.info(f"💾 Saved analysis to {filename}")
+            return str(filename)
+        
+        except Exception as e:
+            logger.error(f"Error saving analysis: {e}")
+            return None
+    
+    def load_analyses(self, days: Optional[int] = None) -> List[Dict]:
+        """Stored analysis payloads, oldest first (last N days when given)"""
+        payloads = []
+        cutoff = datetime.now().timestamp() - days * 86400 if days else None
+        
+        for path in sorted(self.processed_dir.glob('analysis_*.json')):
+            if cutoff is not None and path.stat().st_mtime < cutoff:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    payloads.append(json.load(f))
+            except Exception as e:
+                logger.error(f"Error loading {path.name}: {e}")
+        return payloads
+    
     def load_latest_jobs(self, data_type='raw') -> Optional[List[Dict]]:
         """Load most recent jobs"""
         try:
+            if self._use_archive(data_type):
+                runs = self.archive.runs()
+                if not runs:
+                    logger.warning("No previous data files found")
+                    return None
+                return list(self.archive.iter_run(runs[-1]))
+            
             if data_type == 'raw':
                 directory = self.raw_dir
             else:
@@ -75,36 +180,229 @@ class JobDatabase:
             logger.error(f"Error loading jobs: {e}")
             return None
     
+    def _iter_recent_runs(self, days: Optional[int],
+                          newest_first: bool = True) -> Iterator[List[Dict]]:
+        """Yield the job lists of the most recent runs (all runs if days is None)"""
+        for _, jobs in self._iter_keyed_runs(days, newest_first):
+            yield jobs
+    
+    def _select_runs(self, days: Optional[int]) -> Tuple[List, List]:
+        """(compacted runs, stored runs) making up the most recent runs, oldest first"""
+        compacted = self.columnar.runs()
+        if self._use_archive('raw'):
+            stored = self.archive.runs()
+        else:
+            stored = sorted(self.raw_dir.glob('jobs_*.json'))
+        
+        if days is not None:
+            stored = stored[-days:] if days > 0 else []
+            older = max(days - len(stored), 0)
+            compacted = compacted[-older:] if older else []
+        return compacted, stored
+    
+    def _iter_keyed_runs(self, days: Optional[int],
+                         newest_first: bool = True) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Yield (run key, jobs) for the most recent runs
+        
+        Runs compacted into the columnar archive come before the stored
+        snapshots, so history reaches back past the raw retention window.
+        The key names the stored run and does not change while it exists.
+        """
+        compacted, stored = self._select_runs(days)
+        parts = [self.columnar.iter_runs(compacted, newest_first),
+                 self._iter_stored_runs(stored, newest_first)]
+        for part in (parts[::-1] if newest_first else parts):
+            yield from part
+    
+    def _iter_stored_runs(self, runs: List, newest_first: bool) -> Iterator[Tuple[str, List[Dict]]]:
+        """(run key, jobs) of archive runs or raw snapshot files"""
+        for run in (runs[::-1] if newest_first else runs):
+            if self._use_archive('raw'):
+                yield run, list(self.archive.iter_run(run))
+            else:
+                try:
+                    with open(run, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except ValueError as e:
+                    logger.warning(f"⚠️  Skipping unreadable snapshot {run.name}: {e}")
+                    continue
+                yield run.stem, data.get('jobs', [])
+    
+    def iter_jobs(self, days: Optional[int] = None) -> Iterator[Dict]:
+        """Stored jobs one at a time, oldest run first, holding one run in memory"""
+        for jobs in self._iter_recent_runs(days, newest_first=False):
+            yield from jobs
+    
+    def load_history(self, days: Optional[int] = 7) -> List[Job]:
+        """
+        Load the jobs of recent runs as compact Job records
+        
+        Args:
+            days: Number of most recent runs (None for all)
+        """
+        history = []
+        for jobs in self._iter_recent_runs(days):
+            history.extend(jobs_from_dicts(jobs))
+        return history
+    
+    def load_history_runs(self, days: Optional[int] = 7) -> List[Tuple[str, List[Job]]]:
+        """
+        Load recent runs as (run key, Job records) pairs, newest first
+        
+        Args:
+            days: Number of most recent runs (None for all)
+        """
+        return [(key, jobs_from_dicts(jobs)) for key, jobs in self._iter_keyed_runs(days)]
+    
     def get_historical_stats(self, days=7) -> Dict:
-        """Get historical statistics"""
+        """
+        Get historical statistics
+        
+        Each posting is counted once, using its newest version, no matter
+        how many runs it appeared in. Reposts marked as near-duplicates
+        count as the posting they duplicate. Compacted runs are counted
+        from the archive columns without decompressing their jobs.
+        """
         try:
-            files = sorted(self.raw_dir.glob('jobs_*.json'), reverse=True)
-            
             total_jobs = 0
+            files_analyzed = 0
             all_skills = {}
+            counted = set()
+            compacted, stored = self._select_runs(days)
             
-            for file in files[:days]:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    jobs = data.get('jobs', [])
-                    total_jobs += len(jobs)
+            for _, jobs in self._iter_stored_runs(stored, newest_first=True):
+                files_analyzed += 1
+                
+                for job in jobs:
+                    fp = job.get('duplicate_of') or job_fingerprint(job)
+                    if fp in counted:
+                        continue
+                    counted.add(fp)
+                    total_jobs += 1
                     
-                    for job in jobs:
-                        for skill in job.get('skills', []):
-                            all_skills[skill] = all_skills.get(skill, 0) + 1
+                    # Older snapshots predate ingestion-time canonicalization
+                    for skill in canonicalize_skills(job.get('skills', [])):
+                        all_skills[skill] = all_skills.get(skill, 0) + 1
+            
+            postings, skill_counts = self.columnar.posting_stats(compacted, counted)
+            files_analyzed += len(compacted)
+            total_jobs += postings
+            for skill, count in skill_counts.items():
+                all_skills[skill] = all_skills.get(skill, 0) + count
             
             top_skills = sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10]
             
             return {
                 'total_jobs': total_jobs,
-                'files_analyzed': len(files[:days]),
+                'files_analyzed': files_analyzed,
                 'top_skills': top_skills,
-                'average_jobs_per_day': total_jobs / min(days, len(files)) if files else 0
+                'average_jobs_per_day': total_jobs / files_analyzed if files_analyzed else 0,
+                # Over every stored posting, not just the last `days` runs
+                'skill_associations': self.skill_graph.summary(),
+                'trends': self.trends.report()
             }
         
         except Exception as e:
             logger.error(f"Error getting historical stats: {e}")
             return {}
+    
+    def _index_jobs(self, jobs: List[Dict]):
+        """Add jobs to the search index without failing the save"""
+        try:
+            self.search_index.add_jobs(jobs)
+        except Exception as e:
+            logger.error(f"Error updating search index: {e}")
+    
+    def _update_skill_graph(self, jobs: List[Dict]):
+        """Add jobs to the skill co-occurrence matrix without failing the save"""
+        try:
+            self.skill_graph.update(jobs)
+        except Exception as e:
+            logger.error(f"Error updating skill co-occurrence: {e}")
+    
+    def _update_trends(self, jobs: List[Dict]):
+        """Add a run to the trend series without failing the save"""
+        try:
+            self.trends.update(jobs)
+        except Exception as e:
+            logger.error(f"Error updating trends: {e}")
+    
+    def rebuild_skill_graph(self) -> int:
+        """
+        Rebuild the skill co-occurrence matrix from every stored run
+        
+        Returns:
+            Number of postings counted
+        """
+        self.skill_graph.clear()
+        for jobs in self._iter_recent_runs(None, newest_first=False):
+            self.skill_graph.observe(jobs)
+        self.skill_graph.save()
+        
+        logger.info(f"🔗 Counted skill pairs over {self.skill_graph.total_jobs} postings")
+        return self.skill_graph.total_jobs
+    
+    def related_skills(self, skill: str, k: int = 5) -> List[Dict]:
+        """Skills most often requested together with a skill"""
+        return self.skill_graph.related_skills(skill, k)
+    
+    def rebuild_search_index(self) -> int:
+        """
+        Rebuild the search index from every stored run
+        
+        Returns:
+            Number of indexed jobs
+        """
+        self.search_index.clear()
+        
+        count = 0
+        # Oldest first so the newest version of a posting wins
+        for jobs in self._iter_recent_runs(None, newest_first=False):
+            count += self.search_index.add_jobs(jobs)
+        
+        logger.info(f"🔎 Indexed {count} stored jobs")
+        return count
+    
+    def collapse_near_duplicates(self, jobs: List[Dict]) -> List[Dict]:
+        """
+        Drop near-duplicate repeats within a batch and mark reposts
+        
+        Returns:
+            Jobs to analyze and store
+        """
+        try:
+            kept, dropped = self.near_dups.collapse_batch(jobs)
+            self.near_dups.save()
+            marked = sum(1 for job in kept if job.get('duplicate_of'))
+            logger.info(f"🧬 Near-duplicates: {dropped} collapsed, {marked} reposts marked")
+            return kept
+        except Exception as e:
+            logger.error(f"Error detecting near-duplicates: {e}")
+            return jobs
+    
+    def compact_raw_data(self, retention_days: Optional[int] = None) -> int:
+        """
+        Compact raw snapshots older than the retention window
+        
+        Only JSON snapshots are compacted; with STORAGE_FORMAT=jsonl the
+        append-only archive is the long-term store and is left as is.
+        
+        Returns:
+            Number of jobs moved into the columnar archive
+        """
+        if self._use_archive('raw'):
+            logger.debug("Raw data is in the JSONL archive, nothing to compact")
+            return 0
+        try:
+            return self.columnar.compact(retention_days)
+        except Exception as e:
+            logger.error(f"Error compacting raw data: {e}")
+            return 0
+    
+    def search_jobs(self, **filters) -> List[Dict]:
+        """Search stored jobs (see JobSearchIndex.search for filters)"""
+        return self.search_index.search(**filters)
 
 # Global database instance
 db = JobDatabase()
@@ -0,0 +1,127 @@
+"""
+Deduplication Index
+Cross-run job sightings keyed by a stable fingerprint
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Union
+from config import Config
+from utils.helpers import job_fingerprint, job_content_hash, atomic_write_json, file_lock
+from utils.logger import logger
+
+class DedupIndex:
+    """
+    Persistent dedup index
+    
+    Maps each job fingerprint to when it was first and last seen, how
+    many runs it appeared in and the hash of its latest content. The
+    whole index lives in a dict, so lookups and batch membership checks
+    are O(1) per job.
+    """
+    
+    def __init__(self, index_file: Optional[Union[str, Path]] = None):
+        self.index_file = Path(index_file or Config.DEDUP_INDEX_FILE)
+        self._entries: Optional[Dict[str, Dict]] = None
+    
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        """Index entries, loaded lazily from disk"""
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+    
+    def _load(self) -> Dict[str, Dict]:
+        """Load the index file"""
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('jobs', {})
+        except Exception as e:
+            logger.error(f"Error loading dedup index, starting fresh: {e}")
+            return {}
+    
+    def save(self):
+        """Write the index to disk"""
+        atomic_write_json(self.index_file, {
+            'updated': datetime.now().isoformat(),
+            'count': len(self.entries),
+            'jobs': self.entries
+        })
+    
+    def update(self, jobs: List[Dict], seen_at: Optional[str] = None) -> List[Dict]:
+        """
+        Observe a batch and persist it while holding the index lock
+        
+        The index is re-read under the lock, so concurrent runs never
+        overwrite each other's sightings.
+        
+        Returns:
+            Jobs that are new or changed (see observe)
+        """
+        with file_lock(self.index_file):
+            self._entries = self._load()
+            fresh = self.observe(jobs, seen_at)
+            self.save()
+        return fresh
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.entries
+    
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """Sighting record for a fingerprint"""
+        return self.entries.get(fingerprint)
+    
+    def contains_many(self, fingerprints: Iterable[str]) -> List[bool]:
+        """Membership flags for a batch of fingerprints"""
+        entries = self.entries
+        return [fp in entries for fp in fingerprints]
+    
+    def observe(self, jobs: List[Dict], seen_at: Optional[str] = None) -> List[Dict]:
+        """
+        Record a batch of sightings
+        
+        Args:
+            jobs: Jobs from one run
+            seen_at: ISO timestamp of the sighting (defaults to now)
+            
+        Returns:
+            Jobs that are new or whose content changed since last seen
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        entries = self.entries
+        fresh = []
+        batch = set()
+        
+        for job in jobs:
+            fp = job_fingerprint(job)
+            content = job_content_hash(job)
+            entry = entries.get(fp)
+            
+            if entry is None:
+                entries[fp] = {
+                    'first_seen': seen_at,
+                    'last_seen': seen_at,
+                    'sightings': 1,
+                    'hash': content
+                }
+                batch.add(fp)
+                fresh.append(job)
+                continue
+            
+            if fp not in batch:
+                # Same posting listed twice in one run counts as one sighting
+                entry['sightings'] += 1
+                entry['last_seen'] = seen_at
+                batch.add(fp)
+            
+            if entry['hash'] != content:
+                entry['hash'] = content
+                fresh.append(job)
+        
+        return fresh
@@ -1 +1,167 @@
+"""
+Helper Utilities
+Shared helpers for job identity, text handling and safe file writes
+"""
 
+import hashlib
+import json
+import os
+import re
+import secrets
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Any, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_RELATIVE_TIME_RE = re.compile(
+    r'(?:posted\s+)?(?:\d+|an?|a few)\s+(?:second|minute|hour|day|week|month|year)s?\s+ago'
+    r'|posted\s+(?:yesterday|today|just now)'
+)
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and casefold text for comparisons"""
+    return _WHITESPACE_RE.sub(' ', text or '').strip().casefold()
+
+def _stable_description(job: Dict) -> str:
+    """
+    Normalized description without the relative "posted" text
+    
+    Cards without a description element fall back to the full card
+    text, which changes from run to run ("2 hours ago" -> "1 day ago").
+    """
+    description = job.get('description', '') or ''
+    posted = job.get('posted')
+    if posted and posted != 'Unknown':
+        description = description.replace(posted, '')
+    return normalize_text(description)
+
+def job_fingerprint(job: Dict) -> str:
+    """
+    Stable fingerprint identifying a job posting across runs
+    
+    Args:
+        job: Job dictionary
+        
+    Returns:
+        16 character hex digest
+    """
+    key = '\x1f'.join([
+        normalize_text(job.get('title', '')),
+        _stable_description(job)[:300],
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def job_content_hash(job: Dict) -> str:
+    """
+    Hash of the fields that define a posting's content
+    
+    Used together with the fingerprint to tell a repeated sighting of a
+    job apart from an edited one. Text is normalized the way the
+    fingerprint normalizes it, and relative times left in card text are
+    removed, so only a real edit changes the hash.
+    """
+    key = '\x1f'.join([
+        normalize_text(job.get('title', '')),
+        normalize_text(_RELATIVE_TIME_RE.sub(' ', _stable_description(job))),
+        '|'.join(normalize_text(skill) for skill in job.get('skills', []) or []),
+        normalize_text(str(job.get('budget', ''))),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+_AMOUNT_RE = re.compile(r'\$\s*([\d,]+(?:\.\d+)?)\s*([kK])?')
+
+def parse_budget(budget: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parse the dollar amounts out of budget card text
+    
+    "Hourly: $25.00 - $50.00" -> (25.0, 50.0)
+    "Est. budget: $1.5k"      -> (1500.0, 1500.0)
+    "Not specified"           -> (None, None)
+    """
+    amounts = []
+    for number, thousands in _AMOUNT_RE.findall(budget or ''):
+        try:
+            value = float(number.replace(',', ''))
+        except ValueError:
+            continue
+        amounts.append(value * 1000 if thousands else value)
+    
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+def new_run_id() -> str:
+    """
+    Collision-free run identifier
+    
+    Starts with the timestamp so IDs (and the filenames built from them)
+    still sort chronologically; the pid and random suffix keep two
+    processes started in the same second apart.
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{secrets.token_hex(2)}"
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes):
+    """
+    Write a file so readers see either the old or the complete new content
+    
+    Data goes to a unique temp file in the same directory, is fsynced and
+    then renamed over the target.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    
+    if fcntl is not None:
+        # Persist the rename itself
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def atomic_write_json(path: Union[str, Path], data: Any, **dump_kwargs):
+    """Atomically write JSON (see atomic_write_bytes)"""
+    atomic_write_bytes(path, json.dumps(data, **dump_kwargs).encode('utf-8'))
+
+@contextmanager
+def file_lock(path: Union[str, Path]):
+    """
+    Exclusive advisory lock held for the duration of the block
+    
+    Uses a ``<path>.lock`` file so the protected file itself can be
+    replaced by atomic renames while the lock is held.
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,243 @@
+"""
+Job Archive
+Append-only JSON Lines storage with a byte-offset index
+"""
+
+import json
+import os
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterator, Union
+from config import Config
+from utils.helpers import job_fingerprint, atomic_write_bytes, file_lock
+from utils.logger import logger
+
+# One line of the sidecar index: where a record lives and when it was written
+IndexEntry = namedtuple('IndexEntry', ['ts', 'run', 'fp', 'segment', 'offset'])
+
+class JobArchive:
+    """
+    Append-only JSONL job archive
+    
+    Jobs are appended to daily segment files (one record per line).
+    Every record gets a line in the sidecar ``index.jsonl`` mapping its
+    fingerprint, timestamp and run to the segment and byte offset, so
+    readers can seek straight to a record instead of parsing whole files.
+    """
+    
+    INDEX_NAME = 'index.jsonl'
+    
+    def __init__(self, archive_dir: Optional[Union[str, Path]] = None):
+        self.archive_dir = Path(archive_dir or Config.ARCHIVE_DIR)
+        self.index_file = self.archive_dir / self.INDEX_NAME
+        
+        # In-memory view of the index, kept sorted by timestamp
+        self._entries: List[IndexEntry] = []
+        self._timestamps: List[str] = []
+        self._by_fp: Dict[str, List[IndexEntry]] = {}
+        self._runs: Dict[str, List[IndexEntry]] = {}
+        self._index_pos = 0
+        self._index_ino = None
+    
+    def append_jobs(self, jobs: List[Dict], run_id: str,
+                    timestamp: Optional[str] = None) -> Path:
+        """
+        Append jobs as one run
+        
+        Args:
+            jobs: List of job dictionaries
+            run_id: Identifier of the run that produced the jobs
+            timestamp: ISO timestamp for the records (defaults to now)
+            
+        Returns:
+            Path of the segment file written to
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        
+        ts = timestamp or datetime.now().isoformat()
+        segment = self.archive_dir / f"jobs_{ts[:10].replace('-', '')}.jsonl"
+        
+        # Offsets are only valid if nobody else appends in between, so
+        # the segment and index writes happen under one lock
+        with file_lock(self.index_file):
+            index_lines = []
+            with open(segment, 'ab') as f:
+                for job in jobs:
+                    fp = job_fingerprint(job)
+                    record = {'fp': fp, 'run': run_id, 'ts': ts, 'job': job}
+                    offset = f.tell()
+                    f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+                    index_lines.append(json.dumps({
+                        'ts': ts, 'run': run_id, 'fp': fp,
+                        'segment': segment.name, 'offset': offset
+                    }))
+                f.flush()
+                os.fsync(f.fileno())
+            
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                for line in index_lines:
+                    f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        
+        logger.debug(f"Archived {len(jobs)} jobs to {segment.name} (run {run_id})")
+        return segment
+    
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the sidecar index by scanning every segment
+        
+        Returns:
+            Number of indexed records
+        """
+        count = 0
+        lines = []
+        
+        with file_lock(self.index_file):
+            for segment in sorted(self.archive_dir.glob('jobs_*.jsonl')):
+                with open(segment, 'rb') as f:
+                    offset = f.tell()
+                    for line in iter(f.readline, b''):
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            logger.warning(f"Skipping corrupt record in {segment.name} at {offset}")
+                        else:
+                            lines.append(json.dumps({
+                                'ts': record['ts'], 'run': record['run'], 'fp': record['fp'],
+                                'segment': segment.name, 'offset': offset
+                            }) + '\n')
+                            count += 1
+                        offset = f.tell()
+            
+            atomic_write_bytes(self.index_file, ''.join(lines).encode('utf-8'))
+        
+        self._reset()
+        logger.info(f"🗂️  Rebuilt archive index ({count} records)")
+        return count
+    
+    def _reset(self):
+        """Drop the in-memory index"""
+        self._entries = []
+        self._timestamps = []
+        self._by_fp = {}
+        self._runs = {}
+        self._index_pos = 0
+    
+    def _refresh(self):
+        """Load index lines appended since the last refresh"""
+        if not self.index_file.exists():
+            return
+        
+        stat = self.index_file.stat()
+        if stat.st_ino != self._index_ino or stat.st_size < self._index_pos:
+            # Index was replaced by a rebuild - start over
+            self._reset()
+            self._index_ino = stat.st_ino
+        
+        new_entries = []
+        with open(self.index_file, 'rb') as f:
+            f.seek(self._index_pos)
+            for line in iter(f.readline, b''):
+                if not line.endswith(b'\n'):
+                    # Partially written line from a concurrent writer
+                    break
+                self._index_pos += len(line)
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                new_entries.append(IndexEntry(
+                    data['ts'], data['run'], data['fp'], data['segment'], data['offset']
+                ))
+        
+        if not new_entries:
+            return
+        
+        for entry in new_entries:
+            self._by_fp.setdefault(entry.fp, []).append(entry)
+            self._runs.setdefault(entry.run, []).append(entry)
+        
+        self._entries.extend(new_entries)
+        if self._timestamps and new_entries[0].ts < self._timestamps[-1]:
+            self._entries.sort(key=lambda e: e.ts)
+            self._timestamps = [e.ts for e in self._entries]
+        else:
+            self._timestamps.extend(e.ts for e in new_entries)
+    
+    def runs(self) -> List[str]:
+        """Run IDs in chronological order"""
+        self._refresh()
+        return sorted(self._runs, key=lambda run: self._runs[run][0].ts)
+    
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._entries)
+    
+    def __contains__(self, fingerprint: str) -> bool:
+        self._refresh()
+        return fingerprint in self._by_fp
+    
+    def _read_entries(self, entries: List[IndexEntry]) -> Iterator[Dict]:
+        """Read records by seeking to their offsets, one open segment at a time"""
+        handle = None
+        current = None
+        try:
+            for entry in entries:
+                if entry.segment != current:
+                    if handle:
+                        handle.close()
+                    handle = open(self.archive_dir / entry.segment, 'rb')
+                    current = entry.segment
+                handle.seek(entry.offset)
+                yield json.loads(handle.readline())
+        finally:
+            if handle:
+                handle.close()
+    
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """Most recent stored version of a job, or None"""
+        self._refresh()
+        entries = self._by_fp.get(fingerprint)
+        if not entries:
+            return None
+        record = next(self._read_entries([entries[-1]]))
+        return record['job']
+    
+    def iter_range(self, start: Optional[Union[str, datetime]] = None,
+                   end: Optional[Union[str, datetime]] = None) -> Iterator[Dict]:
+        """
+        Stream jobs archived in [start, end)
+        
+        Args:
+            start: Inclusive lower bound (ISO string or datetime)
+            end: Exclusive upper bound (ISO string or datetime)
+            
+        Yields:
+            Job dictionaries in timestamp order
+        """
+        self._refresh()
+        
+        if isinstance(start, datetime):
+            start = start.isoformat()
+        if isinstance(end, datetime):
+            end = end.isoformat()
+        
+        lo = bisect_left(self._timestamps, start) if start else 0
+        hi = bisect_left(self._timestamps, end) if end else len(self._timestamps)
+        
+        for record in self._read_entries(self._entries[lo:hi]):
+            yield record['job']
+    
+    def iter_run(self, run_id: str) -> Iterator[Dict]:
+        """Stream the jobs of a single run"""
+        self._refresh()
+        for record in self._read_entries(self._runs.get(run_id, [])):
+            yield record['job']
+    
+    def latest_timestamp(self) -> Optional[str]:
+        """Timestamp of the newest record"""
+        self._refresh()
+        return self._timestamps[-1] if self._timestamps else None
@@ -0,0 +1,108 @@
+"""
+Job Record
+Compact typed job representation with dict converters
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Any, Iterable, Union
+
+SCRAPED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+@lru_cache(maxsize=4096)
+def _parse_scraped_at(value: str) -> Optional[datetime]:
+    """
+    Parse a scraped_at string once
+    
+    All jobs from a page share a handful of timestamps, so caching also
+    makes those jobs share one datetime object.
+    """
+    try:
+        return datetime.strptime(value, SCRAPED_AT_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+@lru_cache(maxsize=65536)
+def _intern_skills(skills: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Intern skill names and share identical skill tuples"""
+    return tuple(sys.intern(skill) for skill in skills)
+
+@dataclass(slots=True)
+class Job:
+    """
+    One scraped job posting
+    
+    Uses ``__slots__`` instead of a per-instance dict, interned skill
+    strings and a parsed timestamp. Fields the scraper does not know
+    about yet are kept in ``extra`` so ``to_dict`` round-trips.
+    """
+    
+    title: str
+    description: str
+    skills: Tuple[str, ...]
+    budget: str = "Not specified"
+    posted: str = "Unknown"
+    scraped_at: Optional[datetime] = None
+    extra: Optional[Dict[str, Any]] = None
+    
+    FIELDS = ('title', 'description', 'skills', 'budget', 'posted', 'scraped_at')
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Job':
+        """Build a Job from the scraper's dict shape"""
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        scraped_at = data.get('scraped_at')
+        if isinstance(scraped_at, str):
+            scraped_at = _parse_scraped_at(scraped_at)
+        
+        return cls(
+            title=data.get('title', ''),
+            description=data.get('description', ''),
+            skills=_intern_skills(tuple(data.get('skills', []) or [])),
+            budget=sys.intern(data.get('budget') or 'Not specified'),
+            posted=sys.intern(data.get('posted') or 'Unknown'),
+            scraped_at=scraped_at,
+            extra=extra or None
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the scraper's dict shape"""
+        data = {
+            'title': self.title,
+            'description': self.description,
+            'skills': list(self.skills),
+            'budget': self.budget,
+            'posted': self.posted,
+            'scraped_at': self.scraped_at.strftime(SCRAPED_AT_FORMAT) if self.scraped_at else None
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read access, so code written for dicts keeps working"""
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if key == 'skills':
+                return list(value)
+            if key == 'scraped_at' and value is not None:
+                return value.strftime(SCRAPED_AT_FORMAT)
+            return value
+        return (self.extra or {}).get(key, default)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or key in (self.extra or {})
+
+def as_dict(job: Union[Job, Dict]) -> Dict:
+    """Dict view of a Job or dict"""
+    return job.to_dict() if isinstance(job, Job) else job
+
+def jobs_from_dicts(jobs: Iterable[Dict]) -> List[Job]:
+    """Convert job dicts to Job records"""
+    return [Job.from_dict(job) for job in jobs]
+
+def jobs_to_dicts(jobs: Iterable[Union[Job, Dict]]) -> List[Dict]:
+    """Convert Job records (or dicts) to job dicts"""
+    return [as_dict(job) for job in jobs]
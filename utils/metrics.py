@@ -0,0 +1,184 @@
+"""
+Run Metrics
+Span timers and counters with JSON and Prometheus textfile export
+"""
+
+import functools
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from config import Config
+from utils.helpers import atomic_write_bytes, atomic_write_json
+from utils.logger import logger
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+def _number(value: float) -> str:
+    """Exact for whole numbers (token counts), six decimals otherwise"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else f"{value:.6f}"
+
+class _NoSpan:
+    """Context manager that does nothing (metrics disabled)"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'started')
+    
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        if exc_type is not None:
+            self.metrics.incr(f"{self.name}.errors")
+        return False
+
+class Metrics:
+    """
+    Process-wide span timings and counters
+    
+    Spans aggregate to count, total and max seconds per name; counters
+    are plain sums. Both only grow, so the Prometheus file exports them
+    as counters, and a run's own numbers are the difference between a
+    snapshot taken when it starts and the values when it is exported.
+    When disabled, `span` returns a shared no-op context manager and
+    `incr`/`observe` return at once, so instrumented code pays one
+    attribute check per call.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.spans: Dict[str, List[float]] = {}  # name -> [count, total, max]
+        self.counters: Dict[str, float] = {}
+    
+    def span(self, name: str):
+        """Time a block: ``with metrics.span('pdf.output'): ...``"""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+    
+    def timed(self, name: str) -> Callable:
+        """Decorator timing every call of a function as span `name`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def observe(self, name: str, seconds: float):
+        """Record one timing for span `name`"""
+        if not self.enabled:
+            return
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                if seconds > span[2]:
+                    span[2] = seconds
+    
+    def incr(self, name: str, value: float = 1):
+        """Add to counter `name`"""
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def snapshot(self) -> Dict:
+        """Copy of the current totals"""
+        with self._lock:
+            return {'spans': {name: list(span) for name, span in self.spans.items()},
+                    'counters': dict(self.counters)}
+    
+    def since(self, mark: Optional[Dict]) -> Dict:
+        """
+        Spans and counters accumulated after a snapshot
+        
+        The max of a span is over the whole process, not just the interval.
+        """
+        now = self.snapshot()
+        mark = mark or {'spans': {}, 'counters': {}}
+        spans = {}
+        for name, (count, total, longest) in now['spans'].items():
+            before = mark['spans'].get(name, [0, 0.0, 0.0])
+            if count > before[0]:
+                spans[name] = {'count': count - before[0], 'seconds': round(total - before[1], 6),
+                               'max_seconds': round(longest, 6)}
+        counters = {name: value - mark['counters'].get(name, 0)
+                    for name, value in now['counters'].items() if value != mark['counters'].get(name, 0)}
+        return {'spans': spans, 'counters': counters}
+    
+    def export(self, run_id: str, mark: Optional[Dict] = None,
+               gauges: Optional[Dict[str, float]] = None) -> Optional[str]:
+        """
+        Write one run's metrics as JSON and refresh the Prometheus textfile
+        
+        Args:
+            run_id: Run the metrics belong to
+            mark: Snapshot taken when the run started
+            gauges: Values describing the run (duration, job count, ...)
+            
+        Returns:
+            JSON filename, or None if disabled or writing failed
+        """
+        if not self.enabled:
+            return None
+        try:
+            gauges = gauges or {}
+            filename = Path(Config.METRICS_DIR) / f"metrics_{run_id}.json"
+            atomic_write_json(filename, {'run_id': run_id, 'timestamp': time.time(),
+                                         'gauges': gauges, **self.since(mark)}, indent=2)
+            atomic_write_bytes(Config.METRICS_TEXTFILE, self.prometheus(gauges).encode('utf-8'))
+            logger.info(f"📈 Metrics written to {filename}")
+            return str(filename)
+        except Exception as e:
+            logger.error(f"Error writing metrics: {e}")
+            return None
+    
+    def prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Current totals in the Prometheus text exposition format"""
+        now = self.snapshot()
+        lines = []
+        if now['spans']:
+            lines += ['# HELP upwork_span_seconds Time spent in instrumented calls',
+                      '# TYPE upwork_span_seconds summary']
+            for name, (count, total, _) in sorted(now['spans'].items()):
+                lines.append(f'upwork_span_seconds_sum{{span="{name}"}} {total:.6f}')
+                lines.append(f'upwork_span_seconds_count{{span="{name}"}} {count}')
+            lines += ['# HELP upwork_span_max_seconds Longest single call',
+                      '# TYPE upwork_span_max_seconds gauge']
+            for name, (_, _, longest) in sorted(now['spans'].items()):
+                lines.append(f'upwork_span_max_seconds{{span="{name}"}} {longest:.6f}')
+        for name, value in sorted(now['counters'].items()):
+            metric = f"upwork_{_metric_name(name)}_total"
+            lines += [f'# TYPE {metric} counter', f'{metric} {_number(value)}']
+        for name, value in sorted((gauges or {}).items()):
+            metric = f"upwork_last_run_{_metric_name(name)}"
+            lines += [f'# TYPE {metric} gauge', f'{metric} {_number(value)}']
+        return '\n'.join(lines) + '\n'
+
+# Global metrics instance
+metrics = Metrics(Config.METRICS_ENABLED)
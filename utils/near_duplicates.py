@@ -0,0 +1,241 @@
+"""
+Near-Duplicate Detection
+MinHash signatures with a persistent LSH index
+"""
+
+import io
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
+from config import Config
+from utils.helpers import job_fingerprint, atomic_write_bytes, file_lock
+from utils.logger import logger
+
+_PRIME = (1 << 31) - 1
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) so the LSH S-curve turns at the threshold
+    
+    Candidates are verified against the threshold afterwards, so the
+    choice only trades recall against the number of candidates.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        turn = (1 / bands) ** (1 / rows)
+        # Prefer turning slightly below the threshold to keep recall high
+        error = abs(turn - (threshold - 0.1))
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class NearDuplicateIndex:
+    """
+    Near-duplicate job detector
+    
+    Each job's title and description are split into word 3-gram shingles
+    and reduced to a MinHash signature. Signatures are split into LSH
+    bands; jobs sharing any band bucket are candidates, and candidates are
+    kept only if their estimated Jaccard similarity reaches the threshold.
+    Lookups touch a handful of buckets instead of the whole history.
+    
+    Every indexed near-duplicate remembers the root of its chain (the
+    first posting it descends from), so a repost of a repost is grouped
+    with the original rather than with the repost it happened to match.
+    """
+    
+    def __init__(self, index_dir: Optional[Union[str, Path]] = None,
+                 threshold: Optional[float] = None, num_perm: int = 128, seed: int = 1):
+        self.index_dir = Path(index_dir or Config.NEAR_DUP_DIR)
+        self.threshold = Config.NEAR_DUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _lsh_params(self.threshold, num_perm)
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.int64)
+        
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._roots: Dict[str, str] = {}
+        self._loaded = False
+    
+    def _shingles(self, job: Dict) -> np.ndarray:
+        """Hashed word 3-gram shingles of title and description"""
+        description = job.get('description', '') or ''
+        posted = job.get('posted')
+        if posted and posted != 'Unknown':
+            description = description.replace(posted, '')
+        
+        tokens = _TOKEN_RE.findall(f"{job.get('title', '')} {description}".lower())
+        if len(tokens) < 3:
+            grams = [' '.join(tokens)]
+        else:
+            grams = [' '.join(tokens[i:i + 3]) for i in range(len(tokens) - 2)]
+        return np.array(sorted({zlib.crc32(g.encode('utf-8')) % _PRIME for g in grams}),
+                        dtype=np.int64)
+    
+    def signature(self, job: Dict) -> np.ndarray:
+        """MinHash signature of a job"""
+        shingles = self._shingles(job)
+        hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+    
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """LSH bucket keys of a signature"""
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+    
+    def _ensure_loaded(self):
+        """Load the persisted index on first use"""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        keys_file = self.index_dir / 'keys.json'
+        sig_file = self.index_dir / 'signatures.npy'
+        if not keys_file.exists() or not sig_file.exists():
+            return
+        
+        try:
+            with open(keys_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            signatures = np.load(sig_file)
+        except Exception as e:
+            logger.error(f"Error loading near-duplicate index, starting fresh: {e}")
+            return
+        
+        if meta.get('num_perm') != self.num_perm or len(meta['keys']) != len(signatures):
+            logger.warning("⚠️  Near-duplicate index parameters changed, starting fresh")
+            return
+        
+        for key, signature in zip(meta['keys'], signatures):
+            self._insert(key, signature)
+        self._roots.update(meta.get('roots', {}))
+    
+    def _insert(self, key: str, signature: np.ndarray):
+        """Add a signature to the in-memory index"""
+        position = len(self._keys)
+        self._keys.append(key)
+        self._positions[key] = position
+        self._signatures.append(signature)
+        for bucket in self._band_keys(signature):
+            self._buckets.setdefault(bucket, []).append(position)
+    
+    def root(self, key: str) -> str:
+        """Fingerprint of the first posting in a key's duplicate chain"""
+        return self._roots.get(key, key)
+    
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._keys)
+    
+    def query(self, signature: np.ndarray, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Indexed jobs similar to a signature
+        
+        Args:
+            signature: MinHash signature
+            exclude: Key to leave out (the job itself)
+            
+        Returns:
+            (key, estimated Jaccard) pairs at or above the threshold, best first
+        """
+        self._ensure_loaded()
+        
+        candidates = set()
+        for bucket in self._band_keys(signature):
+            candidates.update(self._buckets.get(bucket, ()))
+        
+        matches = []
+        for position in candidates:
+            key = self._keys[position]
+            if key == exclude:
+                continue
+            similarity = float(np.mean(self._signatures[position] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+    
+    def _match_batch(self, jobs: List[Dict]) -> List[List[Tuple[str, float]]]:
+        """Query each job against the index, adding it (and its root) afterwards"""
+        self._ensure_loaded()
+        
+        results = []
+        for job in jobs:
+            fp = job_fingerprint(job)
+            signature = self.signature(job)
+            matches = self.query(signature, exclude=fp)
+            if fp not in self._positions:
+                self._insert(fp, signature)
+                if matches:
+                    self._roots[fp] = self.root(matches[0][0])
+            results.append(matches)
+        return results
+    
+    def collapse_batch(self, jobs: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Mark near-duplicates and drop repeats within the batch
+        
+        Jobs that only resemble older postings are kept (they are live
+        reposts) but stay marked: ``duplicate_of`` is set to the root of
+        the posting's chain and ``duplicate_similarity`` to the estimated
+        Jaccard of the closest match, so historical stats count them once.
+        
+        Returns:
+            (kept jobs, number dropped)
+        """
+        batch_fps = set()
+        kept = []
+        
+        for job, matches in zip(jobs, self._match_batch(jobs)):
+            fp = job_fingerprint(job)
+            # A repeat with the same fingerprint is excluded from its own matches
+            if fp in batch_fps or any(key in batch_fps for key, _ in matches):
+                continue
+            root = self.root(fp)
+            if matches and root != fp:
+                job['duplicate_of'] = root
+                job['duplicate_similarity'] = round(matches[0][1], 3)
+            batch_fps.add(fp)
+            kept.append(job)
+        
+        return kept, len(jobs) - len(kept)
+    
+    def save(self):
+        """Persist the index"""
+        self._ensure_loaded()
+        
+        with file_lock(self.index_dir / 'index'):
+            # Merge what other processes saved since we loaded
+            self._loaded = False
+            known = set(self._positions)
+            on_disk = NearDuplicateIndex(self.index_dir, self.threshold, self.num_perm)
+            on_disk._ensure_loaded()
+            for key, signature in zip(on_disk._keys, on_disk._signatures):
+                if key not in known:
+                    self._insert(key, signature)
+                    if key in on_disk._roots:
+                        self._roots[key] = on_disk._roots[key]
+            self._loaded = True
+            
+            signatures = (np.vstack(self._signatures) if self._signatures
+                          else np.empty((0, self.num_perm), dtype=np.uint32))
+            buffer = io.BytesIO()
+            np.save(buffer, signatures)
+            atomic_write_bytes(self.index_dir / 'signatures.npy', buffer.getvalue())
+            atomic_write_bytes(self.index_dir / 'keys.json', json.dumps({
+                'num_perm': self.num_perm,
+                'keys': self._keys,
+                'roots': self._roots
+            }).encode('utf-8'))
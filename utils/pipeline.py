@@ -0,0 +1,288 @@
+"""
+Pipeline Executor
+Run dependent stages concurrently with per-stage timeouts and failure policies
+"""
+
+import inspect
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+from utils.logger import logger
+from utils.metrics import metrics
+
+ABORT = 'abort'        # a failure fails the run; stages not yet started are skipped
+CONTINUE = 'continue'  # a failure is logged and dependents get the stage's default
+
+@dataclass
+class Stage:
+    """
+    One unit of work
+    
+    The stage function is called with one keyword argument per input,
+    named after the stage that produced it. `after` orders stages that
+    share no data (e.g. a reader that must finish before a cleanup).
+    Stages with `checkpoint` set store their output when a checkpoint
+    store is passed to the run; a callable decides whether a stored
+    output is still usable (e.g. that a file it names still exists).
+    """
+    
+    name: str
+    func: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    on_error: str = ABORT
+    default: Any = None
+    checkpoint: Union[bool, Callable[[Any], bool]] = False
+    
+    @property
+    def depends_on(self) -> List[str]:
+        return self.inputs + [name for name in self.after if name not in self.inputs]
+
+@dataclass
+class StageResult:
+    """Outcome and timing of one stage"""
+    
+    name: str
+    status: str = 'pending'  # pending, running, done, failed, timeout, skipped, unused
+    value: Any = None
+    error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    restored: bool = False
+    
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+class PipelineRun:
+    """Results of one pipeline run"""
+    
+    def __init__(self, stages: Dict[str, Stage], results: Dict[str, StageResult],
+                 started: float, finished: float):
+        self.stages = stages
+        self.results = results
+        self.started = started
+        self.finished = finished
+    
+    @property
+    def ok(self) -> bool:
+        """True unless a stage with the abort policy failed or was skipped"""
+        return all(r.status in ('done', 'unused') or self.stages[r.name].on_error == CONTINUE
+                   for r in self.results.values())
+    
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+    
+    def __getitem__(self, name: str) -> Any:
+        """Stage output (the stage's default if it did not complete)"""
+        result = self.results[name]
+        return result.value if result.status == 'done' else self.stages[name].default
+    
+    def critical_path(self) -> List[StageResult]:
+        """
+        Chain of stages that determined the wall-clock time
+        
+        Starts at the stage that finished last and walks back through the
+        dependency each stage waited for longest (the one that finished last).
+        """
+        finished = [r for r in self.results.values() if r.finished is not None]
+        if not finished:
+            return []
+        
+        path = [max(finished, key=lambda r: r.finished)]
+        while True:
+            deps = [self.results[name] for name in self.stages[path[-1].name].depends_on
+                    if self.results[name].finished is not None]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda r: r.finished))
+        return path[::-1]
+
+class Pipeline:
+    """
+    Small DAG executor using threads
+    
+    A stage starts as soon as all of its dependencies have finished, so
+    independent stages overlap. Each stage runs on its own daemon thread:
+    a stage that exceeds its timeout is treated as failed and abandoned
+    (Python threads cannot be killed), and it cannot keep the process
+    alive. At most `max_workers` stages run at once.
+    """
+    
+    def __init__(self, name: str, max_workers: int = 4):
+        self.name = name
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+    
+    def add(self, name: str, func: Callable[..., Any], inputs: Optional[List[str]] = None,
+            after: Optional[List[str]] = None, timeout: Optional[float] = None,
+            on_error: str = ABORT, default: Any = None,
+            checkpoint: Union[bool, Callable[[Any], bool]] = False) -> 'Pipeline':
+        """
+        Add a stage; its dependencies must have been added before it
+        
+        Returns:
+            The pipeline, so calls can be chained
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        stage = Stage(name, func, list(inputs or []), list(after or []), timeout, on_error, default, checkpoint)
+        missing = [dep for dep in stage.depends_on if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stage(s): {', '.join(missing)}")
+        params = inspect.signature(func).parameters
+        if not any(p.kind == p.VAR_KEYWORD for p in params.values()):
+            unknown = [dep for dep in stage.inputs if dep not in params]
+            if unknown:
+                raise ValueError(f"Stage {name} does not accept input(s): {', '.join(unknown)}")
+        self.stages[name] = stage
+        return self
+    
+    def _restore(self, checkpoints, results: Dict[str, StageResult]):
+        """
+        Take stage outputs from an earlier attempt of the run
+        
+        Restored stages are not run again, and neither is a stage whose
+        output only restored stages would have used.
+        """
+        for stage in self.stages.values():
+            if not (stage.checkpoint and checkpoints.has(stage.name)):
+                continue
+            try:
+                value = checkpoints.load(stage.name)
+            except Exception as e:
+                logger.warning(f"⚠️  Checkpoint of stage {stage.name} unreadable, rerunning: {e}")
+                continue
+            if callable(stage.checkpoint) and not stage.checkpoint(value):
+                continue
+            result = results[stage.name]
+            result.status, result.value, result.restored = 'done', value, True
+        
+        needed = set()
+        for stage in reversed(list(self.stages.values())):
+            if results[stage.name].restored:
+                continue
+            dependents = [s.name for s in self.stages.values() if stage.name in s.depends_on]
+            if not dependents or any(name in needed for name in dependents):
+                needed.add(stage.name)
+            else:
+                results[stage.name].status = 'unused'
+        
+        restored = [name for name, result in results.items() if result.restored]
+        if restored:
+            logger.info(f"♻️  Restored from checkpoint: {', '.join(restored)}")
+    
+    def _start(self, stage: Stage, results: Dict[str, StageResult], done: queue.Queue):
+        kwargs = {dep: results[dep].value if results[dep].status == 'done' else self.stages[dep].default
+                  for dep in stage.inputs}
+        result = results[stage.name]
+        result.status, result.started = 'running', time.perf_counter()
+        
+        def target():
+            try:
+                value, error = stage.func(**kwargs), None
+            except Exception as e:
+                value, error = None, e
+            done.put((stage.name, value, error, time.perf_counter()))
+        
+        threading.Thread(target=target, name=f"{self.name}-{stage.name}", daemon=True).start()
+    
+    def _settle(self, stage: Stage, result: StageResult, status: str, error: Optional[str]) -> bool:
+        """Record a failure; returns True if it aborts the run"""
+        result.status, result.error = status, error
+        if stage.on_error == CONTINUE:
+            logger.warning(f"⚠️  Stage {stage.name} {status}: {error} (continuing)")
+            return False
+        logger.error(f"❌ Stage {stage.name} {status}: {error}")
+        return True
+    
+    def run(self, checkpoints=None) -> PipelineRun:
+        """
+        Run every stage and log the critical path
+        
+        Args:
+            checkpoints: RunCheckpoints to restore completed stages from
+                and to store new stage outputs in
+        """
+        results = {name: StageResult(name) for name in self.stages}
+        if checkpoints is not None:
+            self._restore(checkpoints, results)
+        done: queue.Queue = queue.Queue()
+        started = time.perf_counter()
+        running = set()
+        aborted = False
+        
+        while True:
+            if not aborted:
+                for stage in self.stages.values():
+                    if len(running) >= self.max_workers:
+                        break
+                    if results[stage.name].status == 'pending' and all(
+                            results[dep].status not in ('pending', 'running') for dep in stage.depends_on):
+                        self._start(stage, results, done)
+                        running.add(stage.name)
+            if not running:
+                break
+            
+            deadlines = [results[name].started + self.stages[name].timeout
+                         for name in running if self.stages[name].timeout]
+            wait = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+            try:
+                name, value, error, finished = done.get(timeout=wait)
+            except queue.Empty:
+                now = time.perf_counter()
+                for name in list(running):
+                    stage, result = self.stages[name], results[name]
+                    if stage.timeout and now - result.started >= stage.timeout:
+                        running.discard(name)
+                        result.finished = now
+                        aborted |= self._settle(stage, result, 'timeout', f"no result after {stage.timeout:g}s")
+                continue
+            
+            if name not in running:
+                continue  # finished after its timeout; already settled
+            running.discard(name)
+            stage, result = self.stages[name], results[name]
+            result.finished = finished
+            if error is None:
+                result.status, result.value = 'done', value
+                # Saved here rather than on the stage's thread, so output
+                # that arrives after a timeout is never checkpointed
+                if checkpoints is not None and stage.checkpoint:
+                    checkpoints.save(name, value, finished - result.started)
+            else:
+                aborted |= self._settle(stage, result, 'failed', str(error) or type(error).__name__)
+        
+        for result in results.values():
+            if result.status == 'pending':
+                result.status = 'skipped'
+        
+        run = PipelineRun(self.stages, results, started, time.perf_counter())
+        self._log(run)
+        return run
+    
+    def _log(self, run: PipelineRun):
+        """Stage timings and the critical path, also recorded as metrics"""
+        timed = [r for r in run.results.values() if r.finished is not None]
+        busy = sum(r.seconds for r in timed)
+        for r in timed:
+            metrics.observe(f"stage.{r.name}", r.seconds)
+            if r.status != 'done':
+                metrics.incr(f"stage.{r.name}.{r.status}")
+        metrics.incr('stages.restored', sum(1 for r in run.results.values() if r.restored))
+        
+        logger.info(f"⏱️  {self.name}: {run.seconds:.1f}s wall, {busy:.1f}s of stage work "
+                    f"({', '.join(f'{r.name} {r.seconds:.1f}s' for r in timed)})")
+        
+        path = run.critical_path()
+        if path:
+            logger.info(f"🧭 Critical path: {' -> '.join(f'{r.name} {r.seconds:.1f}s' for r in path)}")
+        skipped = [r.name for r in run.results.values() if r.status == 'skipped']
+        if skipped:
+            logger.info(f"⏭️  Skipped: {', '.join(skipped)}")
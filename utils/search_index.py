@@ -0,0 +1,240 @@
+"""
+Job Search Index
+SQLite-backed skill index, full-text search and filters over stored jobs
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable, Union
+from config import Config
+from utils.helpers import job_fingerprint, parse_budget
+from utils.skill_canonicalizer import canonicalize_skill, skill_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    fp TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    budget TEXT,
+    budget_min REAL,
+    budget_max REAL,
+    scraped_ts REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_scraped ON jobs(scraped_ts);
+CREATE INDEX IF NOT EXISTS idx_jobs_budget ON jobs(budget_max);
+
+-- Inverted index: canonical skill key -> job ids
+CREATE TABLE IF NOT EXISTS job_skills (
+    skill TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, description, content='jobs', content_rowid='id'
+);
+"""
+
+def _scraped_epoch(job: Dict) -> Optional[float]:
+    """Epoch seconds of a job's scraped_at value"""
+    if job.get('scraped_ts') is not None:
+        return job['scraped_ts']
+    try:
+        return time.mktime(time.strptime(job.get('scraped_at', ''), "%Y-%m-%d %H:%M:%S"))
+    except (TypeError, ValueError):
+        return None
+
+def _fts_query(text: str) -> str:
+    """Quote each term so user input cannot break FTS5 query syntax"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+class JobSearchIndex:
+    """
+    Search index over stored jobs
+    
+    Jobs are keyed by fingerprint, so re-indexing the same posting
+    updates it in place instead of adding a duplicate.
+    """
+    
+    def __init__(self, db_file: Optional[Union[str, Path]] = None):
+        self.db_file = Path(db_file or Config.SEARCH_INDEX_FILE)
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the index database on first use"""
+        if self._conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+    
+    def close(self):
+        """Close the database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def add_jobs(self, jobs: Iterable[Dict]) -> int:
+        """
+        Index or re-index jobs
+        
+        Args:
+            jobs: Job dictionaries
+            
+        Returns:
+            Number of jobs indexed
+        """
+        count = 0
+        conn = self.conn
+        
+        with conn:
+            for job in jobs:
+                fp = job_fingerprint(job)
+                skills = job.get('skills', []) or []
+                budget_min, budget_max = parse_budget(job.get('budget', ''))
+                
+                old = conn.execute(
+                    'SELECT id, title, description FROM jobs WHERE fp = ?', (fp,)
+                ).fetchone()
+                if old:
+                    conn.execute(
+                        "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', ?, ?, ?)",
+                        (old['id'], old['title'], old['description'])
+                    )
+                    conn.execute('DELETE FROM job_skills WHERE job_id = ?', (old['id'],))
+                    conn.execute('DELETE FROM jobs WHERE id = ?', (old['id'],))
+                
+                cursor = conn.execute(
+                    'INSERT INTO jobs (fp, title, description, skills, budget, budget_min, budget_max, scraped_ts) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (fp, job.get('title', ''), job.get('description', ''),
+                     json.dumps(skills, ensure_ascii=False), job.get('budget'),
+                     budget_min, budget_max, _scraped_epoch(job))
+                )
+                job_id = cursor.lastrowid
+                
+                conn.execute(
+                    'INSERT INTO jobs_fts(rowid, title, description) VALUES (?, ?, ?)',
+                    (job_id, job.get('title', ''), job.get('description', ''))
+                )
+                conn.executemany(
+                    'INSERT OR IGNORE INTO job_skills (skill, job_id) VALUES (?, ?)',
+                    [(skill_key(canonicalize_skill(skill)), job_id) for skill in skills if skill]
+                )
+                count += 1
+        
+        return count
+    
+    def search(self, text: Optional[str] = None, skills: Optional[List[str]] = None,
+               since: Optional[Union[float, datetime]] = None,
+               until: Optional[Union[float, datetime]] = None,
+               min_budget: Optional[float] = None, max_budget: Optional[float] = None,
+               limit: int = 20, rank: bool = False) -> List[Dict]:
+        """
+        Search stored jobs
+        
+        Args:
+            text: Full-text query over title and description
+            skills: Jobs must have all of these skills
+            since: Only jobs scraped at or after this time
+            until: Only jobs scraped before this time
+            min_budget: Only jobs whose budget reaches at least this amount
+            max_budget: Only jobs whose budget starts at or below this amount
+            limit: Maximum number of results
+            rank: Order text matches by relevance instead of recency
+            
+        Returns:
+            Matching jobs, newest (or best match) first
+        """
+        if isinstance(since, datetime):
+            since = since.timestamp()
+        if isinstance(until, datetime):
+            until = until.timestamp()
+        
+        where = []
+        params = []
+        skills = [skill_key(canonicalize_skill(skill)) for skill in skills or [] if skill]
+        
+        # Drive the query from the most selective index and walk it newest
+        # first (ids grow with indexing time), so LIMIT stops the scan early
+        if text and text.strip():
+            sql = 'SELECT j.* FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid'
+            where.append('jobs_fts MATCH ?')
+            params.append(_fts_query(text))
+            order = 'bm25(jobs_fts)' if rank else 'jobs_fts.rowid DESC'
+        elif skills:
+            sql = 'SELECT j.* FROM job_skills s JOIN jobs j ON j.id = s.job_id'
+            where.append('s.skill = ?')
+            params.append(skills.pop(0))
+            order = 's.job_id DESC'
+        else:
+            sql = 'SELECT j.* FROM jobs j'
+            order = 'j.id DESC'
+        
+        for skill in skills:
+            where.append('EXISTS (SELECT 1 FROM job_skills WHERE skill = ? AND job_id = j.id)')
+            params.append(skill)
+        
+        if since is not None:
+            where.append('j.scraped_ts >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('j.scraped_ts < ?')
+            params.append(until)
+        if min_budget is not None:
+            where.append('j.budget_max >= ?')
+            params.append(min_budget)
+        if max_budget is not None:
+            where.append('j.budget_min <= ?')
+            params.append(max_budget)
+        
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {order} LIMIT ?'
+        params.append(limit)
+        
+        rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def skill_counts(self, limit: int = 20) -> List[tuple]:
+        """Most common skills in the index"""
+        rows = self.conn.execute(
+            'SELECT skill, COUNT(*) AS n FROM job_skills GROUP BY skill ORDER BY n DESC LIMIT ?',
+            (limit,)
+        ).fetchall()
+        return [(row['skill'], row['n']) for row in rows]
+    
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+    
+    def clear(self):
+        """Drop every indexed job"""
+        with self.conn:
+            self.conn.execute('DELETE FROM job_skills')
+            self.conn.execute('DELETE FROM jobs')
+            self.conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+    
+    def _row_to_job(self, row: sqlite3.Row) -> Dict:
+        """Convert a result row back to the job dict shape"""
+        scraped_at = None
+        if row['scraped_ts'] is not None:
+            scraped_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row['scraped_ts']))
+        
+        return {
+            'fingerprint': row['fp'],
+            'title': row['title'],
+            'description': row['description'],
+            'skills': json.loads(row['skills']),
+            'budget': row['budget'],
+            'scraped_at': scraped_at
+        }
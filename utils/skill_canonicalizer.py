@@ -0,0 +1,146 @@
+"""
+Skill Canonicalization
+Maps raw skill tags to one canonical name per skill
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Iterable
+
+# Canonical name -> known aliases. Matching ignores case, whitespace and
+# the separators "-", "_", "/" and ".", so only genuinely different
+# spellings need an entry here.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    'Artificial Intelligence': ['ai', 'a i', 'artificial intelligence ai'],
+    'Machine Learning': ['ml', 'machine learning ml', 'machine learning model'],
+    'Deep Learning': ['dl', 'deep neural networks', 'neural networks', 'neural network'],
+    'Natural Language Processing': ['nlp', 'natural language processing nlp'],
+    'Computer Vision': ['computer vision cv', 'image recognition'],
+    'Large Language Model': ['llm', 'llms', 'large language models', 'large language model llm'],
+    'Generative AI': ['genai', 'gen ai', 'generative ai', 'generative artificial intelligence'],
+    'Retrieval-Augmented Generation': ['rag', 'retrieval augmented generation'],
+    'Prompt Engineering': ['prompt engineer', 'prompt design'],
+    'AI Agent': ['ai agents', 'ai agent development', 'autonomous agents', 'agentic ai'],
+    'Chatbot': ['chatbots', 'chat bot', 'chatbot development', 'ai chatbot'],
+    'OpenAI API': ['openai', 'open ai', 'openai api', 'chatgpt api', 'gpt api'],
+    'ChatGPT': ['chat gpt'],
+    'LangChain': ['lang chain', 'langchain framework'],
+    'LlamaIndex': ['llama index'],
+    'Hugging Face': ['huggingface', 'hugging face transformers'],
+    'PyTorch': ['torch', 'py torch'],
+    'TensorFlow': ['tensor flow', 'keras tensorflow'],
+    'Keras': [],
+    'Scikit-learn': ['sklearn', 'scikit learn', 'scikitlearn'],
+    'Pandas': [],
+    'NumPy': ['numpy'],
+    'Data Science': ['data scientist'],
+    'Data Analysis': ['data analytics', 'data analyst'],
+    'Data Engineering': ['data engineer'],
+    'Data Visualization': ['data viz', 'dataviz'],
+    'ETL': [],
+    'Vector Database': ['vector db', 'vector databases', 'vectordb'],
+    'Pinecone': [],
+    'MLOps': ['ml ops', 'machine learning operations'],
+    'Python': ['python3', 'python 3', 'python programming'],
+    'JavaScript': ['js', 'java script'],
+    'TypeScript': ['ts', 'type script'],
+    'Node.js': ['node', 'nodejs', 'node js'],
+    'React': ['reactjs', 'react js', 'react.js'],
+    'Next.js': ['nextjs', 'next js'],
+    'FastAPI': ['fast api'],
+    'Flask': [],
+    'Django': [],
+    'SQL': ['sql database', 'structured query language'],
+    'PostgreSQL': ['postgres', 'postgre sql', 'psql'],
+    'MongoDB': ['mongo', 'mongo db'],
+    'Amazon Web Services': ['aws', 'amazon aws'],
+    'Google Cloud Platform': ['gcp', 'google cloud'],
+    'Microsoft Azure': ['azure'],
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'Web Scraping': ['scraping', 'web scraper', 'data scraping', 'web crawling'],
+    'Selenium': ['selenium webdriver'],
+    'API Integration': ['api development', 'rest api', 'restful api'],
+    'API': [],
+    'GraphQL': ['graph ql'],
+    'Vue.js': ['vue', 'vuejs'],
+    'OpenCV': ['open cv'],
+    '.NET': ['dotnet', 'dot net'],
+    'ASP.NET': ['asp dot net'],
+    'UI/UX Design': ['ui ux'],
+    'macOS': ['mac os'],
+    'iOS': ['ios development'],
+    'C++': ['cpp', 'c plus plus'],
+    'C#': ['c sharp', 'csharp'],
+    'C/C++': [],
+}
+
+_SEPARATORS_RE = re.compile(r'[\s\-_/\.,;:()]+')
+
+def skill_key(raw: str) -> str:
+    """Normalization key: casefolded, separators collapsed to single spaces"""
+    return _SEPARATORS_RE.sub(' ', raw.casefold()).strip()
+
+def _display_name(key: str) -> str:
+    """
+    Deterministic display form for skills missing from the alias table
+    
+    Derived from the key alone so the same skill gets the same name in
+    every run. Names this rule would mangle (".NET", "GraphQL") belong in
+    SKILL_ALIASES.
+    """
+    return ' '.join(word[:1].upper() + word[1:] for word in key.split(' '))
+
+def _build_lookup() -> Dict[str, str]:
+    """Precompute key -> canonical name for every canonical name and alias"""
+    lookup = {}
+    for canonical, aliases in SKILL_ALIASES.items():
+        lookup[skill_key(canonical)] = canonical
+        for alias in aliases:
+            lookup[skill_key(alias)] = canonical
+    return lookup
+
+def _build_exact() -> Dict[str, str]:
+    """Table entries exactly as written -> canonical name"""
+    exact = {}
+    for canonical, aliases in SKILL_ALIASES.items():
+        exact[canonical] = canonical
+        for alias in aliases:
+            exact[alias] = canonical
+    return exact
+
+_KEY_LOOKUP = _build_lookup()
+
+# Hot path: one dict lookup for the common spellings, the LRU below for
+# everything else
+_EXACT = _build_exact()
+
+@lru_cache(maxsize=65536)
+def _canonicalize_variant(raw: str) -> str:
+    """Resolve a spelling that is not in the exact table"""
+    key = skill_key(raw)
+    if not key:
+        return ''
+    return _KEY_LOOKUP.get(key) or _display_name(key)
+
+def canonicalize_skill(raw: str) -> str:
+    """
+    Canonical name of a raw skill tag
+    
+    "machine learning", "ML" and "Machine-Learning" all become
+    "Machine Learning". Unknown skills are normalized to a title-cased
+    form, so case and punctuation variants still land in one bucket.
+    """
+    return _EXACT.get(raw) or _canonicalize_variant(raw)
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    """Canonicalize a job's skill list, dropping empty and duplicate entries"""
+    exact = _EXACT
+    seen = set()
+    result = []
+    for raw in skills:
+        skill = exact.get(raw) or _canonicalize_variant(raw)
+        if skill and skill not in seen:
+            seen.add(skill)
+            result.append(skill)
+    return result
@@ -1,10 +1,40 @@
 """
 Validation Utilities
-Input validation and sanitization
+Input validation, sanitization and normalization
 """
 
 import re
-from typing import Dict, List, Any
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Iterable
+import numpy as np
+from utils.skill_canonicalizer import canonicalize_skills
+
+SCRAPED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Relative card text: "2 hours ago", "a day ago", "Posted 3 weeks ago"
+_RELATIVE_RE = re.compile(
+    r'\b(\d+|an?|one)\s*(second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b',
+    re.IGNORECASE
+)
+_UNIT_SECONDS = {
+    'second': 1, 'sec': 1,
+    'minute': 60, 'min': 60,
+    'hour': 3600, 'hr': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+    'year': 365 * 86400,
+}
+_KEYWORD_SECONDS = {
+    'just now': 0,
+    'moments ago': 0,
+    'today': 0,
+    'yesterday': 86400,
+    'last week': 7 * 86400,
+    'last month': 30 * 86400,
+}
+_ABSOLUTE_FORMATS = ('%b %d, %Y', '%B %d, %Y', '%Y-%m-%d')
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
@@ -12,7 +42,7 @@ def validate_email(email: str) -> bool:
     return bool(re.match(pattern, email))
 
 def validate_job_data(job: Dict[str, Any]) -> bool:
-    """Validate job data structure"""
+    """Validate job data structure (dict or Job record)"""
     required_fields = ['title', 'description', 'skills', 'scraped_at']
     return all(field in job for field in required_fields)
 
@@ -25,10 +55,142 @@ def sanitize_filename(filename: str) -> str:
         filename = filename[:200]
     return filename
 
-def validate_jobs_list(jobs: List[Dict]) -> List[Dict]:
-    """Validate and filter jobs list"""
+@lru_cache(maxsize=4096)
+def parse_scraped_at(value: str) -> Optional[float]:
+    """
+    Parse a scraped_at string (local time) to UTC epoch seconds
+    
+    A batch shares a handful of scraped_at values, so results are cached.
+    """
+    try:
+        local = datetime.strptime(value, SCRAPED_AT_FORMAT)
+    except (TypeError, ValueError):
+        return None
+    return local.astimezone(timezone.utc).timestamp()
+
+@lru_cache(maxsize=4096)
+def _posted_offset(text: str) -> Optional[float]:
+    """Seconds before scraping that relative posted text refers to"""
+    lowered = text.strip().lower()
+    
+    match = _RELATIVE_RE.search(lowered)
+    if match:
+        amount, unit = match.groups()
+        count = 1 if amount in ('a', 'an', 'one') else int(amount)
+        return float(count * _UNIT_SECONDS[unit])
+    
+    for keyword, seconds in _KEYWORD_SECONDS.items():
+        if keyword in lowered:
+            return float(seconds)
+    
+    return None
+
+@lru_cache(maxsize=1024)
+def _posted_absolute(text: str) -> Optional[float]:
+    """UTC epoch seconds of an absolute posted date"""
+    cleaned = text.strip().replace('Posted', '').strip()
+    for fmt in _ABSOLUTE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).astimezone(timezone.utc).timestamp()
+        except ValueError:
+            continue
+    return None
+
+def parse_posted(text: str, anchor: Optional[float]) -> Optional[float]:
+    """
+    Turn posted card text into UTC epoch seconds
+    
+    Args:
+        text: Posted text such as "2 hours ago" or "yesterday"
+        anchor: UTC epoch seconds of scraped_at that relative text counts back from
+        
+    Returns:
+        Epoch seconds, or None if the text cannot be parsed
+    """
+    if not text or text == 'Unknown':
+        return None
+    
+    offset = _posted_offset(text)
+    if offset is not None:
+        return anchor - offset if anchor is not None else None
+    
+    return _posted_absolute(text)
+
+def normalize_job(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Validate one job and add numeric timestamps
+    
+    Canonicalizes skills, adds ``scraped_ts`` and ``posted_ts`` (UTC
+    epoch seconds, None when unknown) and a ``flags`` list naming
+    anything that could not be normalized.
+    
+    Returns:
+        The normalized job, or None if it is malformed and must be dropped
+    """
+    if not validate_job_data(job):
+        return None
+    
+    title = job.get('title')
+    if not isinstance(title, str) or not title.strip():
+        return None
+    
+    skills = job.get('skills')
+    if not isinstance(skills, list):
+        return None
+    
+    flags = []
+    
+    scraped_ts = parse_scraped_at(job.get('scraped_at'))
+    if scraped_ts is None:
+        flags.append('invalid_scraped_at')
+    
+    posted = job.get('posted') or 'Unknown'
+    posted_ts = parse_posted(posted, scraped_ts)
+    if posted_ts is None and posted != 'Unknown':
+        flags.append('unparsed_posted')
+    
+    normalized = dict(job)
+    normalized['skills'] = canonicalize_skills(skills)
+    normalized['scraped_ts'] = scraped_ts
+    normalized['posted_ts'] = posted_ts
+    if flags:
+        normalized['flags'] = flags
+    return normalized
+
+def validate_jobs_list(jobs: List[Dict], normalize: bool = True) -> List[Dict]:
+    """
+    Validate and filter jobs list
+    
+    Args:
+        jobs: Job dictionaries (or Job records when normalize is False)
+        normalize: Add numeric scraped_ts/posted_ts and flags to each job
+        
+    Returns:
+        Valid jobs
+    """
+    if not normalize:
+        return [job for job in jobs if validate_job_data(job)]
+    
     valid_jobs = []
     for job in jobs:
-        if validate_job_data(job):
-            valid_jobs.append(job)
+        if not isinstance(job, dict):
+            job = job.to_dict()
+        normalized = normalize_job(job)
+        if normalized is not None:
+            valid_jobs.append(normalized)
     return valid_jobs
+
+def timestamps_array(jobs: Iterable[Dict], field: str = 'posted_ts') -> np.ndarray:
+    """
+    Numeric timestamps of normalized jobs for vectorized filtering
+    
+    Missing values become NaN, so ``arr >= cutoff`` simply excludes them.
+    """
+    return np.array([job.get(field) if job.get(field) is not None else np.nan for job in jobs],
+                    dtype=np.float64)
+
+def posted_within(jobs: List[Dict], seconds: float, now: Optional[float] = None) -> List[Dict]:
+    """Jobs posted in the last ``seconds`` (fresh jobs filter)"""
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    mask = timestamps_array(jobs) >= now - seconds
+    return [job for job, keep in zip(jobs, mask) if keep]